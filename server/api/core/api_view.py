@@ -4,7 +4,8 @@ import functools
 from http import HTTPStatus
 import typing
 
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
 from pydantic import BaseModel
 
 from api import exceptions
@@ -18,11 +19,21 @@ from api.request_checkers import (
 from api.request_checkers.checker_protocol import Checker
 from api.request_checkers.methods_checker import Methods
 from api.request_checkers.schema_checker import PydanticSchemaChecker
-from api.typedefs import ApiViewFunction, AsyncViewFunction
+from api.typedefs import ApiViewFunction, AsyncViewFunction, EtagFunction
+from utils.cache import CachedResponse, response_cache
+from utils.db_helpers import (
+    is_replica_configured,
+    remember_user_write,
+    use_replica,
+    user_wrote_recently,
+)
+from utils.fast_json import FastJsonResponse
+
+_SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
 
 
 class _ApiView:
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         *,
         methods: Sequence[Methods] | None = None,
@@ -30,12 +41,18 @@ class _ApiView:
         permissions: Iterable[Permission] | None = None,
         request_schema: type | None = None,
         checkers: Iterable[Checker] | None = None,
+        read_only: bool = False,
+        etag: EtagFunction | None = None,
+        cache_response: bool = False,
     ):
         self._methods = methods
         self._login_required = login_required
         self._permissions = permissions
         self._user_checkers = checkers
         self._request_schema = request_schema
+        self._read_only = read_only
+        self._etag = etag
+        self._cache_response = cache_response
 
         # Collect checkers on init so we don't have to
         # do this on each decorated function call
@@ -50,6 +67,30 @@ class _ApiView:
             request: HttpRequest,
             *args: typing.Any,
             **kwargs: typing.Any,
+        ) -> HttpResponse:
+            route = functools.partial(self._route, handle)
+
+            user_id: int | None = getattr(request, 'user_id', None)
+            if (
+                self._cache_response
+                and user_id is not None
+                and request.method == 'GET'
+                and response_cache.enabled
+            ):
+                return await self._get_cached_response(
+                    route,
+                    request,
+                    user_id,
+                    *args,
+                    **kwargs,
+                )
+
+            return await route(request, *args, **kwargs)
+
+        async def handle(
+            request: HttpRequest,
+            *args: typing.Any,
+            **kwargs: typing.Any,
         ) -> HttpResponse:
             try:
                 checks_result = await self._apply_checks(
@@ -60,17 +101,55 @@ class _ApiView:
                 if checks_result is not None:
                     return checks_result
 
-                request = typing.cast(T, request)
-                return await api_view_function(request, *args, **kwargs)
+                return await self._call_view(
+                    api_view_function,
+                    request,
+                    *args,
+                    **kwargs,
+                )
             except exceptions.NotFoundError as e:
                 # This way we can handle aget_object_or_404_json call
-                return JsonResponse(
+                return FastJsonResponse(
                     data={'error': e.message},
                     status=HTTPStatus.NOT_FOUND,
                 )
+            except exceptions.BadRequestError as e:
+                return FastJsonResponse(
+                    data={'error': e.message},
+                    status=HTTPStatus.BAD_REQUEST,
+                )
 
         return wrapper
 
+    async def _route(
+        self,
+        handle: AsyncViewFunction,
+        request: HttpRequest,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> HttpResponse:
+        if not is_replica_configured():
+            return await handle(request, *args, **kwargs)
+
+        # Users who have just written something keep reading
+        # from the default database to see their own changes
+        user_id: int | None = getattr(request, 'user_id', None)
+        if self._read_only and (
+            user_id is None or not user_wrote_recently(request, user_id)
+        ):
+            with use_replica():
+                return await handle(request, *args, **kwargs)
+
+        response = await handle(request, *args, **kwargs)
+        if (
+            user_id is not None
+            and request.method not in _SAFE_METHODS
+            and response.status_code < HTTPStatus.BAD_REQUEST
+        ):
+            remember_user_write(response, user_id)
+
+        return response
+
     async def _apply_checks(
         self,
         request: HttpRequest,
@@ -83,6 +162,77 @@ class _ApiView:
 
         return None
 
+    async def _get_cached_response(
+        self,
+        get_response: AsyncViewFunction,
+        request: HttpRequest,
+        user_id: int,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> HttpResponse:
+        # Only responses that passed the checks for this user are cached,
+        # and writes that could change the checks result invalidate them
+        key = request.get_full_path()
+        cached = response_cache.get(user_id, key)
+        if cached is None:
+            version = response_cache.version
+            response = await get_response(request, *args, **kwargs)
+            if (
+                response.status_code == HTTPStatus.OK
+                and not response.streaming
+            ):
+                response_cache.set(
+                    user_id,
+                    key,
+                    CachedResponse(
+                        content=response.content,
+                        content_type=response.headers['Content-Type'],
+                        etag=response.headers.get('ETag'),
+                    ),
+                    version,
+                )
+
+            return response
+
+        if cached.etag is not None:
+            not_modified = _get_not_modified_response(request, cached.etag)
+            if not_modified is not None:
+                return not_modified
+
+        response = HttpResponse(
+            cached.content,
+            content_type=cached.content_type,
+        )
+        if cached.etag is not None:
+            response.headers['ETag'] = cached.etag
+
+        return response
+
+    async def _call_view[T: HttpRequest](
+        self,
+        api_view_function: ApiViewFunction[T],
+        request: HttpRequest,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> HttpResponse:
+        # The version is taken after the checks, so a 304 doesn't leak
+        # anything to users who aren't allowed to see the response
+        etag: str | None = None
+        if self._etag is not None and request.method in ('GET', 'HEAD'):
+            etag = await self._etag(request, *args, **kwargs)
+
+        if etag is not None:
+            not_modified = _get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+        request = typing.cast(T, request)
+        response = await api_view_function(request, *args, **kwargs)
+        if etag is not None and response.status_code == HTTPStatus.OK:
+            response.headers.setdefault('ETag', etag)
+
+        return response
+
     def _get_checkers(self) -> Iterable[Checker]:
         checkers: list[Checker] = []
         if self._methods is not None:
@@ -106,6 +256,17 @@ class _ApiView:
         return checkers
 
 
+def _get_not_modified_response(
+    request: HttpRequest,
+    etag: str,
+) -> HttpResponse | None:
+    not_modified = get_conditional_response(request, etag)
+    if not_modified is not None:
+        not_modified.headers['ETag'] = etag
+
+    return not_modified
+
+
 @typing.overload
 def api_view[T: HttpRequest](
     view_function: ApiViewFunction[T],
@@ -121,6 +282,9 @@ def api_view(
     permissions: Iterable[Permission] | None = None,
     request_schema: type | None = None,
     checkers: Iterable[Checker] | None = None,
+    read_only: bool = False,
+    etag: EtagFunction | None = None,
+    cache_response: bool = False,
 ) -> _ApiView: ...
 
 
@@ -133,6 +297,9 @@ def api_view[T: HttpRequest](  # noqa: PLR0913
     permissions: Iterable[Permission] | None = None,
     request_schema: type | None = None,
     checkers: Iterable[Checker] | None = None,
+    read_only: bool = False,
+    etag: EtagFunction | None = None,
+    cache_response: bool = False,
 ) -> _ApiView | AsyncViewFunction:
     if view_function is not None:
         assert callable(view_function)
@@ -144,4 +311,7 @@ def api_view[T: HttpRequest](  # noqa: PLR0913
         permissions=permissions,
         request_schema=request_schema,
         checkers=checkers,
+        read_only=read_only,
+        etag=etag,
+        cache_response=cache_response,
     )
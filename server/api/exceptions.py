@@ -13,6 +13,11 @@ class UnauthorizedError(APIError):
     pass
 
 
+class BadRequestError(APIError):
+    def __init__(self, message: str):
+        self.message = message
+
+
 class NotFoundError(APIError):
     def __init__(self, object_type: type[models.Model] | str | None = None):
         base_message = 'not found'
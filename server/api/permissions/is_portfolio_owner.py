@@ -1,16 +1,31 @@
 import typing
 from typing import override
 
+from django.db import models
 from django.http import HttpRequest
 
 from api.permissions.permission_protocol import Permission
+from api.utils.identity_map import get_identity_map
 from api.utils.shortcuts import aget_object_or_404_json
 from apps.portfolios.models import Portfolio
 
 
 class IsPortfolioOwner(Permission):
-    def __init__(self, argument_name: str = 'pk'):
+    """
+    Checks that the portfolio from the view arguments belongs to the user.
+
+    If queryset is given, the portfolio is loaded with it
+    and added to the request identity map, so the view
+    can reuse it instead of querying it again.
+    """
+
+    def __init__(
+        self,
+        argument_name: str = 'pk',
+        queryset: models.QuerySet[Portfolio] | None = None,
+    ):
         self.argument_name = argument_name
+        self.queryset = queryset
 
     @override
     async def has_permission(
@@ -25,10 +40,17 @@ class IsPortfolioOwner(Permission):
         # We don't want other users to know
         # about not theirs portfolios.
         # That's why we return 404 on check fail.
-        await aget_object_or_404_json(
-            Portfolio.objects.active().only(),
+        portfolio = await aget_object_or_404_json(
+            (
+                Portfolio.objects.active().only()
+                if self.queryset is None
+                else self.queryset
+            ),
             pk=kwargs[self.argument_name],
             owner=request.user_id,
         )
 
+        if self.queryset is not None:
+            get_identity_map(request).add(portfolio)
+
         return True
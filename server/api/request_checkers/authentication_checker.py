@@ -2,9 +2,10 @@ from http import HTTPStatus
 import typing
 from typing import override
 
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 
 from api.request_checkers.checker_protocol import Checker
+from utils.fast_json import FastJsonResponse
 
 
 class AuthenticationChecker(Checker):
@@ -19,7 +20,7 @@ class AuthenticationChecker(Checker):
 
     @override
     def on_failure_response(self) -> HttpResponse:
-        return JsonResponse(
+        return FastJsonResponse(
             data={'error': 'authentication required'},
             status=HTTPStatus.UNAUTHORIZED,
         )
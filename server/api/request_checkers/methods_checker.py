@@ -3,9 +3,10 @@ from http import HTTPStatus
 import typing
 from typing import Literal, override
 
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 
 from api.request_checkers.checker_protocol import Checker
+from utils.fast_json import FastJsonResponse
 
 Methods = Literal['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS']
 
@@ -25,7 +26,7 @@ class MethodsChecker(Checker):
 
     @override
     def on_failure_response(self) -> HttpResponse:
-        return JsonResponse(
+        return FastJsonResponse(
             data={'error': 'Method not allowed'},
             status=HTTPStatus.METHOD_NOT_ALLOWED,
         )
@@ -4,10 +4,11 @@ from http import HTTPStatus
 import typing
 from typing import override
 
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 
 from api.permissions.permission_protocol import Permission
 from api.request_checkers.checker_protocol import Checker
+from utils.fast_json import FastJsonResponse
 
 
 class PermissionsChecker(Checker):
@@ -38,7 +39,7 @@ class PermissionsChecker(Checker):
 
     @override
     def on_failure_response(self) -> HttpResponse:
-        return JsonResponse(
+        return FastJsonResponse(
             data={'error': 'Permission denied'},
             status=HTTPStatus.FORBIDDEN,
         )
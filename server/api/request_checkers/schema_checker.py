@@ -1,16 +1,17 @@
 from dataclasses import is_dataclass
 from http import HTTPStatus
 import inspect
-import json
 import typing
 from typing import override
 
 import dacite
 from dacite.types import is_optional
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 from pydantic import BaseModel, ValidationError
 
 from api.request_checkers.checker_protocol import Checker
+from utils import fast_json
+from utils.fast_json import FastJsonResponse
 
 if typing.TYPE_CHECKING:
     from _typeshed import DataclassInstance
@@ -92,12 +93,12 @@ class BaseSchemaChecker(Checker):
         if request.method == 'GET':
             return dict(request.GET)
 
-        # Is request.body a blocking I/O operation?
-        # Seems like currently there is no way to read it asynchronously.
+        # The body is already read asynchronously and kept in memory,
+        # see BodySizeLimitMiddleware, so request.body doesn't block
         try:
-            result = json.loads(request.body)
+            result = fast_json.loads(request.body)
             return typing.cast(dict[str, typing.Any], result)
-        except json.JSONDecodeError as e:
+        except fast_json.JSONDecodeError as e:
             raise ValueError('request body contains invalid json') from e
 
 
@@ -148,7 +149,7 @@ class DataclassSchemaChecker[D: 'DataclassInstance'](BaseSchemaChecker):
 
     @override
     def on_failure_response(self) -> HttpResponse:
-        return JsonResponse(
+        return FastJsonResponse(
             data={'error': self._error},
             status=self._response_status,
         )
@@ -160,7 +161,7 @@ class PydanticSchemaChecker[B: BaseModel](BaseSchemaChecker):
             raise TypeError('Expected a BaseModel subclass')
 
         self._request_schema = request_schema
-        self._error: str | None = None
+        self._error: bytes | None = None
         self._response_status: int = HTTPStatus.BAD_REQUEST
 
     @override
@@ -173,7 +174,7 @@ class PydanticSchemaChecker[B: BaseModel](BaseSchemaChecker):
         try:
             request_data = self._get_request_data(request)
         except ValueError as e:
-            self._error = json.dumps({'error': str(e)})
+            self._error = fast_json.dumps({'error': str(e)})
             return False
 
         try:
@@ -181,7 +182,9 @@ class PydanticSchemaChecker[B: BaseModel](BaseSchemaChecker):
                 request_data,
             )
         except ValidationError as e:
-            self._error = '{"error":' + e.json(include_url=False) + '}'
+            self._error = fast_json.dumps(
+                {'error': fast_json.Fragment(e.json(include_url=False))},
+            )
             return False
 
         request = typing.cast(PopulatedSchemaRequest[B], request)
@@ -191,13 +194,9 @@ class PydanticSchemaChecker[B: BaseModel](BaseSchemaChecker):
     @override
     def on_failure_response(self) -> HttpResponse:
         if self._error is None:
-            return JsonResponse(
+            return FastJsonResponse(
                 {'error': 'unknown'},
                 status=self._response_status,
             )
 
-        return HttpResponse(
-            content=self._error.encode(),
-            content_type='application/json',
-            status=self._response_status,
-        )
+        return FastJsonResponse(self._error, status=self._response_status)
@@ -28,6 +28,15 @@ class ApiViewFunction[T: HttpRequest](typing.Protocol):
     ) -> Coroutine[typing.Any, typing.Any, HttpResponse]: ...
 
 
+class EtagFunction(typing.Protocol):
+    def __call__(
+        self,
+        request: HttpRequest,
+        *args: typing.Any,
+        **kwargs: typing.Any,
+    ) -> Coroutine[typing.Any, typing.Any, str | None]: ...
+
+
 class AuthenticatedRequest(HttpRequest):
     user_id: int
     auser: Callable[[], Awaitable[ItableUser]]
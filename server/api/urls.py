@@ -35,7 +35,7 @@ urlpatterns = [
                 ),
                 path(
                     '<int:portfolio_id>/securities/',
-                    views.portfolios.securities.add_portfolio_security,
+                    views.portfolios.securities.collection_dispatcher,
                     name='portfolio_securities',
                 ),
                 path(
@@ -1,10 +1,13 @@
 from api.utils.dispatcher import Dispatcher
 
 from . import strings
+from .identity_map import get_identity_map, IdentityMap
 from .shortcuts import aget_object_or_404_json
 
 __all__ = (
     'Dispatcher',
+    'IdentityMap',
     'aget_object_or_404_json',
+    'get_identity_map',
     'strings',
 )
@@ -1,18 +1,33 @@
 import abc
-import asyncio
-from collections.abc import Iterable, Mapping, Sequence
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+    Sequence,
+)
 import dataclasses
+import datetime as dt
+import decimal
+import functools
+import operator
+import types
 import typing
 from typing import override
+import uuid
 
 from dacite.types import is_instance
 from django.db import models
 
+from utils import fast_json
+from utils.db_helpers import aiterate_pinned
+
 if typing.TYPE_CHECKING:
     from _typeshed import DataclassInstance
 
 type _SourceFieldName = str
 type _AnyConverter = 'Converter[models.Model, DataclassInstance, typing.Any]'
+type _AnyJsonConverter = 'QuerySetToJsonConverter[models.Model, typing.Any]'
 
 
 class Converter[T: models.Model, D: 'DataclassInstance', E](abc.ABC):
@@ -43,14 +58,94 @@ class Converter[T: models.Model, D: 'DataclassInstance', E](abc.ABC):
     @abc.abstractmethod
     async def convert(self) -> E | Sequence[E]: ...
 
-    def _set_source_if_empty(self, source: T | models.QuerySet[T]) -> None:
-        if self._source is None:
-            self._source = source
+    @abc.abstractmethod
+    async def _prepare(self) -> None:
+        """
+        Converts nested converters that have their own source.
+
+        Must be called before _convert_one.
+        """
+
+    @abc.abstractmethod
+    def _convert_one(self, source: T) -> E:
+        """Converts a single row, doesn't touch the database."""
+
+
+type _Validator = Callable[[typing.Any], bool]
+
+
+@functools.lru_cache(maxsize=256)
+def _get_type_validator(field_type: typing.Any) -> _Validator:
+    # Plain classes and unions of them are checked with a single
+    # isinstance call, everything else is left to dacite
+    if typing.get_origin(field_type) in (typing.Union, types.UnionType):
+        classes = typing.get_args(field_type)
+    else:
+        classes = (field_type,)
+
+    if not all(_is_plain_class(cls) for cls in classes):
+        return functools.partial(_is_instance, field_type)
+
+    # Numeric tower, same as in dacite
+    if float in classes or complex in classes:
+        classes = (*classes, int)
+
+    return functools.partial(_isinstance, classes)
+
+
+def _is_plain_class(cls: typing.Any) -> bool:
+    # typing.Any is a class since Python 3.11,
+    # but can't be used with isinstance
+    return (
+        isinstance(cls, type)
+        and not isinstance(cls, types.GenericAlias)
+        and cls is not typing.Any
+    )
+
+
+def _isinstance(classes: tuple[type, ...], value: typing.Any) -> bool:
+    return isinstance(value, classes)
+
+
+def _is_instance(field_type: typing.Any, value: typing.Any) -> bool:
+    return is_instance(value, field_type)
+
+
+class _FieldAccessor(typing.NamedTuple):
+    field_name: str
+    lookup: str
+    get_value: Callable[[typing.Any], typing.Any]
+    is_valid: _Validator
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_accessors(
+    schema: type['DataclassInstance'],
+    lookups: tuple[tuple[str, str], ...],
+) -> tuple[_FieldAccessor, ...]:
+    fields = schema.__dataclass_fields__
+    return tuple(
+        _FieldAccessor(
+            field_name=field_name,
+            lookup=lookup,
+            # Handle complex field lookups like portfolio__owner__first_name
+            get_value=operator.attrgetter(lookup.replace('__', '.')),
+            is_valid=_get_type_validator(fields[field_name].type),
+        )
+        for field_name, lookup in lookups
+    )
 
 
 class ModelToDataclassConverter[T: models.Model, E: 'DataclassInstance'](
     Converter[T, E, E],
 ):
+    """
+    Converts model instances to the schema dataclass instances.
+
+    Field lookups and type checks are compiled once per schema
+    and fields map, so converting a row only calls prepared accessors.
+    """
+
     @override
     async def convert(self) -> E | Sequence[E]:
         if self._source is None:
@@ -59,63 +154,115 @@ class ModelToDataclassConverter[T: models.Model, E: 'DataclassInstance'](
                 'you must explicitly set it on initialization',
             )
 
+        await self._prepare()
         if self._many:
             assert isinstance(self._source, models.QuerySet)
-            tasks = []
-            result = []
-            async for item in self._source:
-                tasks.append(asyncio.create_task(self._convert_one(item)))
-
-            for task in await asyncio.gather(*tasks):
-                result.append(task)
+            return [self._convert_one(item) async for item in self._source]
 
-            return result
+        return self._convert_one(typing.cast(T, self._source))
 
-        return await self._convert_one(self._source)
+    @override
+    async def _prepare(self) -> None:
+        self._converted_nested_fields: dict[str, typing.Any] = {}
+        for field_name, converter in self._nested_converters.items():
+            if converter._source is None:
+                await converter._prepare()
+            else:
+                self._converted_nested_fields[
+                    field_name
+                ] = await converter.convert()
 
-    async def _convert_one(self, source: T | models.QuerySet[T]) -> E:
-        fields = self._dataclass.__dataclass_fields__
+    @override
+    def _convert_one(self, source: T) -> E:
         init_kwargs: dict[str, typing.Any] = {}
-        for field_name in fields:
-            if field_name in self._skip_fields:
-                init_kwargs[field_name] = None
-                continue
-
-            lookup = self._fields_map.get(field_name) or field_name
-            if isinstance(lookup, Converter):
-                lookup._set_source_if_empty(source)
-                init_kwargs[field_name] = await lookup.convert()
-                continue
-
-            instance_field_name: str = lookup
-
-            # Handle complex field lookups like portfolio__owner__first_name
-            instance_field_parts = instance_field_name.split('__')
-            instance = source
+        for field_name, lookup, get_value, is_valid in self._accessors:
             try:
-                for part in instance_field_parts:
-                    value = getattr(instance, part)
-                    instance = value
-
+                value = get_value(source)
             except AttributeError as e:
                 raise AttributeError(
-                    f'Model instance has no "{instance_field_name}" field',
+                    f'Model instance has no "{lookup}" field',
                 ) from e
 
-            self._check_type(field_name, value)
+            # Dataclasses don't do type checking, so we check ourselves.
+            if not is_valid(value):
+                raise TypeError(f'Type mismatch for field "{field_name}"')
+
             init_kwargs[field_name] = value
 
+        for field_name in self._skipped_fields:
+            init_kwargs[field_name] = None
+
+        # Nested converters without their own source convert the same row
+        for field_name, converter in self._nested_converters.items():
+            if field_name in self._converted_nested_fields:
+                init_kwargs[field_name] = self._converted_nested_fields[
+                    field_name
+                ]
+            else:
+                init_kwargs[field_name] = converter._convert_one(source)
+
         return self._dataclass(**init_kwargs)
 
-    def _check_type(self, field_name: str, value: typing.Any) -> None:
-        # Dataclasses don't do type checking, so we check ourselves.
-        field_type = self._dataclass.__annotations__[field_name]
-        if not is_instance(value, field_type):
-            raise TypeError(f'Type mismatch for field "{field_name}"')
+    @functools.cached_property
+    def _nested_converters(self) -> dict[str, _AnyConverter]:
+        nested: dict[str, _AnyConverter] = {}
+        for field_name in self._dataclass.__dataclass_fields__:
+            if field_name in self._skip_fields:
+                continue
+
+            lookup = self._fields_map.get(field_name)
+            if isinstance(lookup, Converter):
+                nested[field_name] = lookup
+
+        return nested
+
+    @functools.cached_property
+    def _skipped_fields(self) -> tuple[str, ...]:
+        return tuple(
+            field_name
+            for field_name in self._dataclass.__dataclass_fields__
+            if field_name in self._skip_fields
+        )
+
+    @functools.cached_property
+    def _accessors(self) -> tuple[_FieldAccessor, ...]:
+        lookups: list[tuple[str, str]] = []
+        for field_name in self._dataclass.__dataclass_fields__:
+            if field_name in self._skip_fields:
+                continue
+
+            lookup = self._fields_map.get(field_name) or field_name
+            if not isinstance(lookup, Converter):
+                lookups.append((field_name, lookup))
+
+        return _compile_accessors(self._dataclass, tuple(lookups))
 
 
 type _SerializedDataclass = dict[str, typing.Any]
 
+# Values of these types are put into the result as they are,
+# everything else goes through dataclasses.asdict.
+_IMMUTABLE_TYPES = frozenset(
+    (
+        str,
+        int,
+        float,
+        bool,
+        type(None),
+        dt.datetime,
+        dt.date,
+        dt.time,
+        dt.timedelta,
+        decimal.Decimal,
+        uuid.UUID,
+    ),
+)
+
+
+@dataclasses.dataclass(slots=True)
+class _ValueWrapper:
+    value: typing.Any
+
 
 class ModelToDictConverter[T: models.Model, D: 'DataclassInstance'](
     Converter[T, D, _SerializedDataclass],
@@ -157,6 +304,170 @@ class ModelToDictConverter[T: models.Model, D: 'DataclassInstance'](
         result = typing.cast(D, result)
         return self._dataclass_to_dict(result)
 
+    @override
+    async def _prepare(self) -> None:
+        await self._intermediate_converter._prepare()
+
+    @override
+    def _convert_one(self, source: T) -> _SerializedDataclass:
+        return self._dataclass_to_dict(
+            self._intermediate_converter._convert_one(source),
+        )
+
     @staticmethod
     def _dataclass_to_dict(dataclass: D) -> _SerializedDataclass:
-        return dataclasses.asdict(dataclass)
+        return _dataclass_to_dict(dataclass)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_field_names(schema: type['DataclassInstance']) -> tuple[str, ...]:
+    return tuple(field.name for field in dataclasses.fields(schema))
+
+
+def _dataclass_to_dict(dataclass: 'DataclassInstance') -> _SerializedDataclass:
+    # Same as dataclasses.asdict, but doesn't deep copy immutable values
+    result: _SerializedDataclass = {}
+    for field_name in _get_field_names(type(dataclass)):
+        value = getattr(dataclass, field_name)
+        if type(value) in _IMMUTABLE_TYPES:
+            pass
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            value = _dataclass_to_dict(value)
+        else:
+            # Let asdict handle containers and everything else
+            value = dataclasses.asdict(_ValueWrapper(value))['value']
+
+        result[field_name] = value
+
+    return result
+
+
+class QuerySetToJsonConverter[T: models.Model, D: 'DataclassInstance']:
+    """
+    Serializes queryset rows straight to a JSON array.
+
+    Rows are fetched with values_list(), so neither model instances
+    nor dataclasses are created. The schema only defines the fields,
+    values aren't type checked. Nested converters read their lookups
+    from the same row, so they must not have a source.
+    """
+
+    def __init__(
+        self,
+        schema: type[D],
+        source: models.QuerySet[T] | None = None,
+        *,
+        fields_map: Mapping[str, _SourceFieldName | _AnyJsonConverter]
+        | None = None,
+        skip_fields: Iterable[str] | None = None,
+    ):
+        self._source = source
+        self._dataclass = schema
+        self._fields_map = fields_map or {}
+        self._skip_fields = set(skip_fields or ())
+
+        for lookup in self._fields_map.values():
+            if (
+                isinstance(lookup, QuerySetToJsonConverter)
+                and lookup._source is not None
+            ):
+                raise ValueError('Nested converters must not have a source')
+
+    async def convert(self) -> bytes:
+        return fast_json.dumps(await self.convert_rows())
+
+    async def convert_rows(self) -> list[_SerializedDataclass]:
+        """Returns the rows before encoding, e.g. to paginate them."""
+        return [self._build_row(row) async for row in self._get_rows()]
+
+    def iterate_rows(
+        self,
+        chunk_size: int = 2000,
+    ) -> AsyncIterator[_SerializedDataclass]:
+        """
+        Yields the rows without loading the whole queryset,
+        for StreamingJsonResponse.
+        """
+        rows = aiterate_pinned(self._get_rows(), chunk_size)
+        return (self._build_row(row) async for row in rows)
+
+    def _get_rows(self) -> models.QuerySet[T, tuple[typing.Any, ...]]:
+        if self._source is None:
+            raise AttributeError(
+                'Failed to automatically resole the source field, '
+                'you must explicitly set it on initialization',
+            )
+
+        return self._source.values_list(*self._lookups)
+
+    def _build_row(self, row: Sequence[typing.Any]) -> _SerializedDataclass:
+        # Own fields come first in the row, nested fields follow them
+        result = dict(zip(self._field_names, row, strict=False))
+        for field_name, row_slice, converter in self._nested_slices:
+            result[field_name] = converter._build_row(row[row_slice])
+
+        for field_name in self._skipped_fields:
+            result[field_name] = None
+
+        return result
+
+    @functools.cached_property
+    def _field_names(self) -> tuple[str, ...]:
+        return tuple(field_name for field_name, _ in self._own_lookups)
+
+    @functools.cached_property
+    def _lookups(self) -> tuple[str, ...]:
+        lookups = [lookup for _, lookup in self._own_lookups]
+        for converter in self._nested_converters.values():
+            lookups.extend(converter._lookups)
+
+        return tuple(lookups)
+
+    @functools.cached_property
+    def _own_lookups(self) -> tuple[tuple[str, str], ...]:
+        lookups: list[tuple[str, str]] = []
+        for field_name in self._dataclass.__dataclass_fields__:
+            if field_name in self._skip_fields:
+                continue
+
+            lookup = self._fields_map.get(field_name) or field_name
+            if isinstance(lookup, str):
+                lookups.append((field_name, lookup))
+
+        return tuple(lookups)
+
+    @functools.cached_property
+    def _nested_converters(self) -> dict[str, _AnyJsonConverter]:
+        nested: dict[str, _AnyJsonConverter] = {}
+        for field_name in self._dataclass.__dataclass_fields__:
+            if field_name in self._skip_fields:
+                continue
+
+            lookup = self._fields_map.get(field_name)
+            if isinstance(lookup, QuerySetToJsonConverter):
+                nested[field_name] = lookup
+
+        return nested
+
+    @functools.cached_property
+    def _nested_slices(
+        self,
+    ) -> tuple[tuple[str, slice, _AnyJsonConverter], ...]:
+        nested_slices: list[tuple[str, slice, _AnyJsonConverter]] = []
+        offset = len(self._own_lookups)
+        for field_name, converter in self._nested_converters.items():
+            width = len(converter._lookups)
+            nested_slices.append(
+                (field_name, slice(offset, offset + width), converter),
+            )
+            offset += width
+
+        return tuple(nested_slices)
+
+    @functools.cached_property
+    def _skipped_fields(self) -> tuple[str, ...]:
+        return tuple(
+            field_name
+            for field_name in self._dataclass.__dataclass_fields__
+            if field_name in self._skip_fields
+        )
@@ -0,0 +1,13 @@
+import hashlib
+import typing
+
+from django.utils.http import quote_etag
+
+
+def make_etag(*version: typing.Any) -> str:
+    """
+    Builds a quoted ETag from the parts of a version token,
+    e.g. the latest updated_at and the number of rows.
+    """
+    digest = hashlib.blake2b(repr(version).encode(), digest_size=16)
+    return quote_etag(digest.hexdigest())
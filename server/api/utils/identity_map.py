@@ -0,0 +1,38 @@
+import typing
+
+from django.db import models
+from django.http import HttpRequest
+
+type _Key = tuple[type[models.Model], typing.Any]
+
+
+class IdentityMap:
+    """
+    Model instances loaded while handling a single request.
+
+    Permissions put the objects they've already fetched here,
+    so services don't query the same rows again.
+    Instances are stored as they were loaded, so whoever adds
+    an object decides which fields and relations it has.
+    """
+
+    def __init__(self) -> None:
+        self._objects: dict[_Key, typing.Any] = {}
+
+    def add(self, obj: models.Model) -> None:
+        self._objects[type(obj), obj.pk] = obj
+
+    def get[T: models.Model](self, model: type[T], pk: typing.Any) -> T | None:
+        return self._objects.get((model, pk))
+
+
+class _IdentityMapRequest(HttpRequest):
+    identity_map: IdentityMap
+
+
+def get_identity_map(request: HttpRequest) -> IdentityMap:
+    request = typing.cast(_IdentityMapRequest, request)
+    if not hasattr(request, 'identity_map'):
+        request.identity_map = IdentityMap()
+
+    return request.identity_map
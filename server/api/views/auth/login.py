@@ -1,17 +1,25 @@
 from http import HTTPStatus
 import logging
 
-from django.contrib import auth
-from django.http import HttpResponse, JsonResponse
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
 from pydantic import BaseModel
 
 from api.core.api_view import api_view
 from api.request_checkers.schema_checker import PopulatedSchemaRequest
+from apps.users.authentication.exceptions import (
+    ClientPasswordChecksLimitError,
+    PasswordCheckerBusyError,
+)
 from apps.users.authentication.jwt import TokenPair
+from apps.users.authentication.passwords import password_checker
 from apps.users.models import ItableUser
+from utils.fast_json import FastJsonResponse
 
 logger = logging.getLogger('api')
 
+User = get_user_model()
+
 
 class UserCredentialsSchema(BaseModel):
     email: str
@@ -23,16 +31,28 @@ async def login(
     request: PopulatedSchemaRequest[UserCredentialsSchema],
 ) -> HttpResponse:
     user_credentials: UserCredentialsSchema = request.populated_schema
-    user: ItableUser | None = await auth.aauthenticate(
-        None,
-        email=user_credentials.email,
-        password=user_credentials.password,
-    )
+    try:
+        user = await _aauthenticate(
+            user_credentials,
+            client=request.META.get('REMOTE_ADDR', ''),
+        )
+    except ClientPasswordChecksLimitError:
+        return FastJsonResponse(
+            {'error': 'too many login attempts'},
+            status=HTTPStatus.TOO_MANY_REQUESTS,
+            headers={'Retry-After': '1'},
+        )
+    except PasswordCheckerBusyError:
+        return FastJsonResponse(
+            {'error': 'too many login attempts'},
+            status=HTTPStatus.SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'},
+        )
 
     if user is not None:
         logger.info('User logged in', extra={'user_id': user.id})
         token_pair: TokenPair = await user.generate_new_tokens()
-        return JsonResponse(
+        return FastJsonResponse(
             {
                 'access_token': token_pair.access_token,
                 'refresh_token': token_pair.refresh_token,
@@ -43,7 +63,29 @@ async def login(
         'User failed to login',
         extra={'user_agent': request.headers.get('User-Agent')},
     )
-    return JsonResponse(
+    return FastJsonResponse(
         {'error': 'invalid credentials'},
         status=HTTPStatus.UNAUTHORIZED,
     )
+
+
+async def _aauthenticate(
+    user_credentials: UserCredentialsSchema,
+    client: str,
+) -> ItableUser | None:
+    """
+    Does what ModelBackend.authenticate does, but hashes the password
+    in the password checker threads instead of the ORM one.
+    """
+    user = await User._default_manager.filter(
+        email=user_credentials.email,
+    ).afirst()
+    is_correct = await password_checker.acheck(
+        user,
+        user_credentials.password,
+        client=client,
+    )
+    if user is None or not is_correct or not user.is_active:
+        return None
+
+    return user
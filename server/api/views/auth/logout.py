@@ -1,9 +1,10 @@
 import logging
 
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse
 
 from api.core.api_view import api_view
 from api.typedefs import AuthenticatedRequest
+from utils.fast_json import FastJsonResponse
 
 logger = logging.getLogger('api')
 
@@ -19,4 +20,4 @@ async def logout(request: HttpRequest | AuthenticatedRequest) -> HttpResponse:
         msg='User logged out',
         extra={'user_id': user.id} if user.is_authenticated else {},
     )
-    return JsonResponse({})
+    return FastJsonResponse({})
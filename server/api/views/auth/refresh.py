@@ -1,7 +1,7 @@
 import dataclasses
+import typing
 
-from django.contrib.auth import get_user_model
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.typedefs import (
@@ -11,39 +11,41 @@ from apps.users.authentication.exceptions import InvalidTokenError
 from apps.users.authentication.jwt import (
     PyJWT,
     PyJWTPayloadChecker,
+    RefreshTokenPayload,
     TokenPair,
 )
 from apps.users.models import ItableUser
-
-User = get_user_model()
+from utils.fast_json import FastJsonResponse
 
 
 @dataclasses.dataclass
 class RefreshTokenSchema:
     refresh_token: str
-    user: ItableUser | None = None  # field is set after the validation
+    # field is set after the validation
+    token_pair: TokenPair | None = None
 
     async def validate_refresh_token(self) -> str:
         refresh_token: str = self.refresh_token
         try:
-            payload = PyJWT().decode_token(refresh_token)
+            payload = typing.cast(
+                RefreshTokenPayload,
+                PyJWT().decode_token(refresh_token),
+            )
         except InvalidTokenError as e:
             raise ValueError('token is not valid') from e
 
         if not PyJWTPayloadChecker().is_active(payload):
             raise ValueError('token is expired')
 
-        user_id = payload['uid']
-
-        try:
-            user = await User.objects.aget(pk=user_id)
-        except User.DoesNotExist as e:
-            raise ValueError('user does not exist') from e
+        version = payload.get('ver')
+        if type(version) is not int:
+            raise ValueError('token is not valid')
 
-        if not user.can_refresh_tokens(refresh_token):
+        token_pair = await ItableUser.arotate_tokens(payload['uid'], version)
+        if token_pair is None:
             raise ValueError('token is no longer active')
 
-        self.user = user
+        self.token_pair = token_pair
         return refresh_token
 
 
@@ -54,10 +56,9 @@ class RefreshTokenSchema:
 async def refresh_token(
     request: PopulatedSchemaRequest[RefreshTokenSchema],
 ) -> HttpResponse:
-    user: ItableUser | None = request.populated_schema.user
-    assert user is not None
-    token_pair: TokenPair = await user.generate_new_tokens()
-    return JsonResponse(
+    token_pair: TokenPair | None = request.populated_schema.token_pair
+    assert token_pair is not None
+    return FastJsonResponse(
         {
             'access_token': token_pair.access_token,
             'refresh_token': token_pair.refresh_token,
@@ -1,6 +1,6 @@
 import logging
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.permissions import IsPortfolioOwner
@@ -8,29 +8,47 @@ from api.typedefs import (
     AuthenticatedPopulatedSchemaRequest,
     AuthenticatedRequest,
 )
+from api.utils import get_identity_map
 from api.utils.dispatcher import create_dispatcher
+from api.utils.etag import make_etag
+from api.utils.pagination import KeysetPaginator
+from apps.portfolios.models import Portfolio
 from schemas.portfolio import (
     PortfolioCreateSchema,
     PortfolioListSchema,
     PortfolioSchema,
     PortfolioUpdateSchema,
 )
-from services.portfolios.service import PortfolioService
+from services.portfolios.service import PORTFOLIO_FIELDS, PortfolioService
+from utils.fast_json import FastJsonResponse, StreamingJsonResponse
 
 logger = logging.getLogger('api')
 
 
+async def _portfolio_etag(request: AuthenticatedRequest, pk: int) -> str:
+    service = PortfolioService(identity_map=get_identity_map(request))
+    return make_etag(*await service.get_portfolio_version(pk))
+
+
 @api_view(
     methods=['GET'],
     login_required=True,
-    permissions=[IsPortfolioOwner()],
+    permissions=[
+        IsPortfolioOwner(
+            queryset=Portfolio.objects.active().only(*PORTFOLIO_FIELDS),
+        ),
+    ],
+    read_only=True,
+    etag=_portfolio_etag,
+    cache_response=True,
 )
 async def get_portfolio(
     request: AuthenticatedRequest,
     pk: int,
 ) -> HttpResponse:
-    portfolio: PortfolioSchema = await PortfolioService().get_portfolio(pk)
-    return JsonResponse(portfolio.model_dump())
+    service = PortfolioService(identity_map=get_identity_map(request))
+    portfolio: PortfolioSchema = await service.get_portfolio(pk)
+    return FastJsonResponse(portfolio)
 
 
 @api_view(
@@ -45,38 +63,48 @@ async def create_portfolio(
         request.populated_schema,
         request.user_id,
     )
-    return JsonResponse(portfolio.model_dump())
+    return FastJsonResponse(portfolio)
 
 
 @api_view(
     methods=['DELETE'],
     login_required=True,
-    permissions=[IsPortfolioOwner()],
+    permissions=[
+        IsPortfolioOwner(
+            queryset=Portfolio.objects.active().only('owner_id'),
+        ),
+    ],
 )
 async def delete_portfolio(
     request: AuthenticatedRequest,
     pk: int,
 ) -> HttpResponse:
-    await PortfolioService().delete_portfolio(pk)
-    return JsonResponse({})
+    service = PortfolioService(identity_map=get_identity_map(request))
+    await service.delete_portfolio(pk)
+    return FastJsonResponse({})
 
 
 @api_view(
     methods=['PATCH'],
     login_required=True,
-    permissions=[IsPortfolioOwner()],
+    permissions=[
+        IsPortfolioOwner(
+            queryset=Portfolio.objects.active().only(*PORTFOLIO_FIELDS),
+        ),
+    ],
     request_schema=PortfolioUpdateSchema,
 )
 async def update_portfolio(
     request: AuthenticatedPopulatedSchemaRequest[PortfolioUpdateSchema],
     pk: int,
 ) -> HttpResponse:
-    portfolio = await PortfolioService().update_portfolio(
+    service = PortfolioService(identity_map=get_identity_map(request))
+    portfolio = await service.update_portfolio(
         pk,
         request.populated_schema,
     )
 
-    return JsonResponse(portfolio.model_dump())
+    return FastJsonResponse(portfolio)
 
 
 detail_dispatcher = create_dispatcher(
@@ -86,15 +114,28 @@ detail_dispatcher = create_dispatcher(
 )
 
 
-@api_view(methods=['GET'], login_required=True)
+@api_view(
+    methods=['GET'],
+    login_required=True,
+    read_only=True,
+    cache_response=True,
+)
 async def portfolio_list(request: AuthenticatedRequest) -> HttpResponse:
-    portfolios: PortfolioListSchema = (
-        await PortfolioService().get_user_portfolios(
-            request.user_id,
+    paginator = KeysetPaginator.from_request(request)
+    service = PortfolioService()
+
+    if paginator.stream:
+        return StreamingJsonResponse(
+            'portfolios',
+            service.stream_user_portfolios(request.user_id),
         )
+
+    portfolios: PortfolioListSchema = await service.get_user_portfolios(
+        request.user_id,
+        paginator,
     )
 
-    return JsonResponse(portfolios.model_dump())
+    return FastJsonResponse(portfolios)
 
 
 dispatcher = create_dispatcher(
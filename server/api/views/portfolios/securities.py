@@ -1,7 +1,7 @@
 from http import HTTPStatus
 import logging
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.permissions import IsPortfolioOwner
@@ -11,6 +11,7 @@ from api.typedefs import (
 )
 from api.utils.dispatcher import create_dispatcher
 from schemas.security import (
+    PortfolioSecurityBulkSchema,
     PortfolioSecurityCreateSchema,
     PortfolioSecurityUpdateSchema,
 )
@@ -18,6 +19,7 @@ from services.securities.service import (
     SecurityAlreadyExistsError,
     SecurityService,
 )
+from utils.fast_json import FastJsonResponse
 
 logger = logging.getLogger('api')
 
@@ -49,12 +51,35 @@ async def add_portfolio_security(
             },
         )
 
-        return JsonResponse(
+        return FastJsonResponse(
             {'error': 'security already exists'},
             status=HTTPStatus.BAD_REQUEST,
         )
 
-    return JsonResponse(portfolio_security.model_dump())
+    return FastJsonResponse(portfolio_security)
+
+
+@api_view(
+    login_required=True,
+    permissions=[IsPortfolioOwner(argument_name='portfolio_id')],
+    request_schema=PortfolioSecurityBulkSchema,
+)
+async def apply_portfolio_security_operations(
+    request: AuthenticatedPopulatedSchemaRequest[PortfolioSecurityBulkSchema],
+    portfolio_id: int,
+) -> HttpResponse:
+    results = await SecurityService().apply_portfolio_security_operations(
+        portfolio_id,
+        request.populated_schema.operations,
+    )
+
+    return FastJsonResponse(results)
+
+
+collection_dispatcher = create_dispatcher(
+    post=add_portfolio_security,
+    patch=apply_portfolio_security_operations,
+)
 
 
 @api_view(
@@ -75,7 +100,7 @@ async def update_portfolio_security(
         security_ticker,
     )
 
-    return JsonResponse(portfolio_security.model_dump())
+    return FastJsonResponse(portfolio_security)
 
 
 @api_view(
@@ -100,7 +125,7 @@ async def remove_portfolio_security(
         },
     )
 
-    return JsonResponse({})
+    return FastJsonResponse({})
 
 
 dispatcher = create_dispatcher(
@@ -1,10 +1,12 @@
 import dataclasses
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.typedefs import AuthenticatedPopulatedSchemaRequest
 from services.exchange.stock_markets.moex import MOEX
+from services.exchange.stock_markets.quote_table import quote_table
+from utils.fast_json import FastJsonResponse
 
 
 @dataclasses.dataclass
@@ -21,5 +23,9 @@ async def security_list(
     request: AuthenticatedPopulatedSchemaRequest[TickersSchema],
 ) -> HttpResponse:
     tickers: list[str] = request.populated_schema.tickers
-    securities_from_moex = await MOEX().get_securities(tickers=tickers)
-    return JsonResponse({'securities': securities_from_moex})
+    # Only securities that aren't known yet are requested from MOEX
+    securities, missing_tickers = quote_table.get(tickers)
+    if missing_tickers:
+        securities += await MOEX().get_securities(tickers=missing_tickers)
+
+    return FastJsonResponse({'securities': securities})
@@ -2,7 +2,8 @@ import dataclasses
 import datetime
 
 from django.db import models
-from django.http import HttpResponse, JsonResponse
+from django.db.models import Count, Max
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.typedefs import (
@@ -11,16 +12,19 @@ from api.typedefs import (
 )
 from api.utils import aget_object_or_404_json
 from api.utils.converters import (
-    ModelToDataclassConverter,
     ModelToDictConverter,
+    QuerySetToJsonConverter,
 )
 from api.utils.dispatcher import create_dispatcher
+from api.utils.etag import make_etag
+from api.utils.pagination import KeysetPaginator
 from api.utils.schema_mixins import (
     ValidateIdFieldsMixin,
     ValidateNameSchemaMixin,
 )
 from apps.investment_tables.models import TableSnapshot, TableTemplate
 from apps.portfolios.models import Portfolio
+from utils.fast_json import FastJsonResponse, StreamingJsonResponse
 
 
 @dataclasses.dataclass
@@ -38,20 +42,14 @@ class TableSnapshotSchema:
     template: TableTemplateSchema
 
 
-@api_view(login_required=True)
-async def table_snapshot_list(request: AuthenticatedRequest) -> HttpResponse:
-    user_snapshots: models.QuerySet[TableSnapshot] = (
-        TableSnapshot.objects.select_related('template')
-        .owned_by(request.user_id)
-        .active()
-    )
-
-    converter = ModelToDictConverter(
-        source=user_snapshots,
+def _get_snapshot_converter(
+    source: models.QuerySet[TableSnapshot],
+) -> QuerySetToJsonConverter[TableSnapshot, TableSnapshotSchema]:
+    return QuerySetToJsonConverter(
+        source=source,
         schema=TableSnapshotSchema,
-        many=True,
         fields_map={
-            'template': ModelToDataclassConverter(
+            'template': QuerySetToJsonConverter(
                 schema=TableTemplateSchema,
                 fields_map={
                     field: f'template__{field}'
@@ -61,7 +59,42 @@ async def table_snapshot_list(request: AuthenticatedRequest) -> HttpResponse:
         },
     )
 
-    return JsonResponse({'snapshots': await converter.convert()})
+
+async def _snapshot_list_etag(request: AuthenticatedRequest) -> str:
+    version = await (
+        TableSnapshot.objects.owned_by(request.user_id)
+        .active()
+        .aaggregate(
+            updated_at=Max('updated_at'),
+            template_updated_at=Max('template__updated_at'),
+            count=Count('id'),
+        )
+    )
+    return make_etag(*version.values())
+
+
+@api_view(
+    login_required=True,
+    read_only=True,
+    etag=_snapshot_list_etag,
+    cache_response=True,
+)
+async def table_snapshot_list(request: AuthenticatedRequest) -> HttpResponse:
+    paginator = KeysetPaginator.from_request(request)
+    user_snapshots: models.QuerySet[TableSnapshot] = (
+        TableSnapshot.objects.owned_by(request.user_id).active()
+    )
+
+    if paginator.stream:
+        converter = _get_snapshot_converter(paginator.order(user_snapshots))
+        return StreamingJsonResponse('snapshots', converter.iterate_rows())
+
+    converter = _get_snapshot_converter(paginator.paginate(user_snapshots))
+    page = paginator.get_page(await converter.convert_rows())
+
+    return FastJsonResponse(
+        {'snapshots': page.items, 'next_cursor': page.next_cursor},
+    )
 
 
 @dataclasses.dataclass
@@ -98,7 +131,7 @@ async def create_table_snapshot(
         schema=TableSnapshotSchema,
         skip_fields=('template',),
     )
-    return JsonResponse({'snapshot': await converter.convert()})
+    return FastJsonResponse({'snapshot': await converter.convert()})
 
 
 dispatcher = create_dispatcher(
@@ -1,10 +1,11 @@
 import dataclasses
 
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 
 from api.core.api_view import api_view
 from api.typedefs import AuthenticatedRequest
 from api.utils.converters import ModelToDictConverter
+from utils.fast_json import FastJsonResponse
 
 
 @dataclasses.dataclass
@@ -13,11 +14,11 @@ class UserSchema:
     email: str
 
 
-@api_view(login_required=True)
+@api_view(login_required=True, read_only=True)
 async def me(request: AuthenticatedRequest) -> HttpResponse:
     user = await request.auser()
     converter = ModelToDictConverter(
         source=user,
         schema=UserSchema,
     )
-    return JsonResponse(await converter.convert())
+    return FastJsonResponse(await converter.convert())
@@ -1,7 +1,8 @@
+from collections.abc import Collection
 import logging
 import typing
 
-from django.db import IntegrityError, models
+from django.db import models
 
 from services.exchange.stock_markets.moex import MOEX
 from utils.abstract_models import CreatedUpdatedAbstractModel
@@ -22,30 +23,76 @@ class Security(CreatedUpdatedAbstractModel, models.Model):
         If it doesn't exist, tries to create it from MOEX.
         If both of the attempts falls, raises DoesNotExist.
         """
+        securities = await cls.get_or_try_to_create_many_from_moex((ticker,))
         try:
-            return await cls.objects.aget(ticker=ticker)
-        except cls.DoesNotExist as e:
-            security = await cls.create_from_moex_if_exists(ticker)
-            if security is None:
-                raise e
-
-            return security
+            return securities[ticker]
+        except KeyError as e:
+            raise cls.DoesNotExist() from e
 
     @classmethod
     async def create_from_moex_if_exists(
         cls,
         ticker: str,
     ) -> typing.Optional['Security']:
-        result = list(await MOEX().get_securities(tickers=(ticker,)))
-        if len(result) == 0:
-            return None
+        securities = await cls.create_many_from_moex_if_exist((ticker,))
+        return securities.get(ticker)
 
-        try:
-            security = await cls.objects.acreate(ticker=ticker)
-            logger.info(
-                'Security is created from MOEX',
-                extra={'ticker': ticker},
+    @classmethod
+    async def get_or_try_to_create_many_from_moex(
+        cls,
+        tickers: Collection[str],
+        tickers_to_create: Collection[str] | None = None,
+    ) -> dict[str, 'Security']:
+        """
+        Returns securities by their tickers. The ones missing in db
+        are created if MOEX has them, the rest are left out.
+
+        If tickers_to_create is given, only those of them
+        that are missing in db are created.
+        """
+        securities = {
+            security.ticker: security
+            async for security in cls.objects.filter(ticker__in=tickers)
+        }
+
+        if tickers_to_create is None:
+            tickers_to_create = tickers
+
+        missing_tickers = [
+            ticker for ticker in tickers_to_create if ticker not in securities
+        ]
+        if missing_tickers:
+            securities |= await cls.create_many_from_moex_if_exist(
+                missing_tickers,
             )
-            return security
-        except IntegrityError:
-            return None
+
+        return securities
+
+    @classmethod
+    async def create_many_from_moex_if_exist(
+        cls,
+        tickers: Collection[str],
+    ) -> dict[str, 'Security']:
+        """
+        Creates securities that MOEX has, checking all the tickers
+        with a single request. Securities created concurrently
+        are returned as well.
+        """
+        moex_tickers = await MOEX().get_existing_tickers(tickers)
+        if not moex_tickers:
+            return {}
+
+        await cls.objects.abulk_create(
+            [cls(ticker=ticker) for ticker in moex_tickers],
+            ignore_conflicts=True,
+        )
+        logger.info(
+            'Securities are created from MOEX',
+            extra={'tickers': sorted(moex_tickers)},
+        )
+
+        # Primary keys aren't set when conflicts are ignored
+        return {
+            security.ticker: security
+            async for security in cls.objects.filter(ticker__in=moex_tickers)
+        }
@@ -3,10 +3,12 @@ import typing
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from events.domain_events import TableSnapshotCreated
+from events.outbox import add_events
 from utils.abstract_models import (
     CreatedUpdatedAbstractModel,
 )
-from utils.db_helpers import aatomic
+from utils.db_helpers import arun_atomic
 
 if typing.TYPE_CHECKING:
     from apps.investment_tables.models import TableTemplate
@@ -50,25 +52,42 @@ class TableSnapshot(CreatedUpdatedAbstractModel, models.Model):
         return self.name
 
     @classmethod
-    @aatomic
     async def from_template(
         cls,
         template: 'TableTemplate',
         portfolio: 'Portfolio',
         name: str | None = None,
+    ) -> 'TableSnapshot':
+        return await arun_atomic(
+            cls._create_from_template,
+            template,
+            portfolio,
+            name,
+        )
+
+    @classmethod
+    def _create_from_template(
+        cls,
+        template: 'TableTemplate',
+        portfolio: 'Portfolio',
+        name: str | None,
     ) -> 'TableSnapshot':
         if name is None:
             name = template.name
 
-        snapshot: TableSnapshot = await cls.objects.acreate(
+        snapshot: TableSnapshot = cls.objects.create(
             portfolio=portfolio,
             template=template,
             name=name,
         )
 
-        items_to_add = []
-        async for item in template.items.all():
-            items_to_add.append(item)
-
-        await snapshot.template_items.aadd(*items_to_add, through_defaults={})
+        template_item_ids = list(template.items.values_list('pk', flat=True))
+        snapshot.template_items.add(*template_item_ids, through_defaults={})
+        add_events(
+            TableSnapshotCreated(
+                snapshot_id=snapshot.pk,
+                portfolio_id=portfolio.pk,
+                owner_id=portfolio.owner_id,
+            ),
+        )
         return snapshot
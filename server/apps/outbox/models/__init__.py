@@ -0,0 +1,3 @@
+from .outbox_event import OutboxEvent
+
+__all__ = ('OutboxEvent',)
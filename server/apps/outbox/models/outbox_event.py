@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Domain event saved in the transaction of the change it describes.
+
+    Rows are published to the event bus by OutboxRelay
+    in the order of their ids and deleted once they are sent.
+    """
+
+    subject = models.CharField(max_length=255)
+    payload = models.JSONField()
+    # Process that has applied the event to its caches already
+    origin = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set while a relay is publishing the event,
+    # other relays skip it until then
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f'{self.subject} #{self.pk}'
@@ -19,6 +19,9 @@ class PortfolioQuerySet(models.QuerySet['Portfolio']):
             models.Prefetch(
                 lookup='items',
                 queryset=PortfolioItem.objects.select_related('security').only(
+                    # Prefetch needs the foreign key to match items
+                    # with portfolios, otherwise it's loaded per item
+                    'portfolio_id',
                     'security__ticker',
                     'quantity',
                 ),
@@ -33,6 +36,7 @@ class PortfolioQuerySet(models.QuerySet['Portfolio']):
                 lookup='items',
                 queryset=PortfolioItem.objects.select_related('security')
                 .only(
+                    'portfolio_id',
                     'security__ticker',
                     'quantity',
                 )
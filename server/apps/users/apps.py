@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
+
+    def ready(self) -> None:
+        # Receivers are connected on import, which needs loaded models
+        from apps.users import signals  # noqa: F401, PLC0415
@@ -1,6 +1,5 @@
 import typing
 
-from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 from django.core.exceptions import PermissionDenied
@@ -13,7 +12,9 @@ from apps.users.authentication.jwt import (
     PyJWT,
     PyJWTPayloadChecker,
     TokenPayload,
+    VerifiedTokenCache,
 )
+from apps.users.authentication.user_cache import user_cache
 from apps.users.models import ItableUser
 
 User = get_user_model()
@@ -23,6 +24,9 @@ class JWTAuthenticationBackend(ModelBackend):
     AUTH_HEADER_PREFIX = 'Bearer'
     JWT_FACTORY: JWT = PyJWT()
     JWT_PAYLOAD_CHECKER: JWTPayloadChecker = PyJWTPayloadChecker()
+    # Clients send the same access token until it expires,
+    # so its signature is verified only once
+    VERIFIED_TOKENS = VerifiedTokenCache(maxsize=10_000)
 
     def authenticate(
         self,
@@ -63,6 +67,10 @@ class JWTAuthenticationBackend(ModelBackend):
         return self.get_token_payload(access_token)
 
     def get_token_payload(self, access_token: str) -> TokenPayload:
+        payload = self.VERIFIED_TOKENS.get(access_token)
+        if payload is not None:
+            return payload
+
         try:
             payload: TokenPayload = self.JWT_FACTORY.decode_token(
                 access_token,
@@ -73,7 +81,22 @@ class JWTAuthenticationBackend(ModelBackend):
         if not self.JWT_PAYLOAD_CHECKER.is_active(payload):
             raise PermissionDenied
 
+        self.VERIFIED_TOKENS.add(access_token, payload)
         return payload
 
     async def aget_user(self, user_id: int) -> ItableUser | None:
-        return await sync_to_async(self.get_user)(user_id)
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+
+        version = user_cache.version
+        try:
+            user = await User._default_manager.aget(pk=user_id)
+        except User.DoesNotExist:
+            return None
+
+        if not self.user_can_authenticate(user):
+            return None
+
+        user_cache.set(user, version)
+        return user
@@ -1,2 +1,14 @@
 class InvalidTokenError(Exception):
     pass
+
+
+class PasswordCheckerBusyError(Exception):
+    pass
+
+
+class ClientPasswordChecksLimitError(PasswordCheckerBusyError):
+    pass
+
+
+class SigningKeyIsNotConfiguredError(Exception):
+    pass
@@ -1,12 +1,16 @@
+from collections import OrderedDict
 import datetime as dt
+import hashlib
+import threading
+import time
 import typing
 
 from django.conf import settings
 from django.utils import timezone
-from django.utils.timezone import make_aware
 import jwt
 
 from apps.users.authentication.exceptions import InvalidTokenError
+from apps.users.authentication.keys import get_key_set, JWTKeySet
 
 
 class TokenPayload(typing.TypedDict):
@@ -19,7 +23,8 @@ class AccessTokenPayload(TokenPayload):
 
 
 class RefreshTokenPayload(TokenPayload):
-    pass
+    # ItableUser.refresh_token_version the token was issued with
+    ver: int
 
 
 class TokenPair(typing.NamedTuple):
@@ -28,7 +33,11 @@ class TokenPair(typing.NamedTuple):
 
 
 class JWT(typing.Protocol):
-    def generate_tokens(self, user_id: int) -> TokenPair: ...
+    def generate_tokens(
+        self,
+        user_id: int,
+        refresh_token_version: int,
+    ) -> TokenPair: ...
 
     def decode_token(self, token: str) -> TokenPayload: ...
 
@@ -38,39 +47,63 @@ class JWTPayloadChecker(typing.Protocol):
 
 
 class PyJWT(JWT):
-    __slots__ = ('_algorithm',)
-
-    def __init__(self) -> None:
-        self._algorithm = 'HS256'
-
-    def generate_tokens(self, user_id: int) -> TokenPair:
+    __slots__ = ('_algorithm', '_key_set')
+
+    def __init__(self, key_set: JWTKeySet | None = None) -> None:
+        self._algorithm = 'EdDSA'
+        # Keys from the settings by default, they are loaded on first use
+        self._key_set = key_set
+
+    @property
+    def key_set(self) -> JWTKeySet:
+        return self._key_set or get_key_set()
+
+    def generate_tokens(
+        self,
+        user_id: int,
+        refresh_token_version: int,
+    ) -> TokenPair:
+        access_payload: AccessTokenPayload = {
+            'uid': user_id,
+            'exp': self._get_expiration(settings.ACCESS_TOKEN_TIME_TO_LIVE),
+        }
+        refresh_payload: RefreshTokenPayload = {
+            'uid': user_id,
+            'exp': self._get_expiration(settings.REFRESH_TOKEN_TIME_TO_LIVE),
+            'ver': refresh_token_version,
+        }
         return TokenPair(
-            access_token=self._generate_token(
-                user_id,
-                settings.ACCESS_TOKEN_TIME_TO_LIVE,
-            ),
-            refresh_token=self._generate_token(
-                user_id,
-                settings.REFRESH_TOKEN_TIME_TO_LIVE,
-            ),
+            access_token=self._encode(access_payload),
+            refresh_token=self._encode(refresh_payload),
         )
 
-    def _generate_token(self, user_id: int, ttl: dt.timedelta) -> str:
-        payload: TokenPayload = {
-            'uid': user_id,
-            'exp': (timezone.now() + ttl).timestamp(),
-        }
+    @staticmethod
+    def _get_expiration(ttl: dt.timedelta) -> float:
+        return (timezone.now() + ttl).timestamp()
+
+    def _encode(self, payload: TokenPayload) -> str:
+        key_id, key = self.key_set.signing_key
         return jwt.encode(
             payload=typing.cast(dict[str, typing.Any], payload),
-            key=settings.SECRET_KEY,
+            key=key,
             algorithm=self._algorithm,
+            headers={'kid': key_id},
         )
 
     def decode_token(self, token: str) -> TokenPayload:
         try:
+            key_id = jwt.get_unverified_header(token).get('kid')
+            key = (
+                self.key_set.get_verification_key(key_id)
+                if isinstance(key_id, str)
+                else None
+            )
+            if key is None:
+                raise InvalidTokenError('unknown key')
+
             payload = jwt.decode(
                 jwt=token,
-                key=settings.SECRET_KEY,
+                key=key,
                 algorithms=[self._algorithm],
             )
             return typing.cast(TokenPayload, payload)
@@ -80,6 +113,50 @@ class PyJWT(JWT):
 
 class PyJWTPayloadChecker(JWTPayloadChecker):
     def is_active(self, payload: TokenPayload) -> bool:
-        now = timezone.now()
-        timestamp = payload['exp']
-        return make_aware(dt.datetime.fromtimestamp(timestamp)) >= now
+        return payload['exp'] >= time.time()
+
+
+class VerifiedTokenCache:
+    """
+    Payloads of the tokens that have already been verified.
+
+    Tokens are stored by their digest, so the cache doesn't keep
+    the tokens themselves, and are dropped once they expire.
+    Least recently used tokens are evicted when the cache is full.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._payloads: OrderedDict[bytes, TokenPayload] = OrderedDict()
+        # Backends are used by sync code as well
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> TokenPayload | None:
+        key = self._get_key(token)
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is None:
+                return None
+
+            if payload['exp'] < time.time():
+                del self._payloads[key]
+                return None
+
+            self._payloads.move_to_end(key)
+            return payload
+
+    def add(self, token: str, payload: TokenPayload) -> None:
+        key = self._get_key(token)
+        with self._lock:
+            self._payloads[key] = payload
+            self._payloads.move_to_end(key)
+            if len(self._payloads) > self.maxsize:
+                self._payloads.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._payloads.clear()
+
+    @staticmethod
+    def _get_key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
@@ -0,0 +1,110 @@
+from collections.abc import Mapping
+import functools
+import hashlib
+from pathlib import Path
+import typing
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.users.authentication.exceptions import (
+    SigningKeyIsNotConfiguredError,
+)
+
+
+class JWTKeySet:
+    """
+    Ed25519 keys tokens are signed and verified with, parsed once.
+
+    Tokens name their key in the kid header. During a rotation
+    the new key signs tokens, while the previous one stays here
+    as a verification key until the tokens it has signed expire.
+    A process that only verifies tokens needs no signing key.
+    """
+
+    def __init__(
+        self,
+        verification_keys: Mapping[str, Ed25519PublicKey],
+        signing_key_id: str | None = None,
+        signing_key: Ed25519PrivateKey | None = None,
+    ):
+        self._verification_keys = dict(verification_keys)
+        self._signing_key_id = signing_key_id
+        self._signing_key = signing_key
+        if signing_key_id is not None and signing_key is not None:
+            self._verification_keys[signing_key_id] = signing_key.public_key()
+
+    @property
+    def signing_key(self) -> tuple[str, Ed25519PrivateKey]:
+        if self._signing_key_id is None or self._signing_key is None:
+            raise SigningKeyIsNotConfiguredError
+
+        return self._signing_key_id, self._signing_key
+
+    def get_verification_key(self, key_id: str) -> Ed25519PublicKey | None:
+        return self._verification_keys.get(key_id)
+
+    @classmethod
+    def from_settings(cls) -> typing.Self:
+        """
+        Signing key is read from JWT_SIGNING_KEY_FILE or, if it isn't set,
+        derived from SECRET_KEY. Verification keys are read
+        from the <kid>.pem files in JWT_VERIFICATION_KEYS_DIR.
+        """
+        verification_keys: dict[str, Ed25519PublicKey] = {}
+        if settings.JWT_VERIFICATION_KEYS_DIR:
+            for path in Path(settings.JWT_VERIFICATION_KEYS_DIR).glob('*.pem'):
+                verification_keys[path.stem] = _load_public_key(path)
+
+        if settings.JWT_SIGNING_KEY_FILE:
+            path = Path(settings.JWT_SIGNING_KEY_FILE)
+            return cls(verification_keys, path.stem, _load_private_key(path))
+
+        if settings.SECRET_KEY:
+            signing_key = _derive_private_key(settings.SECRET_KEY)
+            return cls(
+                verification_keys,
+                _get_key_id(signing_key.public_key()),
+                signing_key,
+            )
+
+        return cls(verification_keys)
+
+
+@functools.cache
+def get_key_set() -> JWTKeySet:
+    return JWTKeySet.from_settings()
+
+
+def _load_private_key(path: Path) -> Ed25519PrivateKey:
+    key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+    if not isinstance(key, Ed25519PrivateKey):
+        raise ImproperlyConfigured(f'{path} is not an Ed25519 private key')
+
+    return key
+
+
+def _load_public_key(path: Path) -> Ed25519PublicKey:
+    key = serialization.load_pem_public_key(path.read_bytes())
+    if not isinstance(key, Ed25519PublicKey):
+        raise ImproperlyConfigured(f'{path} is not an Ed25519 public key')
+
+    return key
+
+
+def _derive_private_key(secret: str) -> Ed25519PrivateKey:
+    seed = hashlib.sha256(b'jwt-signing-key:' + secret.encode()).digest()
+    return Ed25519PrivateKey.from_private_bytes(seed)
+
+
+def _get_key_id(public_key: Ed25519PublicKey) -> str:
+    public_bytes = public_key.public_bytes(
+        encoding=serialization.Encoding.Raw,
+        format=serialization.PublicFormat.Raw,
+    )
+    return hashlib.sha256(public_bytes).hexdigest()[:16]
@@ -22,20 +22,21 @@ class JWTAuthenticationMiddleware:
         get_response: Callable[[HttpRequest], Awaitable[HttpResponse]],
     ) -> None:
         self.get_response = get_response
+        self.backend = JWTAuthenticationBackend()
         if iscoroutinefunction(self.get_response):
             markcoroutinefunction(self)
 
     async def __call__(self, request: HttpRequest) -> HttpResponse:
         try:
-            payload: TokenPayload = (
-                JWTAuthenticationBackend().authenticate_from_header(request)
+            payload: TokenPayload = self.backend.authenticate_from_header(
+                request,
             )
             request = typing.cast(AuthenticatedRequest, request)
             request.user_id = payload['uid']
         except PermissionDenied:
             pass
 
-        request.auser = functools.partial(auser, request)
+        request.auser = functools.partial(auser, request, self.backend)
 
         return await self.get_response(request)
 
@@ -46,6 +47,7 @@ class CachedUserRequests(HttpRequest):
 
 async def auser(
     request: HttpRequest | AuthenticatedRequest,
+    backend: JWTAuthenticationBackend,
 ) -> ItableUser | AnonymousUser:
     request = typing.cast(CachedUserRequests, request)
 
@@ -55,7 +57,7 @@ async def auser(
         if not user_id:
             request._acached_user = AnonymousUser()
         else:
-            maybe_user = await JWTAuthenticationBackend().aget_user(user_id)
+            maybe_user = await backend.aget_user(user_id)
             user = AnonymousUser() if maybe_user is None else maybe_user
             request._acached_user = user
 
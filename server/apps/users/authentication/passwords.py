@@ -0,0 +1,111 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+from apps.users.authentication.exceptions import (
+    ClientPasswordChecksLimitError,
+    PasswordCheckerBusyError,
+)
+from apps.users.models import ItableUser
+
+
+class PasswordChecker:
+    """
+    Verifies passwords in its own threads.
+
+    Hashing takes hundreds of milliseconds, so it's kept away
+    from the thread the ORM calls run in. Checks over max_pending,
+    or over max_pending_per_client for a single client,
+    are rejected instead of being queued.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_pending: int,
+        max_pending_per_client: int,
+    ):
+        self.max_pending = max_pending
+        self.max_pending_per_client = max_pending_per_client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='password-checker',
+        )
+        # Only changed in the event loop
+        self._pending = 0
+        self._pending_by_client: Counter[str] = Counter()
+
+    async def acheck(
+        self,
+        user: ItableUser | None,
+        password: str,
+        client: str,
+    ) -> bool:
+        """
+        Without a user the password is hashed anyway, so the response
+        time doesn't tell whether the user exists. A password stored
+        with outdated hasher settings is rehashed and saved.
+        """
+        loop = asyncio.get_running_loop()
+        encoded = None if user is None else user.password
+        self._reserve(client)
+        try:
+            is_correct, new_encoded = await loop.run_in_executor(
+                self._executor,
+                _verify,
+                password,
+                encoded,
+            )
+        finally:
+            self._release(client)
+
+        if user is None or not is_correct:
+            return False
+
+        if new_encoded is not None:
+            user.password = new_encoded
+            await user.asave(update_fields=['password'])
+
+        return True
+
+    def _reserve(self, client: str) -> None:
+        if self._pending >= self.max_pending:
+            raise PasswordCheckerBusyError
+
+        if self._pending_by_client[client] >= self.max_pending_per_client:
+            raise ClientPasswordChecksLimitError
+
+        self._pending += 1
+        self._pending_by_client[client] += 1
+
+    def _release(self, client: str) -> None:
+        self._pending -= 1
+        self._pending_by_client[client] -= 1
+        if not self._pending_by_client[client]:
+            del self._pending_by_client[client]
+
+
+def _verify(password: str, encoded: str | None) -> tuple[bool, str | None]:
+    """Returns whether the password is correct and its new hash, if any."""
+    if encoded is None:
+        make_password(password)
+        return False, None
+
+    needs_rehash = False
+
+    def setter(raw_password: str) -> None:
+        nonlocal needs_rehash
+        needs_rehash = True
+
+    is_correct = check_password(password, encoded, setter)
+    return is_correct, make_password(password) if needs_rehash else None
+
+
+password_checker = PasswordChecker(
+    max_workers=settings.PASSWORD_CHECKER_MAX_WORKERS,
+    max_pending=settings.PASSWORD_CHECKER_MAX_PENDING,
+    max_pending_per_client=settings.PASSWORD_CHECKER_MAX_PENDING_PER_CLIENT,
+)
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import copy
+import threading
+import time
+import typing
+
+from django.conf import settings
+
+if typing.TYPE_CHECKING:
+    from apps.users.models import ItableUser
+
+
+class UserCache:
+    """
+    Users of a single process, loaded by the authentication backend.
+
+    Least recently used users are evicted when the cache is full,
+    users older than ttl are never returned. Saving or deleting a user
+    invalidates them, see apps.users.signals.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._users: OrderedDict[int, tuple[float, 'ItableUser']] = (
+            OrderedDict()
+        )
+        # Changed by every invalidation, see set()
+        self._version = 0
+        # Users are saved by sync code as well
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, user_id: int) -> 'ItableUser | None':
+        """Returns a copy, so the caller is free to change it."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._users[user_id]
+                return None
+
+            self._users.move_to_end(user_id)
+
+        return copy.copy(user)
+
+    def set(self, user: 'ItableUser', version: int) -> None:
+        """
+        Version is the one the cache had before the user was loaded.
+        If anything was invalidated since then, the user
+        could be stale, so it isn't stored.
+        """
+        if not self.enabled:
+            return
+
+        user = copy.copy(user)
+        with self._lock:
+            if version != self._version:
+                return
+
+            self._users[user.pk] = (time.monotonic() + self.ttl, user)
+            self._users.move_to_end(user.pk)
+            if len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._users.clear()
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_IN_SECONDS,
+)
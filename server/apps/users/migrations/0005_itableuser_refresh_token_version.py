@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-19 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_itableuser_refresh_token'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='itableuser',
+            name='refresh_token',
+        ),
+        migrations.AddField(
+            model_name='itableuser',
+            name='refresh_token_version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
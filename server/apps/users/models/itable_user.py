@@ -1,3 +1,4 @@
+import secrets
 import typing
 
 from django.contrib.auth.hashers import make_password
@@ -5,6 +6,9 @@ from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
 from apps.users.authentication.jwt import JWT, PyJWT, TokenPair
+from events.domain_events import UserChanged
+from events.outbox import add_events
+from utils.db_helpers import arun_atomic
 
 
 class ItableUserManager(UserManager['ItableUser']):
@@ -57,7 +61,9 @@ class ItableUserManager(UserManager['ItableUser']):
 class ItableUser(AbstractUser):
     username = None  # type: ignore[assignment]
     email = models.EmailField(unique=True, verbose_name='email', db_index=True)
-    refresh_token = models.CharField(max_length=255, default='', blank=True)
+    # Random id of the only refresh token that is still valid,
+    # it's put into the token, see arotate_tokens()
+    refresh_token_version = models.BigIntegerField(default=0)
 
     objects: typing.ClassVar[UserManager['ItableUser']] = ItableUserManager()
 
@@ -66,14 +72,56 @@ class ItableUser(AbstractUser):
 
     JWT_FABRIC: JWT = PyJWT()
 
-    def can_refresh_tokens(self, refresh_token: str) -> bool:
-        return self.refresh_token == refresh_token
-
     async def generate_new_tokens(self) -> TokenPair:
-        token_pair = self.JWT_FABRIC.generate_tokens(self.pk)
-        await self._set_refresh_token(token_pair.refresh_token)
-        return token_pair
+        """Issues new tokens, the previous refresh token stops working."""
+        version = _new_refresh_token_version()
+        await arun_atomic(_update_refresh_token_version, self.pk, version)
+        self.refresh_token_version = version
+        return self.JWT_FABRIC.generate_tokens(self.pk, version)
+
+    @classmethod
+    async def arotate_tokens(
+        cls,
+        user_id: int,
+        refresh_token_version: int,
+    ) -> TokenPair | None:
+        """
+        Issues new tokens if the refresh token with the given version
+        is still valid, otherwise returns None.
+
+        The check and the rotation are a single UPDATE, so the user
+        isn't loaded and only one of concurrent refreshes succeeds.
+        """
+        version = _new_refresh_token_version()
+        is_rotated = await arun_atomic(
+            _update_refresh_token_version,
+            user_id,
+            version,
+            refresh_token_version=refresh_token_version,
+            is_active=True,
+        )
+        if not is_rotated:
+            return None
+
+        return cls.JWT_FABRIC.generate_tokens(user_id, version)
+
+
+def _update_refresh_token_version(
+    user_id: int,
+    version: int,
+    **filters: typing.Any,
+) -> bool:
+    updated_count = ItableUser.objects.filter(pk=user_id, **filters).update(
+        refresh_token_version=version,
+    )
+    if not updated_count:
+        return False
+
+    # UPDATE doesn't send post_save, so cached users are dropped here
+    add_events(UserChanged(user_id=user_id))
+    return True
+
 
-    async def _set_refresh_token(self, refresh_token: str) -> None:
-        self.refresh_token = refresh_token
-        await self.asave(update_fields=['refresh_token'])
+def _new_refresh_token_version() -> int:
+    # 0 is the default, which no issued token has
+    return secrets.randbelow(2**63 - 1) + 1
@@ -0,0 +1,19 @@
+import typing
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.authentication.user_cache import user_cache
+from apps.users.models import ItableUser
+
+
+@receiver(post_save, sender=ItableUser)
+@receiver(post_delete, sender=ItableUser)
+def invalidate_cached_user(
+    sender: type[ItableUser],
+    instance: ItableUser,
+    **kwargs: typing.Any,
+) -> None:
+    # Token rotation is an UPDATE without signals,
+    # it drops the cached user itself, see ItableUser.arotate_tokens()
+    user_cache.invalidate(instance.pk)
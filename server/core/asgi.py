@@ -1,5 +1,6 @@
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager, AsyncExitStack
+import functools
 import logging
 import os
 import typing
@@ -9,7 +10,12 @@ from django.conf import settings
 from django.core.asgi import get_asgi_application
 import uvicorn
 
-from utils.asgi.middlewares import LifespanMiddleware
+from utils.asgi.leader_election import (
+    AdvisoryLockLeaderElection,
+    FileLockLeaderElection,
+)
+from utils.asgi.middlewares import BodySizeLimitMiddleware, LifespanMiddleware
+from utils.db_helpers.pool_metrics import report_pool_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -20,44 +26,103 @@ app = typing.cast(ASGI3Application, get_asgi_application())
 
 @asynccontextmanager
 async def lifespan() -> AsyncIterator[None]:
-    from events.event_bus import EventBus
-    from tasks.scheduler import run_background_tasks
+    # These modules import models, so they can't be imported
+    # before get_asgi_application() has set up Django
+    from events.consumer_metrics import (  # noqa: PLC0415
+        report_consumer_metrics,
+    )
+    from events.event_bus import EventBus  # noqa: PLC0415
+    from events.outbox import run_outbox_relay  # noqa: PLC0415
+    from tasks.scheduler import run_background_tasks  # noqa: PLC0415
 
     contexts = []
 
+    # Background tasks call upstream APIs, so they run once
+    # in the whole cluster. Only host leaders compete for the lock,
+    # so every host holds a single database session for it.
     if settings.RUN_BACKGROUND_TASKS:
-        contexts.append(run_background_tasks)
+        cluster_leader_election = AdvisoryLockLeaderElection(
+            settings.CLUSTER_LEADER_LOCK_ID,
+            [run_background_tasks],
+        )
+        contexts.append(cluster_leader_election.run)
 
+    # Relays of different hosts claim different batches of the outbox
     if settings.HANDLE_EVENTS:
-        contexts.append(EventBus.handle_events)
+        contexts.append(
+            functools.partial(
+                run_outbox_relay,
+                batch_size=settings.OUTBOX_RELAY_BATCH_SIZE,
+                interval=settings.OUTBOX_RELAY_INTERVAL_IN_SECONDS,
+                metrics_interval=settings.OUTBOX_METRICS_INTERVAL_IN_SECONDS,
+            ),
+        )
 
+    # With several workers these contexts must run only once per host,
+    # so they are entered by the elected leader.
+    leader_election = FileLockLeaderElection(
+        settings.LEADER_LOCK_PATH,
+        contexts,
+    )
     async with AsyncExitStack() as stack:
-        for context in contexts:
-            await stack.enter_async_context(context())
+        # Every worker keeps its own caches, so every worker
+        # has to get the domain events that invalidate them.
+        # It's entered first, so leader tasks can publish until they stop.
+        if settings.HANDLE_EVENTS:
+            await stack.enter_async_context(EventBus.handle_events())
+
+            if settings.EVENTS_METRICS_INTERVAL_IN_SECONDS > 0:
+                await stack.enter_async_context(
+                    report_consumer_metrics(
+                        settings.EVENTS_METRICS_INTERVAL_IN_SECONDS,
+                    ),
+                )
+
+        await stack.enter_async_context(leader_election.run())
+
+        # Every worker has its own connection pool
+        if settings.DATABASE_POOL_METRICS_INTERVAL_IN_SECONDS > 0:
+            await stack.enter_async_context(
+                report_pool_metrics(
+                    settings.DATABASE_POOL_METRICS_INTERVAL_IN_SECONDS,
+                ),
+            )
 
         yield
 
 
 app = LifespanMiddleware(
-    app,
+    BodySizeLimitMiddleware(
+        app,
+        max_body_size=settings.DATA_UPLOAD_MAX_MEMORY_SIZE,
+    ),
     lifespan=lifespan,
 )
 
 
 def main() -> None:
-    config = uvicorn.Config(
-        app='asgi:app',
-        loop='uvloop',
-        lifespan='on',
-        timeout_graceful_shutdown=10,
-        host='127.0.0.1' if settings.DEBUG else '0.0.0.0',
-        port=8000,
-        proxy_headers=True,
-    )
-    server = uvicorn.Server(config)
-
+    # With several workers uvicorn pre-forks them on a shared socket
+    # and replaces the ones that exit. A single worker runs without
+    # the supervisor, so it would just exit after ASGI_MAX_REQUESTS.
+    # SIGHUP makes the supervisor replace the workers one by one,
+    # each new worker is ready before the old one is stopped, so
+    # a deploy sends SIGHUP instead of restarting the server.
+    workers = settings.ASGI_WORKERS
+    limit_max_requests = settings.ASGI_MAX_REQUESTS if workers > 1 else None
     try:
-        server.run()
+        uvicorn.run(
+            app='asgi:app',
+            loop='uvloop',
+            lifespan='on',
+            timeout_graceful_shutdown=10,
+            host='127.0.0.1' if settings.DEBUG else '0.0.0.0',
+            port=8000,
+            proxy_headers=True,
+            forwarded_allow_ips=settings.FORWARDED_ALLOW_IPS,
+            workers=workers,
+            limit_max_requests=limit_max_requests,
+            limit_max_requests_jitter=settings.ASGI_MAX_REQUESTS_JITTER,
+        )
     except KeyboardInterrupt:
         logger.info(
             'Keyboard interrupt received, ASGI server has been shut down',
@@ -1,9 +1,11 @@
 from collections.abc import Sequence
+import copy
 import datetime
 import logging
 import os
 from pathlib import Path
 import sys
+import tempfile
 
 from dotenv import load_dotenv
 
@@ -30,6 +32,7 @@ INSTALLED_APPS = [
     'apps.investment_tables.apps.InvestmentTablesConfig',
     'apps.portfolios.apps.PortfolioConfig',
     'apps.exchange.apps.ExchangeConfig',
+    'apps.outbox.apps.OutboxConfig',
     'api.apps.ApiConfig',
 ]
 
@@ -61,6 +64,26 @@ TEMPLATES = [
     },
 ]
 
+# Every worker process keeps its own psycopg connection pool.
+# Connections are returned to the pool when Django closes them,
+# so CONN_MAX_AGE must stay 0.
+DATABASE_POOL_ENABLED = (
+    os.getenv('POSTGRES_POOL_ENABLED', 'y').lower() in TRUE_VALUES
+)
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', '10')),
+    # How long a client waits for a free connection before an error
+    'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', '10')),
+    'max_idle': float(os.getenv('POSTGRES_POOL_MAX_IDLE', '600')),
+    'max_lifetime': float(os.getenv('POSTGRES_POOL_MAX_LIFETIME', '3600')),
+}
+# Pool metrics are logged by every worker with this interval.
+# Zero disables reporting.
+DATABASE_POOL_METRICS_INTERVAL_IN_SECONDS = int(
+    os.getenv('POSTGRES_POOL_METRICS_INTERVAL_IN_SECONDS', '60'),
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -69,9 +92,73 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'),
         'PORT': os.getenv('POSTGRES_PORT'),
+        # With the pool enabled connections are checked
+        # before they are handed out.
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': DATABASE_POOL_OPTIONS if DATABASE_POOL_ENABLED else False,
+        },
     },
 }
 
+# Read-only views read from the replica when it's configured.
+# In tests it's the same database as the default one.
+if DATABASE_REPLICA_HOST := os.getenv('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = copy.deepcopy(DATABASES['default']) | {
+        'HOST': DATABASE_REPLICA_HOST,
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', os.getenv('POSTGRES_PORT')),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['utils.db_helpers.replica.ReplicaRouter']
+# After a write the client reads from the default database for this long,
+# so the replication lag doesn't hide the user's own changes.
+# The client keeps the mark in a signed cookie.
+DATABASE_REPLICA_STICKINESS_IN_SECONDS = int(
+    os.getenv('POSTGRES_REPLICA_STICKINESS_IN_SECONDS', '10'),
+)
+
+# Larger request bodies are rejected with 413 while they are being read,
+# see BodySizeLimitMiddleware. It has to stay below
+# FILE_UPLOAD_MAX_MEMORY_SIZE, so Django keeps bodies in memory.
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(
+    os.getenv('DATA_UPLOAD_MAX_MEMORY_SIZE', str(1024 * 1024)),
+)
+
+# Per-process cache of read endpoint responses, see api_view(cache_response).
+# Writes invalidate it right away in the worker that made them
+# and through the event bus when it's running. Other workers
+# can serve an older response until it expires.
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv('RESPONSE_CACHE_MAX_SIZE', '4096'))
+RESPONSE_CACHE_TTL_IN_SECONDS = float(
+    os.getenv('RESPONSE_CACHE_TTL_IN_SECONDS', '5'),
+)
+
+# Per-process cache of authenticated users, see UserCache.
+# Saving a user invalidates them only in the worker that saved them,
+# the other ones can use the older user until it expires.
+USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '4096'))
+USER_CACHE_TTL_IN_SECONDS = float(
+    os.getenv('USER_CACHE_TTL_IN_SECONDS', '5'),
+)
+
+# Logins hash passwords in these threads, see PasswordChecker.
+# Checks over the limits are rejected right away.
+PASSWORD_CHECKER_MAX_WORKERS = int(
+    os.getenv('PASSWORD_CHECKER_MAX_WORKERS', '2'),
+)
+PASSWORD_CHECKER_MAX_PENDING = int(
+    os.getenv('PASSWORD_CHECKER_MAX_PENDING', '32'),
+)
+PASSWORD_CHECKER_MAX_PENDING_PER_CLIENT = int(
+    os.getenv('PASSWORD_CHECKER_MAX_PENDING_PER_CLIENT', '2'),
+)
+
+# X-Forwarded-For is trusted only from these addresses (comma separated),
+# the client address is taken from it, see PASSWORD_CHECKER_*.
+# Set it to the address of the reverse proxy.
+FORWARDED_ALLOW_IPS = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation'
@@ -123,8 +210,76 @@ RUN_BACKGROUND_TASKS = (
     os.getenv('RUN_BACKGROUND_TASKS', 'n').lower() in TRUE_VALUES
 )
 
+# Number of ASGI worker processes sharing the same socket.
+# Zero means "one worker per available CPU".
+ASGI_WORKERS = int(os.getenv('ASGI_WORKERS', '1' if DEBUG else '0')) or (
+    os.process_cpu_count() or 1
+)
+# Worker is replaced after handling this many requests,
+# which bounds its memory growth. Zero disables recycling.
+# Ignored with a single worker: there is no supervisor to replace it.
+ASGI_MAX_REQUESTS = int(os.getenv('ASGI_MAX_REQUESTS', '0')) or None
+# Up to this many requests are added to the limit of each worker,
+# so the workers aren't recycled at the same time.
+# A tenth of ASGI_MAX_REQUESTS by default.
+ASGI_MAX_REQUESTS_JITTER = int(
+    os.getenv('ASGI_MAX_REQUESTS_JITTER', str((ASGI_MAX_REQUESTS or 0) // 10)),
+)
+# Only the worker holding this lock runs the outbox relay of the host.
+LEADER_LOCK_PATH = os.getenv(
+    'LEADER_LOCK_PATH',
+    str(Path(tempfile.gettempdir()) / 'itable-leader.lock'),
+)
+# Id of the Postgres advisory lock held by the only worker of the cluster
+# that runs background tasks, e.g. fetches quotes.
+CLUSTER_LEADER_LOCK_ID = int(
+    os.getenv('CLUSTER_LEADER_LOCK_ID', '428913750'),
+)
+
 NATS_URL = os.getenv('NATS_URL', '')
 HANDLE_EVENTS = os.getenv('HANDLE_EVENTS', 'n').lower() in TRUE_VALUES
+# Domain events are kept in a JetStream stream and read by durable
+# consumers, so a process gets the events sent while it was disconnected
+EVENTS_JETSTREAM = os.getenv('EVENTS_JETSTREAM', 'n').lower() in TRUE_VALUES
+EVENTS_STREAM_NAME = os.getenv('EVENTS_STREAM_NAME', 'domain-events')
+EVENTS_STREAM_MAX_AGE_IN_SECONDS = int(
+    os.getenv('EVENTS_STREAM_MAX_AGE_IN_SECONDS', str(24 * 60 * 60)),
+)
+EVENTS_STREAM_DUPLICATE_WINDOW_IN_SECONDS = int(
+    os.getenv('EVENTS_STREAM_DUPLICATE_WINDOW_IN_SECONDS', '120'),
+)
+# Must be unique for every process, e.g. a pod name with a single worker
+EVENTS_CONSUMER_NAME = os.getenv('EVENTS_CONSUMER_NAME', '')
+EVENTS_CONSUMER_INACTIVE_THRESHOLD_IN_SECONDS = int(
+    os.getenv('EVENTS_CONSUMER_INACTIVE_THRESHOLD_IN_SECONDS', '3600'),
+)
+EVENTS_PULL_BATCH_SIZE = int(os.getenv('EVENTS_PULL_BATCH_SIZE', '100'))
+EVENTS_METRICS_INTERVAL_IN_SECONDS = int(
+    os.getenv('EVENTS_METRICS_INTERVAL_IN_SECONDS', '60'),
+)
+OUTBOX_RELAY_BATCH_SIZE = int(os.getenv('OUTBOX_RELAY_BATCH_SIZE', '500'))
+OUTBOX_RELAY_INTERVAL_IN_SECONDS = float(
+    os.getenv('OUTBOX_RELAY_INTERVAL_IN_SECONDS', '0.5'),
+)
+OUTBOX_METRICS_INTERVAL_IN_SECONDS = int(
+    os.getenv('OUTBOX_METRICS_INTERVAL_IN_SECONDS', '60'),
+)
+
+# Quotes are fetched by the scheduler leader and published to every worker
+QUOTES_REFRESH_INTERVAL_IN_SECONDS = int(
+    os.getenv('QUOTES_REFRESH_INTERVAL_IN_SECONDS', '60'),
+)
+QUOTES_MAX_AGE_IN_SECONDS = int(
+    os.getenv('QUOTES_MAX_AGE_IN_SECONDS', '180'),
+)
+QUOTES_BATCH_SIZE = int(os.getenv('QUOTES_BATCH_SIZE', '200'))
+
+# Whether this process runs procedures sent by the others, see events.rpc
+SERVE_RPC = os.getenv('SERVE_RPC', 'n').lower() in TRUE_VALUES
+RPC_TIMEOUT_IN_SECONDS = float(os.getenv('RPC_TIMEOUT_IN_SECONDS', '10'))
+RPC_MAX_PENDING_CALLS = int(os.getenv('RPC_MAX_PENDING_CALLS', '64'))
+RPC_MAX_WORKERS = int(os.getenv('RPC_MAX_WORKERS', '1'))
+RPC_MAX_PENDING = int(os.getenv('RPC_MAX_PENDING', '8'))
 
 ACCESS_TOKEN_TIME_TO_LIVE = datetime.timedelta(
     minutes=int(os.getenv('ACCESS_TOKEN_TIME_TO_LIVE_IN_MINUTES', '10')),
@@ -132,3 +287,11 @@ ACCESS_TOKEN_TIME_TO_LIVE = datetime.timedelta(
 REFRESH_TOKEN_TIME_TO_LIVE = datetime.timedelta(
     days=int(os.getenv('REFRESH_TOKEN_TIME_TO_LIVE_IN_DAYS', '30')),
 )
+
+# Tokens are signed with the Ed25519 private key from this PEM file,
+# its name without the extension is the key id. Without it, the key
+# is derived from SECRET_KEY.
+JWT_SIGNING_KEY_FILE = os.getenv('JWT_SIGNING_KEY_FILE')
+# <key id>.pem public keys accepted along with the signing key,
+# for example the previous one during a rotation
+JWT_VERIFICATION_KEYS_DIR = os.getenv('JWT_VERIFICATION_KEYS_DIR')
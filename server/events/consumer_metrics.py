@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from contextlib import asynccontextmanager
+import logging
+
+from django.conf import settings
+
+from events.consumer_stats import (
+    consumer_stats,
+    ConsumerMetrics,
+    DOMAIN_EVENTS_CONSUMER,
+)
+from events.event_bus import EventBus, Status
+from events.streams import get_durable_consumer_name
+
+logger = logging.getLogger('events.consumers')
+
+
+async def get_consumer_metrics() -> list[ConsumerMetrics]:
+    metrics = {
+        consumer_metrics['consumer']: consumer_metrics
+        for consumer_metrics in consumer_stats.pop()
+    }
+    if settings.EVENTS_JETSTREAM and EventBus.status == Status.RUNNING:
+        domain_events_metrics = metrics.setdefault(
+            DOMAIN_EVENTS_CONSUMER,
+            {
+                'consumer': DOMAIN_EVENTS_CONSUMER,
+                'processed': 0,
+                'failed': 0,
+                'processing_ms': 0,
+                'max_processing_ms': 0,
+            },
+        )
+        info = await EventBus.get_consumer_info(get_durable_consumer_name())
+        domain_events_metrics['lag'] = info.num_pending or 0
+        domain_events_metrics['ack_pending'] = info.num_ack_pending or 0
+        domain_events_metrics['redelivered'] = info.num_redelivered or 0
+
+    return list(metrics.values())
+
+
+@asynccontextmanager
+async def report_consumer_metrics(
+    interval_in_seconds: float,
+) -> AsyncIterator[None]:
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(interval_in_seconds)
+            try:
+                consumers = await get_consumer_metrics()
+            except Exception:
+                logger.exception('Failed to collect consumer metrics')
+                continue
+
+            for metrics in consumers:
+                logger.info('Event consumer metrics', extra=dict(metrics))
+
+    task = asyncio.create_task(report())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
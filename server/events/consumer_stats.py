@@ -0,0 +1,79 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+import dataclasses
+import time
+import typing
+
+# Consumers of this process, see events.handlers
+DOMAIN_EVENTS_CONSUMER = 'domain-events'
+QUOTES_CONSUMER = 'quotes'
+
+
+class ConsumerMetrics(typing.TypedDict):
+    consumer: str
+    # Since the previous call
+    processed: int
+    failed: int
+    processing_ms: int
+    max_processing_ms: int
+    # Only for the consumers of a durable stream, see EVENTS_JETSTREAM:
+    # messages the consumer hasn't got yet
+    lag: typing.NotRequired[int]
+    # got, but not acknowledged yet
+    ack_pending: typing.NotRequired[int]
+    # delivered more than once
+    redelivered: typing.NotRequired[int]
+
+
+@dataclasses.dataclass
+class _Counters:
+    processed: int = 0
+    failed: int = 0
+    processing_seconds: float = 0
+    max_processing_seconds: float = 0
+
+
+class ConsumerStats:
+    """Processing time of the messages handled by this process."""
+
+    def __init__(self) -> None:
+        self._counters: dict[str, _Counters] = {}
+
+    @contextmanager
+    def measure(self, consumer: str) -> Iterator[None]:
+        counters = self._counters.setdefault(consumer, _Counters())
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            counters.failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            counters.processed += 1
+            counters.processing_seconds += elapsed
+            counters.max_processing_seconds = max(
+                counters.max_processing_seconds,
+                elapsed,
+            )
+
+    def pop(self) -> list[ConsumerMetrics]:
+        """Counters are reset on every call, like in get_pool_metrics."""
+        counters, self._counters = self._counters, {}
+        return [
+            {
+                'consumer': consumer,
+                'processed': consumer_counters.processed,
+                'failed': consumer_counters.failed,
+                'processing_ms': round(
+                    consumer_counters.processing_seconds * 1000,
+                ),
+                'max_processing_ms': round(
+                    consumer_counters.max_processing_seconds * 1000,
+                ),
+            }
+            for consumer, consumer_counters in counters.items()
+        ]
+
+
+consumer_stats = ConsumerStats()
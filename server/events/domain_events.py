@@ -0,0 +1,99 @@
+import os
+import typing
+import uuid
+
+from pydantic import BaseModel
+
+from apps.users.authentication.user_cache import user_cache
+from utils.cache import response_cache
+
+DOMAIN_EVENTS_SUBJECT_PREFIX = 'domain'
+
+ORIGIN_HEADER = 'origin'
+# Tells the events of this process apart from the ones of the others,
+# pid alone could be reused by a restarted worker
+PROCESS_ID = f'{os.getpid()}-{uuid.uuid4().hex}'
+
+
+class DomainEvent(BaseModel):
+    """
+    Something that has happened to the data and is already committed.
+
+    Events are published to the subject of their type, every process
+    applies them to its own caches, see apply_domain_event.
+    """
+
+    SUBJECT: typing.ClassVar[str]
+
+
+class PortfolioChanged(DomainEvent):
+    """Portfolio has been created, renamed or deleted."""
+
+    SUBJECT = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.portfolio.changed'
+
+    portfolio_id: int
+    owner_id: int
+
+
+class PortfolioSecuritiesChanged(DomainEvent):
+    SUBJECT = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.portfolio_securities.changed'
+
+    portfolio_id: int
+    owner_id: int
+
+
+class TableSnapshotCreated(DomainEvent):
+    SUBJECT = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.table_snapshot.created'
+
+    snapshot_id: int
+    portfolio_id: int
+    owner_id: int
+
+
+class IndexSynced(DomainEvent):
+    """Content of the index table template has been synchronized."""
+
+    SUBJECT = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.index.synced'
+
+    template_slug: str
+
+
+class UserChanged(DomainEvent):
+    """User has been changed without a save, e.g. tokens were rotated."""
+
+    SUBJECT = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.user.changed'
+
+    user_id: int
+
+
+EVENT_TYPES: dict[str, type[DomainEvent]] = {
+    event_type.SUBJECT: event_type
+    for event_type in (
+        PortfolioChanged,
+        PortfolioSecuritiesChanged,
+        TableSnapshotCreated,
+        IndexSynced,
+        UserChanged,
+    )
+}
+
+
+def apply_domain_event(event: DomainEvent) -> None:
+    """Drops the data of this process the event has made stale."""
+    match event:
+        case (
+            PortfolioChanged(owner_id=owner_id)
+            | PortfolioSecuritiesChanged(owner_id=owner_id)
+            | TableSnapshotCreated(owner_id=owner_id)
+        ):
+            response_cache.invalidate_user(owner_id)
+        case UserChanged(user_id=user_id):
+            user_cache.invalidate(user_id)
+        case _:
+            # No cached data depends on it yet
+            pass
+
+
+def is_own_event(headers: typing.Mapping[str, str]) -> bool:
+    """Whether the event has been published by this process."""
+    return headers.get(ORIGIN_HEADER) == PROCESS_ID
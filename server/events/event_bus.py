@@ -1,5 +1,5 @@
 import asyncio
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Iterable
 from contextlib import asynccontextmanager
 from enum import auto, Enum
 import logging
@@ -8,9 +8,13 @@ from typing import ClassVar
 from django.conf import settings
 from faststream import FastStream
 from faststream.nats import NatsBroker
+from faststream.nats.message import NatsMessage
 from faststream.types import DecodedMessage, SendableMessage
+from nats.aio.client import Client
+from nats.js.api import ConsumerInfo
 
-from events.handlers import router
+from events.handlers import create_domain_events_router, router
+from events.procedures import procedures_router
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,8 @@ class EventBus:
 
     status: ClassVar[Status] = Status.STOPPED
     broker: ClassVar[NatsBroker | None] = None
+    # Client of the broker, for what the broker doesn't expose
+    connection: ClassVar[Client | None] = None
 
     @classmethod
     async def publish(
@@ -51,6 +57,102 @@ class EventBus:
             reply_to=reply_to,
         )
 
+    @classmethod
+    async def request(
+        cls,
+        message: SendableMessage,
+        subject: str,
+        headers: dict[str, str] | None = None,
+        time_limit: float = 0.5,
+    ) -> NatsMessage:
+        """Waits for the reply of a single subscriber."""
+        if cls.status != Status.RUNNING:
+            raise EventBusIsNotRunningError()
+
+        assert cls.broker is not None
+
+        return await cls.broker.request(
+            message=message,
+            subject=subject,
+            headers=headers,
+            timeout=time_limit,
+        )
+
+    @classmethod
+    async def get_consumer_info(cls, consumer: str) -> ConsumerInfo:
+        """Returns the state of the consumer of the domain events stream."""
+        if cls.status != Status.RUNNING:
+            raise EventBusIsNotRunningError()
+
+        assert cls.broker is not None
+        assert cls.broker.stream is not None
+
+        return await cls.broker.stream.consumer_info(
+            settings.EVENTS_STREAM_NAME,
+            consumer,
+        )
+
+    @classmethod
+    async def publish_batch(
+        cls,
+        messages: Iterable[tuple[SendableMessage, str, dict[str, str]]],
+        stream: str | None = None,
+    ) -> list[bool]:
+        """
+        Publishes (message, subject, headers) tuples.
+
+        Returns whether each message was accepted. Core NATS publishing
+        only buffers the messages, so the batch is flushed and accepted
+        as a whole once the broker has answered the PING sent after it,
+        otherwise an error is raised. With a stream, messages are
+        published concurrently and each one is accepted once the stream
+        has acknowledged it.
+        """
+        if cls.status != Status.RUNNING:
+            raise EventBusIsNotRunningError()
+
+        assert cls.broker is not None
+        assert cls.connection is not None
+
+        if stream is None:
+            count = 0
+            for message, subject, headers in messages:
+                await cls.broker.publish(
+                    message=message,
+                    subject=subject,
+                    headers=headers,
+                )
+                count += 1
+
+            await cls.connection.flush()
+            return [True] * count
+
+        results = await asyncio.gather(
+            *(
+                cls.broker.publish(
+                    message=message,
+                    subject=subject,
+                    headers=headers,
+                    stream=stream,
+                )
+                for message, subject, headers in messages
+            ),
+            return_exceptions=True,
+        )
+        failures = [
+            result for result in results if isinstance(result, BaseException)
+        ]
+        if failures:
+            logger.warning(
+                '%d of %d messages were not acknowledged by the stream %s',
+                len(failures),
+                len(results),
+                stream,
+                exc_info=failures[0],
+            )
+
+        return [not isinstance(result, BaseException) for result in results]
+
     @classmethod
     @asynccontextmanager
     async def handle_events(cls) -> AsyncIterator[None]:
@@ -59,10 +161,15 @@ class EventBus:
 
         cls.broker = NatsBroker(settings.NATS_URL, logger=logger)
         cls.broker.include_router(router)
+        cls.broker.include_router(create_domain_events_router())
+        if settings.SERVE_RPC:
+            cls.broker.include_router(procedures_router)
 
         app = FastStream(cls.broker, logger=logger)
 
         async with asyncio.timeout(cls.START_TIMEOUT_IN_SECONDS):
+            # The broker reuses the connection when it's started
+            cls.connection = await cls.broker.connect()
             await app.start()
 
         cls.status = Status.RUNNING
@@ -78,4 +185,5 @@ class EventBus:
                 await app.stop()
             finally:
                 logger.info('FastStream app is stopped')
+                cls.connection = None
                 cls.status = Status.STOPPED
@@ -1,6 +1,23 @@
 import logging
+import typing
 
-from faststream.nats import NatsRouter
+from django.conf import settings
+from faststream.nats import ConsumerConfig, DeliverPolicy, NatsRouter, PullSub
+from faststream.nats.annotations import NatsMessage
+
+from events.consumer_stats import (
+    consumer_stats,
+    DOMAIN_EVENTS_CONSUMER,
+    QUOTES_CONSUMER,
+)
+from events.domain_events import (
+    apply_domain_event,
+    DOMAIN_EVENTS_SUBJECT_PREFIX,
+    EVENT_TYPES,
+    is_own_event,
+)
+from events.quotes import apply_quotes, QUOTES_SUBJECT, QuotesRefreshed
+from events.streams import get_domain_events_stream, get_durable_consumer_name
 
 logger = logging.getLogger(__name__)
 
@@ -10,3 +27,65 @@ router = NatsRouter()
 @router.subscriber('ping')
 async def ping() -> None:
     logger.info('Received ping event')
+
+
+async def handle_domain_event(
+    body: dict[str, typing.Any],
+    message: NatsMessage,
+) -> None:
+    # The publisher has applied it already
+    if is_own_event(message.headers):
+        return
+
+    subject = message.raw_message.subject
+    event_type = EVENT_TYPES.get(subject)
+    if event_type is None:
+        logger.warning('Unknown domain event', extra={'subject': subject})
+        return
+
+    with consumer_stats.measure(DOMAIN_EVENTS_CONSUMER):
+        apply_domain_event(event_type.model_validate(body))
+
+
+def create_domain_events_router() -> NatsRouter:
+    """
+    Every process gets every domain event. By default they come
+    through core NATS, so events sent while the process is disconnected
+    are lost. With EVENTS_JETSTREAM they are kept in a stream and read
+    in batches by a durable consumer of the process, which acknowledges
+    them once they are applied and gets the missed ones on reconnect.
+    """
+    domain_events_router = NatsRouter()
+    subject = f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.>'
+
+    if settings.EVENTS_JETSTREAM:
+        subscriber = domain_events_router.subscriber(
+            subject,
+            stream=get_domain_events_stream(),
+            durable=get_durable_consumer_name(),
+            pull_sub=PullSub(batch_size=settings.EVENTS_PULL_BATCH_SIZE),
+            config=ConsumerConfig(
+                # A new consumer comes with the empty caches
+                # of a new process, so older events aren't needed
+                deliver_policy=DeliverPolicy.NEW,
+                inactive_threshold=(
+                    settings.EVENTS_CONSUMER_INACTIVE_THRESHOLD_IN_SECONDS
+                ),
+            ),
+        )
+    else:
+        # Without a queue group every process gets every event
+        subscriber = domain_events_router.subscriber(subject)
+
+    subscriber(handle_domain_event)
+    return domain_events_router
+
+
+@router.subscriber(QUOTES_SUBJECT)
+async def handle_quotes(body: QuotesRefreshed, message: NatsMessage) -> None:
+    # The publisher has applied them already
+    if is_own_event(message.headers):
+        return
+
+    with consumer_stats.measure(QUOTES_CONSUMER):
+        apply_quotes(body)
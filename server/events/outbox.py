@@ -0,0 +1,235 @@
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from contextlib import asynccontextmanager
+import datetime as dt
+import logging
+import time
+import typing
+
+from asgiref.sync import sync_to_async, ThreadSensitiveContext
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.db.models.functions import Now
+
+from apps.outbox.models import OutboxEvent
+from events.domain_events import (
+    apply_domain_event,
+    DomainEvent,
+    ORIGIN_HEADER,
+    PROCESS_ID,
+)
+from events.event_bus import EventBus
+from events.streams import MESSAGE_ID_HEADER
+from utils.db_helpers import AsyncAtomic
+
+logger = logging.getLogger('events.outbox')
+
+
+def add_events(*events: DomainEvent) -> None:
+    """
+    Saves the events to the outbox. Must be called in the transaction
+    of the change, so the events are sent if and only if it's committed.
+
+    This process applies the events right after the commit,
+    the others get them from OutboxRelay. Without the event bus
+    there is no relay, so the events are only applied locally.
+    """
+    if settings.HANDLE_EVENTS:
+        OutboxEvent.objects.bulk_create(
+            [
+                OutboxEvent(
+                    subject=event.SUBJECT,
+                    payload=event.model_dump(mode='json'),
+                    origin=PROCESS_ID,
+                )
+                for event in events
+            ],
+        )
+
+    for event in events:
+        transaction.on_commit(
+            lambda event=event: apply_domain_event(event),  # type: ignore[misc]
+        )
+
+
+class OutboxRelayMetrics(typing.TypedDict):
+    # Since the previous call
+    relayed: int
+    batches: int
+    failures: int
+    publish_ms: int
+    relayed_per_second: float
+    # Events waiting in the outbox right now
+    backlog: int
+
+
+class OutboxRelay:
+    """
+    Publishes the outbox to the event bus.
+
+    Events are published batch_size at a time. A batch is claimed
+    in a short transaction with SELECT ... FOR UPDATE SKIP LOCKED,
+    so relays of different hosts never publish the same events, and
+    the rows aren't locked while the batch is published. Events are
+    deleted only once the event bus has accepted them. If the relay
+    dies before that, the claim expires after CLAIM_TIMEOUT_IN_SECONDS
+    and the events are published again, so handlers must be idempotent,
+    as dropping cached data is. While there is a backlog, batches go
+    one after another, otherwise the outbox is checked every interval
+    seconds.
+    """
+
+    CLAIM_TIMEOUT_IN_SECONDS: typing.ClassVar[int] = 60
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._reset_counters()
+
+    async def run(self) -> None:
+        # Outside of requests the DB work would otherwise occupy
+        # the process-wide sync thread
+        async with ThreadSensitiveContext():
+            while True:
+                try:
+                    relayed = await self.relay_batch()
+                except Exception:
+                    self._failures += 1
+                    logger.exception('Failed to relay outbox events')
+                    await sync_to_async(close_old_connections)()
+                    relayed = 0
+
+                if relayed < self.batch_size:
+                    await asyncio.sleep(self.interval)
+
+    async def relay_batch(self) -> int:
+        """Returns the number of published events."""
+        rows = await self._claim_batch()
+        if not rows:
+            return 0
+
+        pks = [pk for pk, *_ in rows]
+        try:
+            started_at = time.perf_counter()
+            acks = await EventBus.publish_batch(
+                [
+                    (
+                        payload,
+                        subject,
+                        # With EVENTS_JETSTREAM the stream drops
+                        # the events relayed twice
+                        {
+                            ORIGIN_HEADER: origin,
+                            MESSAGE_ID_HEADER: f'outbox-{pk}',
+                        },
+                    )
+                    for pk, subject, payload, origin in rows
+                ],
+                stream=(
+                    settings.EVENTS_STREAM_NAME
+                    if settings.EVENTS_JETSTREAM
+                    else None
+                ),
+            )
+            self._publish_seconds += time.perf_counter() - started_at
+        except Exception:
+            await self._release(pks)
+            raise
+
+        published = [pk for pk, acked in zip(pks, acks, strict=True) if acked]
+        await OutboxEvent.objects.filter(pk__in=published).adelete()
+        # Events the stream hasn't acknowledged are published again
+        # with the next batch
+        await self._release(
+            [pk for pk, acked in zip(pks, acks, strict=True) if not acked],
+        )
+
+        self._relayed += len(published)
+        self._batches += 1
+        return len(published)
+
+    async def _claim_batch(self) -> list[tuple[int, str, typing.Any, str]]:
+        # Rows locked or claimed by the relay of another host are skipped
+        batch = (
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(claimed_until__isnull=True) | Q(claimed_until__lt=Now()),
+            )
+            .order_by('pk')
+            .values_list('pk', 'subject', 'payload', 'origin')
+        )
+        async with AsyncAtomic():
+            rows = [row async for row in batch[: self.batch_size]]
+            if rows:
+                # The clock of the database, hosts' clocks may differ
+                await OutboxEvent.objects.filter(
+                    pk__in=[pk for pk, *_ in rows],
+                ).aupdate(
+                    claimed_until=Now()
+                    + dt.timedelta(seconds=self.CLAIM_TIMEOUT_IN_SECONDS),
+                )
+
+        return rows
+
+    @staticmethod
+    async def _release(pks: list[int]) -> None:
+        if pks:
+            await OutboxEvent.objects.filter(pk__in=pks).aupdate(
+                claimed_until=None,
+            )
+
+    async def get_metrics(self) -> OutboxRelayMetrics:
+        """Counters are reset on every call, like in get_pool_metrics."""
+        elapsed = time.monotonic() - self._counting_since
+        metrics: OutboxRelayMetrics = {
+            'relayed': self._relayed,
+            'batches': self._batches,
+            'failures': self._failures,
+            'publish_ms': round(self._publish_seconds * 1000),
+            'relayed_per_second': (
+                round(self._relayed / elapsed, 1) if elapsed > 0 else 0.0
+            ),
+            'backlog': await OutboxEvent.objects.acount(),
+        }
+        self._reset_counters()
+        return metrics
+
+    def _reset_counters(self) -> None:
+        self._relayed = 0
+        self._batches = 0
+        self._failures = 0
+        self._publish_seconds = 0.0
+        self._counting_since = time.monotonic()
+
+
+@asynccontextmanager
+async def run_outbox_relay(
+    batch_size: int,
+    interval: float,
+    metrics_interval: float,
+) -> AsyncIterator[None]:
+    relay = OutboxRelay(batch_size, interval)
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(metrics_interval)
+            logger.info(
+                'Outbox relay metrics',
+                extra=dict(await relay.get_metrics()),
+            )
+
+    tasks = [asyncio.create_task(relay.run())]
+    if metrics_interval > 0:
+        tasks.append(asyncio.create_task(report()))
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
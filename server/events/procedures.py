@@ -0,0 +1,215 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+import importlib
+import logging
+import multiprocessing
+import time
+import typing
+
+import django
+from django.conf import settings
+from faststream.nats import NatsRouter
+from faststream.nats.annotations import NatsMessage
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+RPC_SUBJECT_PREFIX = 'rpc'
+# Every request is handled by a single process of the group
+RPC_QUEUE_GROUP = 'rpc-workers'
+# Wall clock time after which the caller no longer waits for the result
+DEADLINE_HEADER = 'rpc-deadline'
+
+
+class ProcedureError(Exception):
+    pass
+
+
+class ProcedureBusyError(ProcedureError):
+    pass
+
+
+class ProcedureTimeoutError(ProcedureError):
+    pass
+
+
+class ProcedureFailedError(ProcedureError):
+    pass
+
+
+class Procedure[RequestT: BaseModel, ResponseT: BaseModel]:
+    """
+    Sync function that can be run by another process, see ProcedureCaller.
+
+    It gets and returns pydantic models, so the arguments
+    and the result can be sent over the event bus. It runs in worker
+    processes of ProcedureRunner, so it should only compute: the data
+    is loaded by the caller. It must be defined at the module level,
+    workers find it by importing its module.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[RequestT], ResponseT],
+        request_type: type[RequestT],
+        response_type: type[ResponseT],
+    ):
+        self.name = name
+        self.func = func
+        self.request_type = request_type
+        self.response_type = response_type
+
+    @property
+    def subject(self) -> str:
+        return f'{RPC_SUBJECT_PREFIX}.{self.name}'
+
+
+PROCEDURES: dict[str, Procedure[typing.Any, typing.Any]] = {}
+
+
+def procedure[RequestT: BaseModel, ResponseT: BaseModel](
+    name: str,
+) -> Callable[
+    [Callable[[RequestT], ResponseT]],
+    Procedure[RequestT, ResponseT],
+]:
+    """Registers the function, request and response types are annotated."""
+
+    def register(
+        func: Callable[[RequestT], ResponseT],
+    ) -> Procedure[RequestT, ResponseT]:
+        if name in PROCEDURES:
+            raise ValueError(f'Procedure {name!r} is already registered')
+
+        hints = typing.get_type_hints(func)
+        response_type = hints.pop('return')
+        (request_type,) = hints.values()
+
+        registered = Procedure(name, func, request_type, response_type)
+        PROCEDURES[name] = registered
+        return registered
+
+    return register
+
+
+class ProcedureRunner:
+    """
+    Runs procedures in its own worker processes, so they don't hold
+    the GIL of the process that calls them and its event loop
+    stays responsive while they compute.
+
+    Calls over max_pending are rejected instead of being queued.
+    A call that has timed out keeps its slot until the procedure
+    actually finishes, the worker isn't interrupted.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        # Workers are started on the first call. They are spawned,
+        # forking a process with running threads isn't safe.
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+        # Only changed in the event loop
+        self._pending = 0
+
+    async def run[RequestT: BaseModel, ResponseT: BaseModel](
+        self,
+        procedure: Procedure[RequestT, ResponseT],
+        request: RequestT,
+        time_limit: float,
+    ) -> ResponseT:
+        if self._pending >= self.max_pending:
+            raise ProcedureBusyError
+
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        future = loop.run_in_executor(
+            self._executor,
+            _run_procedure,
+            procedure.func.__module__,
+            procedure.name,
+            request,
+        )
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), time_limit)
+        except TimeoutError as e:
+            raise ProcedureTimeoutError from e
+        except Exception as e:
+            raise ProcedureFailedError(procedure.name) from e
+
+    def _release(self, future: asyncio.Future[typing.Any]) -> None:
+        self._pending -= 1
+
+
+def _run_procedure(module: str, name: str, request: BaseModel) -> BaseModel:
+    """Runs in a worker process, where procedures are registered on import."""
+    importlib.import_module(module)
+    return PROCEDURES[name].func(request)
+
+
+procedure_runner = ProcedureRunner(
+    max_workers=settings.RPC_MAX_WORKERS,
+    max_pending=settings.RPC_MAX_PENDING,
+)
+
+
+class ProcedureResult(BaseModel):
+    status: typing.Literal['ok', 'busy', 'expired', 'failed', 'unknown']
+    result: dict[str, typing.Any] | None = None
+
+
+# Included only by the processes that serve procedures, see SERVE_RPC
+procedures_router = NatsRouter()
+
+
+@procedures_router.subscriber(
+    f'{RPC_SUBJECT_PREFIX}.>',
+    queue=RPC_QUEUE_GROUP,
+    max_workers=settings.RPC_MAX_PENDING,
+)
+async def serve_procedure(
+    body: dict[str, typing.Any],
+    message: NatsMessage,
+) -> ProcedureResult:
+    name = message.raw_message.subject.removeprefix(f'{RPC_SUBJECT_PREFIX}.')
+    registered = PROCEDURES.get(name)
+    if registered is None:
+        logger.warning('Unknown procedure', extra={'procedure': name})
+        return ProcedureResult(status='unknown')
+
+    # The caller has given up already, e.g. while the request
+    # was waiting for a free worker
+    deadline = message.headers.get(DEADLINE_HEADER)
+    time_limit = (
+        settings.RPC_TIMEOUT_IN_SECONDS
+        if deadline is None
+        else float(deadline) - time.time()
+    )
+    if time_limit <= 0:
+        return ProcedureResult(status='expired')
+
+    try:
+        response = await procedure_runner.run(
+            registered,
+            registered.request_type.model_validate(body),
+            time_limit,
+        )
+    except ProcedureBusyError:
+        return ProcedureResult(status='busy')
+    except ProcedureTimeoutError:
+        return ProcedureResult(status='expired')
+    except Exception:
+        logger.exception('Procedure failed', extra={'procedure': name})
+        return ProcedureResult(status='failed')
+
+    return ProcedureResult(
+        status='ok',
+        result=response.model_dump(mode='json'),
+    )
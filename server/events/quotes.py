@@ -0,0 +1,57 @@
+import typing
+
+from pydantic import BaseModel
+
+from services.exchange.stock_markets.quote_table import quote_table
+from services.exchange.stock_markets.typedefs import SecurityDict
+
+QUOTES_SUBJECT = 'quotes.refreshed'
+
+
+class Quote(typing.NamedTuple):
+    ticker: str
+    short_name: str
+    price: float
+    lot_size: int
+    last_dividend_value: float | None = None
+
+    @classmethod
+    def from_security(cls, security: SecurityDict) -> typing.Self:
+        return cls(
+            ticker=security['ticker'],
+            short_name=security['short_name'],
+            price=security['price'],
+            lot_size=security['lot_size'],
+            last_dividend_value=security.get('last_dividend_value'),
+        )
+
+    def to_security(self) -> SecurityDict:
+        security = SecurityDict(
+            ticker=self.ticker,
+            short_name=self.short_name,
+            price=self.price,
+            lot_size=self.lot_size,
+        )
+        if self.last_dividend_value is not None:
+            security['last_dividend_value'] = self.last_dividend_value
+
+        return security
+
+
+class QuotesRefreshed(BaseModel):
+    """
+    A batch of quotes fetched at the same time.
+
+    Quotes are named tuples, so they are sent as arrays
+    and the field names aren't repeated for every ticker.
+    """
+
+    fetched_at: float
+    quotes: list[Quote]
+
+
+def apply_quotes(batch: QuotesRefreshed) -> None:
+    quote_table.update(
+        (quote.to_security() for quote in batch.quotes),
+        batch.fetched_at,
+    )
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+import nats.errors
+from pydantic import BaseModel
+
+from events.event_bus import EventBus, EventBusIsNotRunningError
+from events.procedures import (
+    DEADLINE_HEADER,
+    Procedure,
+    procedure_runner,
+    ProcedureBusyError,
+    ProcedureFailedError,
+    ProcedureResult,
+    ProcedureTimeoutError,
+)
+
+
+class ProcedureCaller:
+    """
+    Sends procedures to the processes that serve them, see SERVE_RPC.
+
+    Every call is handled by a single one of them. Without the event
+    bus, or when nobody serves procedures, they are run by the worker
+    processes of this one. Calls over max_pending are rejected instead
+    of being queued, the same goes for busy remote processes.
+    """
+
+    def __init__(self, timeout: float, max_pending: int):
+        self.timeout = timeout
+        self.max_pending = max_pending
+        # Only changed in the event loop
+        self._pending = 0
+
+    async def call[RequestT: BaseModel, ResponseT: BaseModel](
+        self,
+        procedure: Procedure[RequestT, ResponseT],
+        request: RequestT,
+        time_limit: float | None = None,
+    ) -> ResponseT:
+        if time_limit is None:
+            time_limit = self.timeout
+
+        if self._pending >= self.max_pending:
+            raise ProcedureBusyError
+
+        self._pending += 1
+        try:
+            reply = await EventBus.request(
+                request,
+                procedure.subject,
+                headers={DEADLINE_HEADER: str(time.time() + time_limit)},
+                time_limit=time_limit,
+            )
+        except (EventBusIsNotRunningError, nats.errors.NoRespondersError):
+            return await procedure_runner.run(procedure, request, time_limit)
+        except TimeoutError as e:
+            raise ProcedureTimeoutError from e
+        finally:
+            self._pending -= 1
+
+        result = ProcedureResult.model_validate_json(reply.body)
+        match result.status:
+            case 'ok':
+                return procedure.response_type.model_validate(result.result)
+            case 'busy':
+                raise ProcedureBusyError
+            case 'expired':
+                raise ProcedureTimeoutError
+            case _:
+                raise ProcedureFailedError(procedure.name)
+
+
+procedure_caller = ProcedureCaller(
+    timeout=settings.RPC_TIMEOUT_IN_SECONDS,
+    max_pending=settings.RPC_MAX_PENDING_CALLS,
+)
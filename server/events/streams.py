@@ -0,0 +1,41 @@
+import re
+import socket
+
+from django.conf import settings
+from faststream.nats import JStream
+
+from events.domain_events import DOMAIN_EVENTS_SUBJECT_PREFIX, PROCESS_ID
+
+# Message id header, JetStream drops the messages it has already stored
+# under the same id within the duplicate window
+MESSAGE_ID_HEADER = 'Nats-Msg-Id'
+
+
+def get_domain_events_stream() -> JStream:
+    """Keeps domain events, so consumers can get the ones they've missed."""
+    return JStream(
+        name=settings.EVENTS_STREAM_NAME,
+        subjects=[f'{DOMAIN_EVENTS_SUBJECT_PREFIX}.>'],
+        max_age=settings.EVENTS_STREAM_MAX_AGE_IN_SECONDS,
+        duplicate_window=settings.EVENTS_STREAM_DUPLICATE_WINDOW_IN_SECONDS,
+    )
+
+
+def get_durable_consumer_name() -> str:
+    """
+    Every process needs its own consumer, as every process has its own
+    caches. A name from EVENTS_CONSUMER_NAME outlives the process,
+    so a restarted process gets the events it has missed. With several
+    workers they all have the same settings, so the name is made
+    unique and the consumer only outlives reconnects.
+    """
+    if settings.EVENTS_CONSUMER_NAME and settings.ASGI_WORKERS == 1:
+        name = settings.EVENTS_CONSUMER_NAME
+    else:
+        name = (
+            f'{settings.EVENTS_CONSUMER_NAME or socket.gethostname()}'
+            f'-{PROCESS_ID}'
+        )
+
+    # Dots, wildcards and whitespace aren't allowed in consumer names
+    return re.sub(r'[.*>\s]', '-', name)
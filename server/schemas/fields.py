@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Annotated
+
+from django.core.serializers.json import DjangoJSONEncoder
+from pydantic import PlainSerializer
+
+# Pydantic keeps microseconds in JSON, while DjangoJSONEncoder
+# truncates them to milliseconds. API responses use the Django format.
+ApiDatetime = Annotated[
+    datetime,
+    PlainSerializer(
+        DjangoJSONEncoder().default,
+        return_type=str,
+        when_used='json',
+    ),
+]
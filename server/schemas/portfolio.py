@@ -1,8 +1,9 @@
-from datetime import datetime
 from typing import Annotated
 
 from pydantic import BaseModel, Field
 
+from schemas.fields import ApiDatetime
+
 
 class PortfolioSecuritySchema(BaseModel):
     ticker: str
@@ -13,7 +14,7 @@ class PortfolioSimpleSchema(BaseModel):
     id: int
     name: str
     owner_id: int
-    created_at: datetime
+    created_at: ApiDatetime
 
 
 class PortfolioSchema(PortfolioSimpleSchema):
@@ -25,6 +26,7 @@ class PortfolioSchema(PortfolioSimpleSchema):
 
 class PortfolioListSchema(BaseModel):
     portfolios: list[PortfolioSimpleSchema]
+    next_cursor: str | None = None
 
 
 class PortfolioCreateSchema(BaseModel):
@@ -1,7 +1,8 @@
-from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from schemas.fields import ApiDatetime
 
 
 class PortfolioSecurityBase(BaseModel):
@@ -19,4 +20,56 @@ class PortfolioSecurityUpdateSchema(PortfolioSecurityBase):
 class PortfolioSecuritySchema(PortfolioSecurityBase):
     portfolio_id: int
     ticker: str
-    created_at: datetime
+    created_at: ApiDatetime
+
+
+class PortfolioSecurityAddOperation(PortfolioSecurityCreateSchema):
+    action: Literal['add']
+
+
+class PortfolioSecurityUpdateOperation(PortfolioSecurityCreateSchema):
+    action: Literal['update']
+
+
+class PortfolioSecurityRemoveOperation(BaseModel):
+    action: Literal['remove']
+    ticker: str
+
+
+type PortfolioSecurityOperation = Annotated[
+    PortfolioSecurityAddOperation
+    | PortfolioSecurityUpdateOperation
+    | PortfolioSecurityRemoveOperation,
+    Field(discriminator='action'),
+]
+
+
+class PortfolioSecurityBulkSchema(BaseModel):
+    operations: Annotated[
+        list[PortfolioSecurityOperation],
+        Field(min_length=1, max_length=100),
+    ]
+
+    @field_validator('operations')
+    @classmethod
+    def validate_tickers_are_unique(
+        cls,
+        operations: list[PortfolioSecurityOperation],
+    ) -> list[PortfolioSecurityOperation]:
+        tickers = [operation.ticker for operation in operations]
+        if len(set(tickers)) != len(tickers):
+            raise ValueError('every ticker can be used only once')
+
+        return operations
+
+
+class PortfolioSecurityOperationResult(BaseModel):
+    action: Literal['add', 'update', 'remove']
+    ticker: str
+    # None for removed securities and failed operations
+    quantity: int | None = None
+    error: str | None = None
+
+
+class PortfolioSecurityBulkResultSchema(BaseModel):
+    results: list[PortfolioSecurityOperationResult]
@@ -115,6 +115,25 @@ class MOEX(BaseMOEX, StockMarketProtocol):
             )
             raise
 
+    @moex_circuit_breaker  # type: ignore[misc]
+    async def get_existing_tickers(self, tickers: Iterable[str]) -> set[str]:
+        """
+        Returns the tickers that are traded on MOEX.
+
+        Unlike get_securities, it's a single request:
+        dividends aren't collected.
+        """
+        self._tickers = tuple(tickers)
+        self._result = {}
+        try:
+            async with self:
+                await self._collect_securities()
+        except Exception:
+            logger.exception('Unexpected error while checking MOEX tickers')
+            raise
+
+        return set(self._result)
+
     async def _get_securities(self) -> list[SecurityDict]:
         await asyncio.gather(
             self._collect_securities(),
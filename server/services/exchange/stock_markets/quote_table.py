@@ -0,0 +1,56 @@
+from collections.abc import Iterable
+import time
+
+from django.conf import settings
+
+from services.exchange.stock_markets.typedefs import SecurityDict
+
+
+class QuoteTable:
+    """
+    Quotes of a single process, read-only for the request handlers.
+
+    The scheduler leader fetches quotes from MOEX and publishes them,
+    every process puts them here, see QuotesSynchronizer. Quotes older
+    than max_age are never returned, e.g. when the leader has stopped.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._quotes: dict[str, tuple[float, SecurityDict]] = {}
+
+    def update(
+        self,
+        quotes: Iterable[SecurityDict],
+        fetched_at: float,
+    ) -> None:
+        # The table is replaced, not changed in place,
+        # so readers never see a half-applied batch
+        self._quotes = self._quotes | {
+            quote['ticker']: (fetched_at, quote) for quote in quotes
+        }
+
+    def get(
+        self,
+        tickers: Iterable[str],
+    ) -> tuple[list[SecurityDict], list[str]]:
+        """Returns fresh quotes and the tickers that have none."""
+        quotes = self._quotes
+        oldest_fetched_at = time.time() - self.max_age
+
+        found: list[SecurityDict] = []
+        missing: list[str] = []
+        for ticker in tickers:
+            entry = quotes.get(ticker)
+            if entry is None or entry[0] < oldest_fetched_at:
+                missing.append(ticker)
+            else:
+                found.append(entry[1])
+
+        return found, missing
+
+    def clear(self) -> None:
+        self._quotes = {}
+
+
+quote_table = QuoteTable(max_age=settings.QUOTES_MAX_AGE_IN_SECONDS)
@@ -6,15 +6,18 @@ from django.db import models
 from apps import investment_tables
 from apps.exchange.models import Security
 from apps.investment_tables.models import TableTemplate
+from events.domain_events import IndexSynced
+from events.outbox import add_events
 from services.exchange.synchronization.index_providers.imoex import (
     IMOEXProvider,
 )
 from services.exchange.synchronization.typedefs import (
     IndexProviderProtocol,
     IndexSynchronizerProtocol,
+    SecurityWeightDict,
     SecurityWeightDictWithId,
 )
-from utils.db_helpers import aatomic
+from utils.db_helpers import arun_atomic
 
 
 @final
@@ -25,17 +28,23 @@ class IMOEXSynchronizer(IndexSynchronizerProtocol):
         self._provider = provider or IMOEXProvider()
 
     @override
-    @aatomic
     async def synchronize(self) -> None:
+        # Index content is fetched before the transaction is opened,
+        # so it isn't held while we wait for MOEX.
         securities = await self._provider.get_index_content()
+        await arun_atomic(self._save_index_content, securities)
 
+    def _save_index_content(
+        self,
+        securities: list[SecurityWeightDict],
+    ) -> None:
         ticker_to_security_map: dict[str, SecurityWeightDictWithId] = {
             security['ticker']: typing.cast(SecurityWeightDictWithId, security)
             for security in securities
         }
         tickers = list(ticker_to_security_map.keys())
 
-        await Security.objects.abulk_create(
+        Security.objects.bulk_create(
             [Security(ticker=ticker) for ticker in tickers],
             ignore_conflicts=True,
         )
@@ -43,20 +52,20 @@ class IMOEXSynchronizer(IndexSynchronizerProtocol):
         (
             table_template,
             _,
-        ) = await TableTemplate.objects.aget_or_create(
+        ) = TableTemplate.objects.get_or_create(
             slug=self.IMOEX_TABLE_TEMPLATE_SLUG,
         )
 
         # This way we can get rid of securities that no longer
         # a part of the index. Later is_active is set to True
         # for currently active securities.
-        await table_template.items.aupdate(is_active=False)
+        table_template.items.update(is_active=False)
 
         db_securities: models.QuerySet[Security] = Security.objects.filter(
             ticker__in=tickers,
         )
 
-        async for security in db_securities:
+        for security in db_securities:
             ticker_to_security_map[security.ticker]['id'] = security.id
 
         template_items_to_create = []
@@ -70,9 +79,10 @@ class IMOEXSynchronizer(IndexSynchronizerProtocol):
                 ),
             )
 
-        await investment_tables.models.TableTemplateItem.objects.abulk_create(
+        investment_tables.models.TableTemplateItem.objects.bulk_create(
             template_items_to_create,
             update_conflicts=True,
             unique_fields=['security_id', 'template_id'],
             update_fields=['weight', 'is_active'],
         )
+        add_events(IndexSynced(template_slug=self.IMOEX_TABLE_TEMPLATE_SLUG))
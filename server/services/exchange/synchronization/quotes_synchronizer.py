@@ -0,0 +1,97 @@
+from collections.abc import Sequence
+import itertools
+import logging
+import time
+from typing import final
+
+from django.conf import settings
+
+from apps.exchange.models import Security
+from events.domain_events import ORIGIN_HEADER, PROCESS_ID
+from events.event_bus import EventBus, EventBusIsNotRunningError
+from events.quotes import apply_quotes, Quote, QUOTES_SUBJECT, QuotesRefreshed
+from services.exchange.stock_markets import MOEX
+from services.exchange.stock_markets.typedefs import (
+    SecurityDict,
+    StockMarketProtocol,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class QuotesSynchronizer:
+    """
+    Fetches quotes of all known securities and publishes them
+    to every process, so the number of upstream requests doesn't grow
+    with the number of workers or hosts.
+
+    MOEX.get_securities makes one securities request and one dividends
+    request per ticker. Dividends are cached for 20 minutes, but only
+    for the last 128 tickers, so a synchronization of more securities
+    makes N + 1 ISS requests.
+    """
+
+    def __init__(self, *, stock_market: StockMarketProtocol | None = None):
+        self._stock_market = stock_market or MOEX()
+
+    async def synchronize(self) -> None:
+        tickers = [
+            ticker
+            async for ticker in Security.objects.values_list(
+                'ticker',
+                flat=True,
+            )
+        ]
+        if not tickers:
+            return
+
+        # Taken before the request, so quotes never look fresher
+        # than they are
+        fetched_at = time.time()
+        securities = await self._stock_market.get_securities(tickers)
+        await self._publish(securities, fetched_at)
+
+    @staticmethod
+    async def _publish(
+        securities: Sequence[SecurityDict],
+        fetched_at: float,
+    ) -> None:
+        """
+        Puts the quotes into the table of this process
+        and publishes them to the others, if the event bus is running.
+        """
+        # ISS has no previous price for some tickers, e.g. new listings,
+        # they are left out instead of failing the whole synchronization
+        quotes = [
+            Quote.from_security(security)
+            for security in securities
+            if security['price'] is not None
+        ]
+        if len(quotes) < len(securities):
+            logger.warning(
+                'Quotes without a price are skipped',
+                extra={'skipped': len(securities) - len(quotes)},
+            )
+
+        batches = [
+            QuotesRefreshed(fetched_at=fetched_at, quotes=list(chunk))
+            for chunk in itertools.batched(
+                quotes,
+                settings.QUOTES_BATCH_SIZE,
+                strict=False,
+            )
+        ]
+        for batch in batches:
+            apply_quotes(batch)
+
+        try:
+            await EventBus.publish_batch(
+                (batch, QUOTES_SUBJECT, {ORIGIN_HEADER: PROCESS_ID})
+                for batch in batches
+            )
+        except EventBusIsNotRunningError:
+            pass
+        except Exception:
+            # The next synchronization publishes them again
+            logger.exception('Failed to publish quotes')
@@ -1,5 +1,14 @@
-from api.utils import aget_object_or_404_json
-from apps.portfolios.models import Portfolio
+from collections.abc import AsyncIterator
+import typing
+
+from django.db import models
+from django.db.models import Count, F, Max
+
+from api.utils import aget_object_or_404_json, IdentityMap
+from api.utils.pagination import KeysetPaginator
+from apps.portfolios.models import Portfolio, PortfolioItem
+from events.domain_events import PortfolioChanged
+from events.outbox import add_events
 from schemas.portfolio import (
     PortfolioCreateSchema,
     PortfolioListSchema,
@@ -7,59 +16,167 @@ from schemas.portfolio import (
     PortfolioSimpleSchema,
     PortfolioUpdateSchema,
 )
+from utils.db_helpers import aiterate_pinned, arun_atomic
+
+# Portfolio fields every portfolio schema is built from
+PORTFOLIO_FIELDS = tuple(PortfolioSimpleSchema.model_fields)
 
 
 class PortfolioService:
+    """
+    Portfolio schemas are validated from values() rows,
+    model instances are only loaded when they have to be saved.
+    """
+
+    def __init__(self, identity_map: IdentityMap | None = None):
+        self._identity_map = identity_map or IdentityMap()
+
     async def get_portfolio(self, portfolio_id: int) -> PortfolioSchema:
-        portfolio: Portfolio = await aget_object_or_404_json(
-            Portfolio.objects.active().prefetch_securities(),
-            pk=portfolio_id,
-        )
+        # Permissions could have already loaded the portfolio
+        portfolio = self._identity_map.get(Portfolio, portfolio_id)
+        if portfolio is not None:
+            portfolio_row = self._to_row(portfolio)
+        else:
+            portfolio_row = typing.cast(
+                dict[str, typing.Any],
+                await aget_object_or_404_json(
+                    Portfolio.objects.active().values(*PORTFOLIO_FIELDS),
+                    pk=portfolio_id,
+                ),
+            )
 
-        # todo error handling
-        return PortfolioSchema.model_validate(portfolio, from_attributes=True)
+        return await self._build_portfolio_schema(portfolio_row)
 
     async def create_portfolio(
         self,
         portfolio_create: PortfolioCreateSchema,
         user_id: int,
     ) -> PortfolioSchema:
-        portfolio: Portfolio = await Portfolio.objects.acreate(
-            name=portfolio_create.name,
-            owner_id=user_id,
-        )
+        portfolio = Portfolio(name=portfolio_create.name, owner_id=user_id)
+        await arun_atomic(self._save_portfolio, portfolio)
 
-        return PortfolioSchema.model_validate(portfolio, from_attributes=True)
+        # A new portfolio has no securities yet
+        return PortfolioSchema.model_validate(self._to_row(portfolio))
 
     async def update_portfolio(
         self,
         portfolio_id: int,
         portfolio_update: PortfolioUpdateSchema,
     ) -> PortfolioSchema:
-        portfolio: Portfolio = await aget_object_or_404_json(
-            Portfolio.objects.active().prefetch_securities(),
-            pk=portfolio_id,
+        portfolio = await self._get_portfolio(
+            Portfolio.objects.active().only(*PORTFOLIO_FIELDS),
+            portfolio_id,
         )
         portfolio.name = portfolio_update.name
-        await portfolio.asave(update_fields=['name'])
+        # auto_now fields are saved only if listed in update_fields
+        await arun_atomic(
+            self._save_portfolio,
+            portfolio,
+            update_fields=['name', 'updated_at'],
+        )
+
+        return await self._build_portfolio_schema(self._to_row(portfolio))
 
-        return PortfolioSchema.model_validate(portfolio, from_attributes=True)
+    async def get_portfolio_version(
+        self,
+        portfolio_id: int,
+    ) -> tuple[typing.Any, ...]:
+        """
+        Returns a token that changes whenever the portfolio
+        or any of its securities is changed, added or removed.
+        """
+        version = await Portfolio.objects.filter(pk=portfolio_id).aaggregate(
+            updated_at=Max('updated_at'),
+            items_updated_at=Max('item__updated_at'),
+            items_count=Count('item'),
+        )
+        return tuple(version.values())
 
     async def delete_portfolio(self, portfolio_id: int) -> None:
-        portfolio: Portfolio = await aget_object_or_404_json(
-            Portfolio.objects.active().only(),
-            pk=portfolio_id,
+        portfolio = await self._get_portfolio(
+            Portfolio.objects.active().only('owner_id'),
+            portfolio_id,
         )
         portfolio.is_active = False
-        await portfolio.asave()
+        await arun_atomic(self._save_portfolio, portfolio)
 
-    async def get_user_portfolios(self, user_id: int) -> PortfolioListSchema:
-        select_fields = tuple(PortfolioSimpleSchema.model_fields.keys())
-        user_portfolios = Portfolio.objects.filter(
-            owner_id=user_id,
-        ).only(*select_fields)
+    async def get_user_portfolios(
+        self,
+        user_id: int,
+        paginator: KeysetPaginator | None = None,
+    ) -> PortfolioListSchema:
+        if paginator is None:
+            paginator = KeysetPaginator()
+
+        rows = paginator.paginate(self._get_user_portfolio_rows(user_id))
+        page = paginator.get_page([row async for row in rows])
 
         return PortfolioListSchema.model_validate(
-            {'portfolios': [p async for p in user_portfolios]},
-            from_attributes=True,
+            {'portfolios': page.items, 'next_cursor': page.next_cursor},
         )
+
+    def stream_user_portfolios(
+        self,
+        user_id: int,
+    ) -> AsyncIterator[dict[str, typing.Any]]:
+        """
+        Yields all user portfolios without loading them at once.
+
+        Rows aren't validated by the schema,
+        they are encoded as they come from the database.
+        """
+        return aiterate_pinned(
+            KeysetPaginator.order(self._get_user_portfolio_rows(user_id)),
+        )
+
+    async def _get_portfolio(
+        self,
+        queryset: models.QuerySet[Portfolio],
+        portfolio_id: int,
+    ) -> Portfolio:
+        # Permissions could have already loaded the portfolio
+        portfolio = self._identity_map.get(Portfolio, portfolio_id)
+        if portfolio is not None:
+            return portfolio
+
+        return await aget_object_or_404_json(queryset, pk=portfolio_id)
+
+    async def _build_portfolio_schema(
+        self,
+        portfolio_row: dict[str, typing.Any],
+    ) -> PortfolioSchema:
+        securities = PortfolioItem.objects.filter(
+            portfolio_id=portfolio_row['id'],
+        ).values('quantity', ticker=F('security__ticker'))
+
+        return PortfolioSchema.model_validate(
+            {
+                **portfolio_row,
+                'securities_prefetched': [row async for row in securities],
+            },
+        )
+
+    @staticmethod
+    def _save_portfolio(
+        portfolio: Portfolio,
+        update_fields: list[str] | None = None,
+    ) -> None:
+        portfolio.save(update_fields=update_fields)
+        add_events(
+            PortfolioChanged(
+                portfolio_id=portfolio.pk,
+                owner_id=portfolio.owner_id,
+            ),
+        )
+
+    @staticmethod
+    def _get_user_portfolio_rows(
+        user_id: int,
+    ) -> models.QuerySet[Portfolio, dict[str, typing.Any]]:
+        return Portfolio.objects.filter(owner_id=user_id).values(
+            *PORTFOLIO_FIELDS,
+        )
+
+    @staticmethod
+    def _to_row(portfolio: Portfolio) -> dict[str, typing.Any]:
+        return {field: getattr(portfolio, field) for field in PORTFOLIO_FIELDS}
@@ -1,14 +1,23 @@
+from collections.abc import Sequence
+
 from django.db import IntegrityError
 
 from api.exceptions import NotFoundError
 from api.utils import aget_object_or_404_json
 from apps.exchange.models import Security
-from apps.portfolios.models import PortfolioItem
+from apps.portfolios.models import Portfolio, PortfolioItem
+from events.domain_events import PortfolioSecuritiesChanged
+from events.outbox import add_events
 from schemas.security import (
+    PortfolioSecurityBulkResultSchema,
     PortfolioSecurityCreateSchema,
+    PortfolioSecurityOperation,
+    PortfolioSecurityOperationResult,
+    PortfolioSecurityRemoveOperation,
     PortfolioSecuritySchema,
     PortfolioSecurityUpdateSchema,
 )
+from utils.db_helpers import arun_atomic
 
 
 class SecurityAlreadyExistsError(Exception):
@@ -30,12 +39,15 @@ class SecurityService:
         except Security.DoesNotExist as e:
             raise NotFoundError(Security) from e
 
+        portfolio_item = PortfolioItem(
+            portfolio_id=portfolio_id,
+            security=security,
+        )
         try:
-            portfolio_item: PortfolioItem = (
-                await PortfolioItem.objects.acreate(
-                    portfolio_id=portfolio_id,
-                    security=security,
-                )
+            await arun_atomic(
+                self._save_portfolio_item,
+                portfolio_item,
+                force_insert=True,
             )
         except IntegrityError as e:
             raise SecurityAlreadyExistsError() from e
@@ -65,7 +77,12 @@ class SecurityService:
         )
         portfolio_item.quantity = portfolio_update.quantity
 
-        await portfolio_item.asave(update_fields=['quantity'])
+        # auto_now fields are saved only if listed in update_fields
+        await arun_atomic(
+            self._save_portfolio_item,
+            portfolio_item,
+            update_fields=['quantity', 'updated_at'],
+        )
 
         return PortfolioSecuritySchema(
             portfolio_id=portfolio_id,
@@ -86,4 +103,137 @@ class SecurityService:
             object_error_name=self.PORTFOLIO_ITEM_404_NAME,
         )
 
-        await portfolio_item.adelete()
+        await arun_atomic(
+            self._delete_portfolio_item,
+            portfolio_id,
+            portfolio_item,
+        )
+
+    async def apply_portfolio_security_operations(
+        self,
+        portfolio_id: int,
+        operations: Sequence[PortfolioSecurityOperation],
+    ) -> PortfolioSecurityBulkResultSchema:
+        """
+        Adds, updates and removes portfolio securities in one go.
+
+        Operations fail one by one, e.g. when the security isn't found,
+        the rest of them are still applied. Tickers must be unique.
+        """
+        securities = await Security.get_or_try_to_create_many_from_moex(
+            tickers=[operation.ticker for operation in operations],
+            tickers_to_create=[
+                operation.ticker
+                for operation in operations
+                if operation.action == 'add'
+            ],
+        )
+        portfolio_security_ids = {
+            security_id
+            async for security_id in PortfolioItem.objects.filter(
+                portfolio_id=portfolio_id,
+                security__in=securities.values(),
+            ).values_list('security_id', flat=True)
+        }
+
+        items_to_save: list[PortfolioItem] = []
+        security_ids_to_remove: list[int] = []
+        results: list[PortfolioSecurityOperationResult] = []
+        for operation in operations:
+            result = PortfolioSecurityOperationResult(
+                action=operation.action,
+                ticker=operation.ticker,
+            )
+            results.append(result)
+
+            security = securities.get(operation.ticker)
+            if security is None:
+                result.error = (
+                    'security not found'
+                    if operation.action == 'add'
+                    else f'{self.PORTFOLIO_ITEM_404_NAME} not found'
+                )
+            elif operation.action == 'add' and (
+                security.id in portfolio_security_ids
+            ):
+                result.error = 'security already exists'
+            elif operation.action != 'add' and (
+                security.id not in portfolio_security_ids
+            ):
+                result.error = f'{self.PORTFOLIO_ITEM_404_NAME} not found'
+            elif isinstance(operation, PortfolioSecurityRemoveOperation):
+                security_ids_to_remove.append(security.id)
+            else:
+                result.quantity = operation.quantity
+                items_to_save.append(
+                    PortfolioItem(
+                        portfolio_id=portfolio_id,
+                        security=security,
+                        quantity=operation.quantity,
+                    ),
+                )
+
+        if items_to_save or security_ids_to_remove:
+            await arun_atomic(
+                self._save_portfolio_items,
+                portfolio_id,
+                items_to_save,
+                security_ids_to_remove,
+            )
+
+        return PortfolioSecurityBulkResultSchema(results=results)
+
+    @staticmethod
+    def _save_portfolio_items(
+        portfolio_id: int,
+        items_to_save: list[PortfolioItem],
+        security_ids_to_remove: list[int],
+    ) -> None:
+        # Items added by a concurrent request are updated
+        # instead of failing the whole batch
+        PortfolioItem.objects.bulk_create(
+            items_to_save,
+            update_conflicts=True,
+            unique_fields=['portfolio', 'security'],
+            update_fields=['quantity', 'updated_at'],
+        )
+        PortfolioItem.objects.filter(
+            portfolio_id=portfolio_id,
+            security_id__in=security_ids_to_remove,
+        ).delete()
+        SecurityService._record_securities_changed(portfolio_id)
+
+    @staticmethod
+    def _save_portfolio_item(
+        portfolio_item: PortfolioItem,
+        force_insert: bool = False,
+        update_fields: list[str] | None = None,
+    ) -> None:
+        portfolio_item.save(
+            force_insert=force_insert,
+            update_fields=update_fields,
+        )
+        SecurityService._record_securities_changed(portfolio_item.portfolio_id)
+
+    @staticmethod
+    def _delete_portfolio_item(
+        portfolio_id: int,
+        portfolio_item: PortfolioItem,
+    ) -> None:
+        portfolio_item.delete()
+        SecurityService._record_securities_changed(portfolio_id)
+
+    @staticmethod
+    def _record_securities_changed(portfolio_id: int) -> None:
+        owner_id: int | None = (
+            Portfolio.objects.filter(pk=portfolio_id)
+            .values_list('owner_id', flat=True)
+            .first()
+        )
+        if owner_id is not None:
+            add_events(
+                PortfolioSecuritiesChanged(
+                    portfolio_id=portfolio_id,
+                    owner_id=owner_id,
+                ),
+            )
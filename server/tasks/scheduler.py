@@ -2,6 +2,7 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from django.conf import settings
 
 from tasks import tasks
 
@@ -22,3 +23,9 @@ scheduler.add_job(
     trigger='interval',
     minutes=15,
 )
+
+scheduler.add_job(
+    func=tasks.quotes_synchronization,
+    trigger='interval',
+    seconds=settings.QUOTES_REFRESH_INTERVAL_IN_SECONDS,
+)
@@ -1,11 +1,31 @@
 import logging
 
+from asgiref.sync import sync_to_async, ThreadSensitiveContext
+from django.db import close_old_connections
+
 from services.exchange.synchronization.imoex_synchronizer import (
     IMOEXSynchronizer,
 )
+from services.exchange.synchronization.quotes_synchronizer import (
+    QuotesSynchronizer,
+)
 
 logger = logging.getLogger(__name__)
 
 
 async def imoex_synchronization() -> None:
-    await IMOEXSynchronizer().synchronize()
+    # Jobs run outside of requests, so without their own context
+    # the DB work would occupy the process-wide sync thread.
+    async with ThreadSensitiveContext():
+        try:
+            await IMOEXSynchronizer().synchronize()
+        finally:
+            await sync_to_async(close_old_connections)()
+
+
+async def quotes_synchronization() -> None:
+    async with ThreadSensitiveContext():
+        try:
+            await QuotesSynchronizer().synchronize()
+        finally:
+            await sync_to_async(close_old_connections)()
@@ -1,4 +1,8 @@
-from asgiref.sync import async_to_sync
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import TestCase
 
 from apps.users.authentication.jwt import TokenPair
 from apps.users.models import ItableUser
@@ -16,3 +20,21 @@ async def agenerate_auth_header(user: ItableUser) -> dict[str, str]:
     return {
         'Authorization': f'Bearer {token_pair.access_token}',
     }
+
+
+@asynccontextmanager
+async def aexecute_on_commit_callbacks(
+    test_case: TestCase,
+) -> AsyncIterator[None]:
+    """
+    TestCase.captureOnCommitCallbacks(execute=True) for async tests.
+
+    Callbacks are registered on the connection of the sync thread,
+    so the capture has to be entered and exited there.
+    """
+    capture = test_case.captureOnCommitCallbacks(execute=True)
+    await sync_to_async(capture.__enter__)()
+    try:
+        yield
+    finally:
+        await sync_to_async(capture.__exit__)(None, None, None)
@@ -2,18 +2,28 @@
 import asyncio
 import dataclasses
 from http import HTTPStatus
+from http.cookies import SimpleCookie
 import json
+import time
 from typing import override
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import router
 from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.test import AsyncRequestFactory, TestCase
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+)
 from parameterized import param, parameterized
 
 from api.core.api_view import api_view, Checker
 from api.permissions.permission_protocol import Permission
 from api.request_checkers.schema_checker import SchemaValidationError
 from api.utils import aget_object_or_404_json
+from utils.db_helpers.replica import STICKINESS_COOKIE_NAME
 
 User = get_user_model()
 
@@ -162,6 +172,40 @@ class APIViewTestCase(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(content['error'], 'user not found')
 
+    async def test_etag_matching_request_skips_the_view(self):
+        view = mock.AsyncMock(return_value=JsonResponse({'message': 'hi'}))
+        etag_function = mock.AsyncMock(return_value='"v1"')
+        hello_world = api_view(etag=etag_function)(view)
+
+        response = await hello_world(self.factory.get('/hello_world'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.headers['ETag'], '"v1"')
+
+        view.reset_mock()
+        response = await hello_world(
+            self.factory.get(
+                '/hello_world',
+                headers={'If-None-Match': '"v1"'},
+            ),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], '"v1"')
+        view.assert_not_awaited()
+
+    async def test_etag_is_not_computed_for_rejected_requests(self):
+        etag_function = mock.AsyncMock(return_value='"v1"')
+
+        @api_view(permissions=[EmailLenIs10Permission()], etag=etag_function)
+        async def hello_world(request):
+            return JsonResponse({'message': 'hello world'})
+
+        request = self.factory.get('/hello_world')
+        request.user = self.user
+        response = await hello_world(request)
+
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        etag_function.assert_not_awaited()
+
 
 @dataclasses.dataclass
 class UserSchema:
@@ -449,3 +493,77 @@ class APIViewAuthenticationTestCase(TestCase):
 
         self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
         self.assertEqual(error, 'authentication required')
+
+
+@mock.patch('api.core.api_view.is_replica_configured', return_value=True)
+@mock.patch(
+    'utils.db_helpers.replica.is_replica_configured',
+    return_value=True,
+)
+class APIViewReadOnlyTestCase(TransactionTestCase):
+    # TestCase wraps tests in a transaction,
+    # and reads inside transactions never go to the replica
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+        @api_view(read_only=True)
+        async def read_handler(request):
+            return JsonResponse({'db': router.db_for_read(User)})
+
+        @api_view
+        async def write_handler(request):
+            return JsonResponse({}, status=int(request.GET['status']))
+
+        self.read_handler = read_handler
+        self.write_handler = write_handler
+
+    async def read_from(self, user_id, cookies=None):
+        request = self.factory.get('/read')
+        request.user_id = user_id
+        if cookies is not None:
+            request.COOKIES = {
+                name: morsel.value for name, morsel in cookies.items()
+            }
+
+        response = await self.read_handler(request)
+        return json.loads(response.content)['db']
+
+    async def write(self, user_id, status=HTTPStatus.OK):
+        request = self.factory.post(f'/write?status={status}')
+        request.user_id = user_id
+        response = await self.write_handler(request)
+        return response.cookies
+
+    async def test_read_only_view_reads_from_replica(self, *mocks):
+        self.assertEqual(await self.read_from(user_id=1), 'replica')
+
+    async def test_user_reads_own_writes_from_default_database(self, *mocks):
+        cookies = await self.write(user_id=2)
+
+        self.assertEqual(await self.read_from(2, cookies), 'default')
+        # The mark of another user is ignored
+        self.assertEqual(await self.read_from(3, cookies), 'replica')
+
+    async def test_failed_write_doesnt_stick_user_to_default_database(
+        self,
+        *mocks,
+    ):
+        cookies = await self.write(user_id=4, status=HTTPStatus.BAD_REQUEST)
+
+        self.assertEqual(await self.read_from(4, cookies), 'replica')
+
+    async def test_stickiness_expires(self, *mocks):
+        cookies = await self.write(user_id=5)
+        expired_at = (
+            time.time() + settings.DATABASE_REPLICA_STICKINESS_IN_SECONDS + 1
+        )
+
+        with mock.patch(
+            'django.core.signing.time.time', return_value=expired_at,
+        ):
+            self.assertEqual(await self.read_from(5, cookies), 'replica')
+
+    async def test_unsigned_mark_is_ignored(self, *mocks):
+        cookies = SimpleCookie({STICKINESS_COOKIE_NAME: '6'})
+
+        self.assertEqual(await self.read_from(6, cookies), 'replica')
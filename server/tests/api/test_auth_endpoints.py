@@ -1,17 +1,50 @@
+import asyncio
 from http import HTTPStatus
 import json
+from pathlib import Path
+import tempfile
+import threading
 from unittest import mock
 
 from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+)
 from django.conf import settings
 from django.contrib.auth import aauthenticate, get_user_model
-from django.test import AsyncClient, TestCase
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase
 from django.urls import reverse
 from django.utils import timezone
-
-from apps.users.authentication.jwt import TokenPair
+import jwt
+from parameterized import parameterized
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from apps.users.authentication.exceptions import (
+    ClientPasswordChecksLimitError,
+    InvalidTokenError,
+    SigningKeyIsNotConfiguredError,
+)
+from apps.users.authentication.jwt import (
+    PyJWT,
+    TokenPair,
+    VerifiedTokenCache,
+)
+from apps.users.authentication.keys import JWTKeySet
+from apps.users.authentication.passwords import (
+    password_checker,
+    PasswordChecker,
+)
+from apps.users.authentication.user_cache import user_cache, UserCache
 from apps.users.models import ItableUser
-from tests.api.helpers import agenerate_auth_header
+from tests.api.helpers import (
+    aexecute_on_commit_callbacks,
+    agenerate_auth_header,
+    generate_auth_header,
+)
 
 User = get_user_model()
 
@@ -64,19 +97,190 @@ class LoginCase(AuthTestsMixin, TestCase):
         content = json.loads(response.content)
         self.assertEqual(content['error'][0]['msg'], 'Field required')
 
+    async def test_inactive_user_cant_login(self):
+        user = await self._create_user()
+        user.is_active = False
+        await user.asave(update_fields=['is_active'])
+
+        response = await self._post_credentials()
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    async def test_password_with_outdated_hash_is_rehashed(self):
+        user = await self._create_user()
+        user.password = PBKDF2PasswordHasher().encode(
+            'password',
+            salt='outdatedsalt',
+            iterations=1000,
+        )
+        await user.asave(update_fields=['password'])
+
+        response = await self._post_credentials()
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        await user.arefresh_from_db()
+        self.assertNotIn('$1000$', user.password)
+        self.assertTrue(await user.acheck_password('password'))
+
+    @parameterized.expand(
+        [
+            ('max_pending_per_client', HTTPStatus.TOO_MANY_REQUESTS),
+            ('max_pending', HTTPStatus.SERVICE_UNAVAILABLE),
+        ],
+    )
+    async def test_login_over_password_checker_limit(
+        self,
+        limit: str,
+        expected_status: HTTPStatus,
+    ):
+        await self._create_user()
+        with mock.patch.object(password_checker, limit, 0):
+            response = await self._post_credentials()
+
+        self.assertEqual(response.status_code, expected_status)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+    async def _post_credentials(self):
+        return await self.client.post(
+            reverse('api:login'),
+            data={'email': 'test_user', 'password': 'password'},
+            content_type='application/json',
+        )
+
+
+class PasswordCheckerTestCase(TestCase):
+    async def test_checks_of_one_client_are_limited(self):
+        checker = PasswordChecker(
+            max_workers=1,
+            max_pending=2,
+            max_pending_per_client=1,
+        )
+        release = threading.Event()
+
+        def verify(password: str, encoded: str | None):
+            release.wait()
+            return False, None
+
+        with mock.patch(
+            'apps.users.authentication.passwords._verify',
+            verify,
+        ):
+            first_check = asyncio.create_task(
+                checker.acheck(None, 'password', client='1.1.1.1'),
+            )
+            await asyncio.sleep(0)
+
+            with self.assertRaises(ClientPasswordChecksLimitError):
+                await checker.acheck(None, 'password', client='1.1.1.1')
+
+            release.set()
+            self.assertFalse(await first_check)
+
+        self.assertEqual(checker._pending, 0)
+        self.assertEqual(checker._pending_by_client, {})
+
+
+class ForwardedClientLoginTestCase(TransactionTestCase):
+    # Django's ASGI handler closes connections that are inside
+    # a transaction, so TestCase can't be used here
+    PROXY_ADDRESS = '10.0.0.2'
+
+    def setUp(self):
+        self.app = ProxyHeadersMiddleware(
+            ASGIHandler(),
+            trusted_hosts=self.PROXY_ADDRESS,
+        )
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+        def verify(password: str, encoded: str | None):
+            self.started.release()
+            self.release.wait()
+            return False, None
+
+        for patcher in (
+            mock.patch(
+                'apps.users.authentication.passwords._verify',
+                verify,
+            ),
+            mock.patch.object(password_checker, 'max_pending_per_client', 1),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_forwarded_clients_are_limited_separately(self):
+        first_login = await self.start_login(forwarded_for='1.1.1.1')
+        second_login = await self.start_login(forwarded_for='2.2.2.2')
+        for _ in range(2):
+            self.assertTrue(
+                await asyncio.to_thread(self.started.acquire, timeout=5),
+            )
+
+        third_login = await self.start_login(forwarded_for='1.1.1.1')
+        self.assertEqual(
+            await self.receive_status(third_login),
+            HTTPStatus.TOO_MANY_REQUESTS,
+        )
+
+        self.release.set()
+        self.assertEqual(
+            await self.receive_status(first_login),
+            HTTPStatus.UNAUTHORIZED,
+        )
+        self.assertEqual(
+            await self.receive_status(second_login),
+            HTTPStatus.UNAUTHORIZED,
+        )
+
+    async def start_login(self, forwarded_for: str) -> ApplicationCommunicator:
+        login = ApplicationCommunicator(
+            self.app,
+            {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'POST',
+                'scheme': 'http',
+                'path': reverse('api:login'),
+                'query_string': b'',
+                'headers': [
+                    (b'content-type', b'application/json'),
+                    (b'x-forwarded-for', forwarded_for.encode()),
+                ],
+                'client': (self.PROXY_ADDRESS, 50000),
+                'server': ('testserver', 80),
+            },
+        )
+        await login.send_input(
+            {
+                'type': 'http.request',
+                'body': b'{"email": "test_user", "password": "password"}',
+            },
+        )
+        return login
+
+    async def receive_status(self, login: ApplicationCommunicator) -> int:
+        response_start = await login.receive_output(timeout=5)
+        await login.wait(timeout=5)
+        return response_start['status']
+
 
 class LogoutTestCase(AuthTestsMixin, TestCase):
     async def test_authenticated_user_can_logout(self):
         user = await self._create_user()
-        old_refresh_token = user.refresh_token
+        token_pair = await user.generate_new_tokens()
 
         response = await self.client.post(
             reverse('api:logout'),
-            headers=await agenerate_auth_header(user),
+            headers={'Authorization': f'Bearer {token_pair.access_token}'},
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        await user.arefresh_from_db()
-        self.assertFalse(user.can_refresh_tokens(old_refresh_token))
+
+        response = await self.client.post(
+            reverse('api:refresh'),
+            data={'refresh_token': token_pair.refresh_token},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
 
     async def test_anonymous_user_can_logout(self):
         response = await self.client.post(reverse('api:logout'))
@@ -124,17 +328,55 @@ class AuthScreenplaysTestCase(TestCase):
     async def test_access_token_expires(self):
         token_pair = await self._login()
         with mock.patch(
-            'apps.users.authentication.jwt.timezone',
-        ) as mock_timezone:
-            mock_timezone.now.return_value = (
+            'apps.users.authentication.jwt.time',
+        ) as mock_time:
+            mock_time.time.return_value = (
                 timezone.now() + settings.ACCESS_TOKEN_TIME_TO_LIVE
-            )
+            ).timestamp()
             response = await self.client.get(
                 reverse('api:portfolios'),
                 headers={'Authorization': f'Bearer {token_pair.access_token}'},
             )
             self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
 
+    async def test_verified_access_token_expires(self):
+        token_pair = await self._login()
+        headers = {'Authorization': f'Bearer {token_pair.access_token}'}
+        response = await self.client.get(
+            reverse('api:portfolios'),
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        with mock.patch(
+            'apps.users.authentication.jwt.time',
+        ) as mock_time:
+            mock_time.time.return_value = (
+                timezone.now() + settings.ACCESS_TOKEN_TIME_TO_LIVE
+            ).timestamp()
+            response = await self.client.get(
+                reverse('api:portfolios'),
+                headers=headers,
+            )
+            self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    async def test_access_token_signature_is_verified_once(self):
+        token_pair = await self._login()
+        headers = {'Authorization': f'Bearer {token_pair.access_token}'}
+
+        with mock.patch(
+            'apps.users.authentication.jwt.jwt.decode',
+            wraps=jwt.decode,
+        ) as decode_mock:
+            for _ in range(3):
+                response = await self.client.get(
+                    reverse('api:portfolios'),
+                    headers=headers,
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        decode_mock.assert_called_once()
+
     async def test_user_can_refresh_tokens(self):
         token_pair = await self._login()
 
@@ -153,14 +395,35 @@ class AuthScreenplaysTestCase(TestCase):
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
+    async def test_refresh_token_can_be_used_once(self):
+        token_pair = await self._login()
+
+        response = await self.client.post(
+            reverse('api:refresh'),
+            data={'refresh_token': token_pair.refresh_token},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        response = await self.client.post(
+            reverse('api:refresh'),
+            data={'refresh_token': token_pair.refresh_token},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            json.loads(response.content),
+            {'error': 'token is no longer active'},
+        )
+
     async def test_can_refresh_after_access_token_expiration(self):
         token_pair = await self._login()
         with mock.patch(
-            'apps.users.authentication.jwt.timezone',
-        ) as mock_timezone:
-            mock_timezone.now.return_value = (
+            'apps.users.authentication.jwt.time',
+        ) as mock_time:
+            mock_time.time.return_value = (
                 timezone.now() + settings.ACCESS_TOKEN_TIME_TO_LIVE
-            )
+            ).timestamp()
 
             response = await self.client.post(
                 reverse('api:refresh'),
@@ -180,11 +443,11 @@ class AuthScreenplaysTestCase(TestCase):
     async def test_cant_refresh_after_refresh_token_expiration(self):
         token_pair = await self._login()
         with mock.patch(
-            'apps.users.authentication.jwt.timezone',
-        ) as mock_timezone:
-            mock_timezone.now.return_value = (
+            'apps.users.authentication.jwt.time',
+        ) as mock_time:
+            mock_time.time.return_value = (
                 timezone.now() + settings.REFRESH_TOKEN_TIME_TO_LIVE
-            )
+            ).timestamp()
 
             response = await self.client.post(
                 reverse('api:refresh'),
@@ -215,3 +478,208 @@ class AuthScreenplaysTestCase(TestCase):
             reverse('api:portfolios'),
         )
         self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+
+class VerifiedTokenCacheTestCase(TestCase):
+    def test_least_recently_used_token_is_evicted(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        payload = {'uid': 1, 'exp': timezone.now().timestamp() + 60}
+        cache.add('first', payload)
+        cache.add('second', payload)
+        cache.get('first')
+
+        cache.add('third', payload)
+
+        self.assertEqual(cache.get('first'), payload)
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(cache.get('third'), payload)
+
+    def test_expired_token_is_dropped(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        cache.add('token', {'uid': 1, 'exp': timezone.now().timestamp() - 1})
+
+        self.assertIsNone(cache.get('token'))
+        self.assertEqual(len(cache._payloads), 0)
+
+
+class UserCacheTestCase(AuthTestsMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+
+    async def _get_me(self, headers: dict[str, str]) -> dict:
+        response = await self.client.get(reverse('api:me'), headers=headers)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return json.loads(response.content)
+
+    def test_user_is_loaded_once(self):
+        user = User.objects.create_user(email='test_user', password='password')
+        headers = generate_auth_header(user)
+        client = Client()
+        client.get(reverse('api:me'), headers=headers)
+
+        with self.assertNumQueries(0):
+            response = client.get(reverse('api:me'), headers=headers)
+
+        self.assertEqual(
+            json.loads(response.content),
+            {'id': user.pk, 'email': 'test_user'},
+        )
+
+    async def test_saved_user_is_invalidated(self):
+        user = await self._create_user()
+        headers = await agenerate_auth_header(user)
+        await self._get_me(headers)
+
+        user.email = 'new_email'
+        await user.asave(update_fields=['email'])
+
+        content = await self._get_me(headers)
+        self.assertEqual(content['email'], 'new_email')
+
+    async def test_cached_user_can_logout(self):
+        user = await self._create_user()
+        token_pair = await user.generate_new_tokens()
+        headers = {'Authorization': f'Bearer {token_pair.access_token}'}
+        await self._get_me(headers)
+        self.assertIsNotNone(user_cache.get(user.pk))
+
+        response = await self.client.post(
+            reverse('api:logout'),
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        response = await self.client.post(
+            reverse('api:refresh'),
+            data={'refresh_token': token_pair.refresh_token},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    async def test_rotated_user_is_invalidated(self):
+        user = await self._create_user()
+        token_pair = await user.generate_new_tokens()
+        await self._get_me(
+            {'Authorization': f'Bearer {token_pair.access_token}'},
+        )
+        self.assertIsNotNone(user_cache.get(user.pk))
+
+        async with aexecute_on_commit_callbacks(self):
+            response = await self.client.post(
+                reverse('api:refresh'),
+                data={'refresh_token': token_pair.refresh_token},
+                content_type='application/json',
+            )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsNone(user_cache.get(user.pk))
+
+    def test_user_loaded_before_invalidation_is_not_stored(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        user = ItableUser(pk=1, email='test_user')
+        version = cache.version
+        cache.invalidate(user.pk)
+
+        cache.set(user, version)
+
+        self.assertIsNone(cache.get(user.pk))
+
+    def test_cached_user_is_copied(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        user = ItableUser(pk=1, email='test_user')
+        cache.set(user, cache.version)
+
+        cached_user = cache.get(user.pk)
+        assert cached_user is not None
+        cached_user.email = 'new_email'
+
+        self.assertEqual(cache.get(user.pk).email, 'test_user')
+
+    def test_least_recently_used_user_is_evicted(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        for pk in (1, 2):
+            cache.set(ItableUser(pk=pk), cache.version)
+        cache.get(1)
+
+        cache.set(ItableUser(pk=3), cache.version)
+
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(3))
+
+
+class JWTKeySetTestCase(TestCase):
+    def setUp(self):
+        self.previous_key = Ed25519PrivateKey.generate()
+        self.current_key = Ed25519PrivateKey.generate()
+
+    def test_token_signed_with_previous_key_is_accepted(self):
+        previous_jwt = PyJWT(JWTKeySet({}, 'previous', self.previous_key))
+        token_pair = previous_jwt.generate_tokens(1, 1)
+
+        rotated_jwt = PyJWT(
+            JWTKeySet(
+                {'previous': self.previous_key.public_key()},
+                'current',
+                self.current_key,
+            ),
+        )
+
+        payload = rotated_jwt.decode_token(token_pair.access_token)
+        self.assertEqual(payload['uid'], 1)
+        new_token_pair = rotated_jwt.generate_tokens(1, 2)
+        self.assertEqual(
+            jwt.get_unverified_header(new_token_pair.access_token)['kid'],
+            'current',
+        )
+
+    def test_token_signed_with_unknown_key_is_rejected(self):
+        previous_jwt = PyJWT(JWTKeySet({}, 'previous', self.previous_key))
+        token_pair = previous_jwt.generate_tokens(1, 1)
+
+        current_jwt = PyJWT(JWTKeySet({}, 'current', self.current_key))
+        with self.assertRaises(InvalidTokenError):
+            current_jwt.decode_token(token_pair.access_token)
+
+    def test_verification_only_key_set_cant_sign(self):
+        token_pair = PyJWT(
+            JWTKeySet({}, 'current', self.current_key),
+        ).generate_tokens(1, 1)
+        verifying_jwt = PyJWT(
+            JWTKeySet({'current': self.current_key.public_key()}),
+        )
+
+        self.assertEqual(
+            verifying_jwt.decode_token(token_pair.access_token)['uid'],
+            1,
+        )
+        with self.assertRaises(SigningKeyIsNotConfiguredError):
+            verifying_jwt.generate_tokens(1, 1)
+
+    def test_keys_are_read_from_files(self):
+        with tempfile.TemporaryDirectory() as keys_dir:
+            signing_key_file = Path(keys_dir) / 'current.key'
+            signing_key_file.write_bytes(
+                self.current_key.private_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PrivateFormat.PKCS8,
+                    encryption_algorithm=serialization.NoEncryption(),
+                ),
+            )
+            (Path(keys_dir) / 'previous.pem').write_bytes(
+                self.previous_key.public_key().public_bytes(
+                    encoding=serialization.Encoding.PEM,
+                    format=serialization.PublicFormat.SubjectPublicKeyInfo,
+                ),
+            )
+
+            with self.settings(
+                JWT_SIGNING_KEY_FILE=str(signing_key_file),
+                JWT_VERIFICATION_KEYS_DIR=keys_dir,
+            ):
+                key_set = JWTKeySet.from_settings()
+
+        self.assertEqual(key_set.signing_key[0], 'current')
+        self.assertIsNotNone(key_set.get_verification_key('current'))
+        self.assertIsNotNone(key_set.get_verification_key('previous'))
@@ -2,19 +2,24 @@ import dataclasses
 import datetime
 from http import HTTPStatus
 import json
+import typing
 
 from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.http import JsonResponse
 from django.test import RequestFactory, TestCase
 from django.utils import timezone
 from parameterized import parameterized
 
+from api import exceptions
 from api.core.api_view import api_view
 from api.utils import Dispatcher
 from api.utils.converters import (
     ModelToDataclassConverter,
+    QuerySetToJsonConverter,
 )
+from api.utils.pagination import Cursor, KeysetPaginator
 from api.utils.schema_mixins import ValidateIdFieldsMixin
 from api.utils.strings import undo_camel_case
 from apps.exchange.models import Security
@@ -265,6 +270,25 @@ class ModelToDataclassConverterTestCase(TestCase):
                 schema=Schema,
             ).convert()
 
+    async def test_model_to_dataclass_handles_any_fields(self):
+        @dataclasses.dataclass
+        class Schema:
+            id: int | typing.Any
+            name: typing.Any
+
+        class ModelMock:
+            def __init__(self):
+                self.id = 'id'
+                self.name = None
+
+        dataclass_instance = await ModelToDataclassConverter(
+            source=ModelMock(),
+            schema=Schema,
+        ).convert()
+
+        self.assertEqual(dataclass_instance.id, 'id')
+        self.assertIsNone(dataclass_instance.name)
+
     async def test_model_to_dataclass_keeps_timezone(self):
         @dataclasses.dataclass
         class Schema:
@@ -387,6 +411,44 @@ class ModelToDataclassConverterTestCase(TestCase):
         self.assertEqual(portfolios[0].name, 'Test Portfolio 1')
         self.assertEqual(portfolios[0].owner.email, 'test_user')
 
+    async def test_model_to_dataclass_auto_source_uses_each_row(self):
+        for email in ('first_owner', 'second_owner'):
+            user = await sync_to_async(User.objects.create_user)(
+                email=email,
+                password='password',
+            )
+            await Portfolio.objects.acreate(name=email, owner=user)
+
+        @dataclasses.dataclass
+        class UserSchema:
+            email: str
+
+        @dataclasses.dataclass
+        class PortfolioSchema:
+            name: str
+            owner: UserSchema
+
+        converter = ModelToDataclassConverter(
+            source=Portfolio.objects.select_related('owner'),
+            schema=PortfolioSchema,
+            fields_map={
+                'owner': ModelToDataclassConverter(
+                    schema=UserSchema,
+                    fields_map={'email': 'owner__email'},
+                ),
+            },
+            many=True,
+        )
+        portfolios = await converter.convert()
+
+        self.assertEqual(
+            [(p.name, p.owner.email) for p in portfolios],
+            [
+                ('first_owner', 'first_owner'),
+                ('second_owner', 'second_owner'),
+            ],
+        )
+
     async def test_model_to_dataclass_auto_source_fail(self):
         @dataclasses.dataclass
         class Schema:
@@ -399,6 +461,177 @@ class ModelToDataclassConverterTestCase(TestCase):
             await converter.convert()
 
 
+class QuerySetToJsonConverterTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='test_user',
+            password='password',
+        )
+        cls.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            owner=cls.user,
+        )
+
+    async def test_query_set_to_json_nested_conversion(self):
+        @dataclasses.dataclass
+        class UserSchema:
+            id: int
+            email: str
+
+        @dataclasses.dataclass
+        class PortfolioSchema:
+            id: int
+            name: str
+            owner: UserSchema
+            created: datetime.datetime
+
+        converter = QuerySetToJsonConverter(
+            source=Portfolio.objects.all(),
+            schema=PortfolioSchema,
+            fields_map={
+                'owner': QuerySetToJsonConverter(
+                    schema=UserSchema,
+                    fields_map={
+                        'id': 'owner__id',
+                        'email': 'owner__email',
+                    },
+                ),
+                'created': 'created_at',
+            },
+        )
+        portfolios = json.loads(await converter.convert())
+
+        self.assertEqual(
+            portfolios,
+            [
+                {
+                    'id': self.portfolio.id,
+                    'name': 'Test Portfolio',
+                    'owner': {'id': self.user.id, 'email': 'test_user'},
+                    'created': DjangoJSONEncoder().default(
+                        self.portfolio.created_at,
+                    ),
+                },
+            ],
+        )
+
+    async def test_query_set_to_json_skip_fields(self):
+        @dataclasses.dataclass
+        class PortfolioSchema:
+            name: str
+            owner: int
+
+        converter = QuerySetToJsonConverter(
+            source=Portfolio.objects.all(),
+            schema=PortfolioSchema,
+            skip_fields=('owner',),
+        )
+        portfolios = json.loads(await converter.convert())
+
+        self.assertEqual(
+            portfolios,
+            [{'name': 'Test Portfolio', 'owner': None}],
+        )
+
+    def test_query_set_to_json_nested_source_fail(self):
+        @dataclasses.dataclass
+        class Schema:
+            id: int
+
+        with self.assertRaises(ValueError):
+            QuerySetToJsonConverter(
+                source=Portfolio.objects.all(),
+                schema=Schema,
+                fields_map={
+                    'id': QuerySetToJsonConverter(
+                        source=Portfolio.objects.all(),
+                        schema=Schema,
+                    ),
+                },
+            )
+
+    async def test_query_set_to_json_auto_source_fail(self):
+        @dataclasses.dataclass
+        class Schema:
+            id: int
+
+        converter = QuerySetToJsonConverter(schema=Schema)
+
+        with self.assertRaises(AttributeError):
+            await converter.convert()
+
+
+class KeysetPaginatorTestCase(TestCase):
+    def test_cursor_keeps_microseconds(self):
+        cursor = Cursor(
+            created_at=datetime.datetime(
+                2025,
+                1,
+                2,
+                3,
+                4,
+                5,
+                678901,
+                tzinfo=datetime.UTC,
+            ),
+            id=42,
+        )
+
+        self.assertEqual(Cursor.decode(cursor.encode()), cursor)
+
+    @parameterized.expand(
+        [
+            ('not a cursor',),
+            ('W10',),  # []
+            ('WyJ0ZXh0IiwxXQ',),  # ["text",1]
+            ('WyIyMDI1LTAxLTAyIiwiMSJd',),  # ["2025-01-02","1"]
+        ],
+    )
+    def test_invalid_cursor_is_rejected(self, value):
+        request = RequestFactory().get('/', {'cursor': value})
+
+        with self.assertRaisesMessage(
+            exceptions.BadRequestError,
+            'invalid cursor',
+        ):
+            KeysetPaginator.from_request(request)
+
+    @parameterized.expand([('0',), ('-1',), ('ten',)])
+    def test_invalid_limit_is_rejected(self, limit):
+        request = RequestFactory().get('/', {'limit': limit})
+
+        with self.assertRaises(exceptions.BadRequestError):
+            KeysetPaginator.from_request(request)
+
+    def test_limit_is_capped(self):
+        request = RequestFactory().get('/', {'limit': '100000'})
+        paginator = KeysetPaginator.from_request(request)
+
+        self.assertEqual(paginator.limit, KeysetPaginator.MAX_LIMIT)
+        self.assertFalse(paginator.stream)
+
+    def test_page_has_cursor_of_last_item(self):
+        created_at = timezone.now()
+        rows = [{'id': i, 'created_at': created_at} for i in range(3)]
+
+        page = KeysetPaginator(limit=2).get_page(rows)
+
+        self.assertEqual(page.items, rows[:2])
+        self.assertEqual(
+            Cursor.decode(page.next_cursor),
+            Cursor(created_at, 1),
+        )
+
+    def test_last_page_has_no_cursor(self):
+        rows = [{'id': 1, 'created_at': timezone.now()}]
+
+        page = KeysetPaginator(limit=1).get_page(rows)
+
+        self.assertEqual(page.items, rows)
+        self.assertIsNone(page.next_cursor)
+
+
 class StringsHelpersTestCase(TestCase):
     @parameterized.expand(
         [
@@ -4,16 +4,19 @@ from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.core.serializers.json import DjangoJSONEncoder
-from django.test import AsyncClient, TestCase
+from django.test import AsyncClient, Client, TestCase
 from django.urls import reverse
 from parameterized import parameterized
 
 from apps.exchange.models import Security
 from apps.portfolios.models import Portfolio, PortfolioItem
 from services.exchange.stock_markets import MOEX
-from tests.api.helpers import generate_auth_header
+from tests.api.helpers import (
+    aexecute_on_commit_callbacks,
+    generate_auth_header,
+)
 from tests.services.exchange.test_moex_integration import MockISSClientFactory
-from utils.db_helpers import AsyncAtomic
+from utils.cache import response_cache
 
 User = get_user_model()
 
@@ -51,6 +54,8 @@ class PortfolioEndpointTestCase(TestCase):
         )
 
     def setUp(self):
+        # Users from setUpTestData are shared by the tests
+        response_cache.clear()
         self.client = AsyncClient()
         self.owner_credentials = generate_auth_header(self.portfolio_owner)
         self.not_owner_credentials = generate_auth_header(
@@ -80,6 +85,118 @@ class PortfolioEndpointTestCase(TestCase):
         )
         self.assertJSONEqual(response.content.decode(), expected)
 
+    def test_portfolio_is_loaded_once(self):
+        # The portfolio loaded by the permission is reused by the service,
+        # so it's just the portfolio, its version and its items
+        with self.assertNumQueries(3):
+            response = Client().get(
+                self.endpoint_path,
+                headers=self.owner_credentials,
+            )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_unchanged_portfolio_is_not_sent_again(self):
+        client = Client()
+        response = client.get(
+            self.endpoint_path,
+            headers=self.owner_credentials,
+        )
+        etag = response.headers['ETag']
+        # Another worker, which hasn't cached the response
+        response_cache.clear()
+
+        # Only the permission check and the version
+        with self.assertNumQueries(2):
+            response = client.get(
+                self.endpoint_path,
+                headers={**self.owner_credentials, 'If-None-Match': etag},
+            )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_repeated_get_is_served_from_cache(self):
+        client = Client()
+        response = client.get(
+            self.endpoint_path,
+            headers=self.owner_credentials,
+        )
+
+        with self.assertNumQueries(0):
+            cached_response = client.get(
+                self.endpoint_path,
+                headers=self.owner_credentials,
+            )
+            not_modified_response = client.get(
+                self.endpoint_path,
+                headers={
+                    **self.owner_credentials,
+                    'If-None-Match': response.headers['ETag'],
+                },
+            )
+
+        self.assertEqual(cached_response.status_code, HTTPStatus.OK)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(
+            cached_response.headers['ETag'],
+            response.headers['ETag'],
+        )
+        self.assertEqual(
+            not_modified_response.status_code,
+            HTTPStatus.NOT_MODIFIED,
+        )
+
+    async def test_cached_portfolio_is_not_shared_with_other_users(self):
+        await self.client.get(
+            self.endpoint_path,
+            headers=self.owner_credentials,
+        )
+
+        response = await self.client.get(
+            self.endpoint_path,
+            headers=self.not_owner_credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @parameterized.expand(
+        [
+            ('rename', 'patch', '', {'name': 'new name'}),
+            ('update_security', 'patch', 'securities/SBER/', {'quantity': 7}),
+            ('remove_security', 'delete', 'securities/T/', None),
+        ],
+    )
+    async def test_portfolio_etag_changes_on_write(
+        self,
+        _,
+        method,
+        path,
+        data,
+    ):
+        response = await self.client.get(
+            self.endpoint_path,
+            headers=self.owner_credentials,
+        )
+        etag = response.headers['ETag']
+
+        async with aexecute_on_commit_callbacks(self):
+            response = await getattr(self.client, method)(
+                self.endpoint_path + path,
+                data=data,
+                content_type='application/json',
+                headers=self.owner_credentials,
+            )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        response = await self.client.get(
+            self.endpoint_path,
+            headers={**self.owner_credentials, 'If-None-Match': etag},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
     async def test_other_user_cant_get_portfolio(self):
         response = await self.client.get(
             self.endpoint_path,
@@ -194,6 +311,8 @@ class PortfolioListTestCase(TestCase):
         cls.endpoint_path = reverse('api:portfolios')
 
     def setUp(self):
+        # Users from setUpTestData are shared by the tests
+        response_cache.clear()
         self.client = AsyncClient()
         self.first_user_credentials = generate_auth_header(self.first_user)
 
@@ -213,6 +332,51 @@ class PortfolioListTestCase(TestCase):
             ['id', 'name', 'owner_id', 'created_at'],
         )
 
+    async def test_user_can_page_through_portfolios(self):
+        response = await self.client.get(
+            self.endpoint_path,
+            {'limit': 1},
+            headers=self.first_user_credentials,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        first_page = json.loads(response.content)
+
+        self.assertEqual(
+            [p['name'] for p in first_page['portfolios']],
+            ['Test Portfolio'],
+        )
+        self.assertIsNotNone(first_page['next_cursor'])
+
+        response = await self.client.get(
+            self.endpoint_path,
+            {'limit': 1, 'cursor': first_page['next_cursor']},
+            headers=self.first_user_credentials,
+        )
+        second_page = json.loads(response.content)
+
+        self.assertEqual(
+            [p['name'] for p in second_page['portfolios']],
+            ['Test Portfolio2'],
+        )
+        self.assertIsNone(second_page['next_cursor'])
+
+    async def test_user_can_stream_portfolios(self):
+        response = await self.client.get(
+            self.endpoint_path,
+            {'stream': 'true'},
+            headers=self.first_user_credentials,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+
+        content = b''.join([chunk async for chunk in response])
+        portfolios = json.loads(content)['portfolios']
+
+        self.assertEqual(
+            [p['name'] for p in portfolios],
+            ['Test Portfolio', 'Test Portfolio2'],
+        )
+
     async def test_anonymous_user_cant_get_portfolios(self):
         response = await self.client.get(self.endpoint_path)
         self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
@@ -276,6 +440,8 @@ class PortfolioSecurityTestCase(TestCase):
         )
 
     def setUp(self):
+        # Users from setUpTestData are shared by the tests
+        response_cache.clear()
         self.client = AsyncClient()
         self.first_user_credentials = generate_auth_header(self.first_user)
         self.second_user_credentials = generate_auth_header(self.second_user)
@@ -313,13 +479,12 @@ class PortfolioSecurityTestCase(TestCase):
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
 
-        async with AsyncAtomic():
-            response = await self.client.post(
-                self.endpoint_path,
-                data={'ticker': 'SBER', 'quantity': 5},
-                content_type='application/json',
-                headers=self.first_user_credentials,
-            )
+        response = await self.client.post(
+            self.endpoint_path,
+            data={'ticker': 'SBER', 'quantity': 5},
+            content_type='application/json',
+            headers=self.first_user_credentials,
+        )
 
         error = json.loads(response.content)['error']
 
@@ -499,6 +664,160 @@ class PortfolioSecurityTestCase(TestCase):
             1,
         )
 
+    @mock.patch('apps.exchange.models.security.MOEX')
+    async def test_user_can_apply_security_operations(self, mock_moex):
+        moex = MOEX(client_factory=MockISSClientFactory())
+        mock_moex.return_value = moex
+        await self._add_security_to_first_user_portfolio_and_get_its_url()
+
+        with mock.patch.object(
+            moex,
+            'get_existing_tickers',
+            wraps=moex.get_existing_tickers,
+        ) as get_existing_tickers_mock:
+            response = await self.client.patch(
+                self.endpoint_path,
+                data={
+                    'operations': [
+                        {'action': 'update', 'ticker': 'SBER', 'quantity': 5},
+                        {'action': 'add', 'ticker': 'T', 'quantity': 2},
+                        {'action': 'add', 'ticker': 'GAZP', 'quantity': 3},
+                        {'action': 'add', 'ticker': 'TEST', 'quantity': 4},
+                        {'action': 'remove', 'ticker': 'LKOH'},
+                    ],
+                },
+                content_type='application/json',
+                headers=self.first_user_credentials,
+            )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            response.json()['results'],
+            [
+                {
+                    'action': 'update',
+                    'ticker': 'SBER',
+                    'quantity': 5,
+                    'error': None,
+                },
+                {'action': 'add', 'ticker': 'T', 'quantity': 2, 'error': None},
+                {
+                    'action': 'add',
+                    'ticker': 'GAZP',
+                    'quantity': 3,
+                    'error': None,
+                },
+                {
+                    'action': 'add',
+                    'ticker': 'TEST',
+                    'quantity': None,
+                    'error': 'security not found',
+                },
+                {
+                    'action': 'remove',
+                    'ticker': 'LKOH',
+                    'quantity': None,
+                    'error': 'portfolio security not found',
+                },
+            ],
+        )
+        # Only the tickers to add that aren't in the database
+        get_existing_tickers_mock.assert_awaited_once_with(['GAZP', 'TEST'])
+
+        items = self.first_user_portfolio.items.values_list(
+            'security__ticker',
+            'quantity',
+        )
+        items = {ticker: quantity async for ticker, quantity in items}
+        self.assertEqual(items, {'SBER': 5, 'T': 2, 'GAZP': 3})
+
+    async def test_security_operations_fail_one_by_one(self):
+        await self._add_security_to_first_user_portfolio_and_get_its_url()
+        portfolio_item: PortfolioItem = (
+            await self.first_user_portfolio.items.aget()
+        )
+        # The first operation would have changed it to 5
+        self.assertNotEqual(portfolio_item.quantity, 5)
+
+        response = await self.client.patch(
+            self.endpoint_path,
+            data={
+                'operations': [
+                    {'action': 'add', 'ticker': 'SBER', 'quantity': 5},
+                    {'action': 'update', 'ticker': 'T', 'quantity': 5},
+                    {'action': 'remove', 'ticker': 'SBER2'},
+                ],
+            },
+            content_type='application/json',
+            headers=self.first_user_credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [result['error'] for result in response.json()['results']],
+            [
+                'security already exists',
+                'portfolio security not found',
+                'portfolio security not found',
+            ],
+        )
+        quantity = portfolio_item.quantity
+        await portfolio_item.arefresh_from_db()
+        self.assertEqual(portfolio_item.quantity, quantity)
+
+    async def test_user_can_remove_securities_with_operations(self):
+        await self._add_security_to_first_user_portfolio_and_get_its_url()
+
+        response = await self.client.patch(
+            self.endpoint_path,
+            data={'operations': [{'action': 'remove', 'ticker': 'SBER'}]},
+            content_type='application/json',
+            headers=self.first_user_credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIsNone(response.json()['results'][0]['error'])
+        self.assertFalse(await self.first_user_portfolio.items.aexists())
+
+    @parameterized.expand(
+        [
+            ([],),
+            ([{'action': 'add', 'ticker': 'SBER'}],),
+            ([{'action': 'replace', 'ticker': 'SBER', 'quantity': 1}],),
+            (
+                [
+                    {'action': 'add', 'ticker': 'SBER', 'quantity': 1},
+                    {'action': 'remove', 'ticker': 'SBER'},
+                ],
+            ),
+        ],
+    )
+    async def test_invalid_security_operations_are_rejected(self, operations):
+        response = await self.client.patch(
+            self.endpoint_path,
+            data={'operations': operations},
+            content_type='application/json',
+            headers=self.first_user_credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertFalse(await self.first_user_portfolio.items.aexists())
+
+    async def test_user_cant_apply_operations_to_not_own_portfolio(self):
+        response = await self.client.patch(
+            self.endpoint_path,
+            data={
+                'operations': [
+                    {'action': 'add', 'ticker': 'SBER', 'quantity': 1},
+                ],
+            },
+            content_type='application/json',
+            headers=self.second_user_credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertFalse(await self.first_user_portfolio.items.aexists())
+
     async def _add_security_to_first_user_portfolio_and_get_its_url(
         self,
     ) -> str:
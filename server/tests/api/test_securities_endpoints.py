@@ -1,4 +1,5 @@
 from http import HTTPStatus
+import time
 from unittest import mock
 
 from django.contrib.auth import get_user_model
@@ -6,6 +7,8 @@ from django.test import AsyncClient, TestCase
 from django.urls import reverse
 
 from services.exchange.stock_markets import MOEX
+from services.exchange.stock_markets.quote_table import quote_table
+from services.exchange.stock_markets.typedefs import SecurityDict
 from tests.api.helpers import generate_auth_header
 from tests.services.exchange.test_moex_integration import MockISSClientFactory
 
@@ -21,6 +24,7 @@ class SecurityListTestCase(TestCase):
         )
 
     def setUp(self):
+        quote_table.clear()
         self.client = AsyncClient()
         self.credentials = generate_auth_header(self.user)
 
@@ -35,6 +39,32 @@ class SecurityListTestCase(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(len(response.json()['securities']), 2)
 
+    @mock.patch('api.views.securities.securities.MOEX')
+    async def test_security_list_uses_quote_table(self, moex_mock):
+        moex_mock.return_value = MOEX(client_factory=MockISSClientFactory())
+        quote = SecurityDict(
+            ticker='LKOH',
+            short_name='ЛУКОЙЛ',
+            price=1,
+            lot_size=1,
+        )
+        quote_table.update([quote], fetched_at=time.time())
+
+        response = await self.client.get(
+            reverse('api:securities'),
+            query_params={'tickers': ['LKOH', 'GAZP']},
+            headers=self.credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        securities = response.json()['securities']
+        self.assertEqual(securities[0], quote)
+        # Only the missing ticker is requested from MOEX
+        self.assertEqual(
+            [security['ticker'] for security in securities[1:]],
+            ['GAZP'],
+        )
+
     async def test_security_list_unauthorized_request(self):
         response = await self.client.get(
             reverse('api:securities'),
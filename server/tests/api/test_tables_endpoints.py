@@ -14,7 +14,11 @@ from apps.investment_tables.models import (
     TableTemplate,
 )
 from apps.portfolios.models import Portfolio
-from tests.api.helpers import generate_auth_header
+from tests.api.helpers import (
+    aexecute_on_commit_callbacks,
+    generate_auth_header,
+)
+from utils.cache import response_cache
 from utils.db_helpers import AsyncAtomic
 
 User = get_user_model()
@@ -22,6 +26,8 @@ User = get_user_model()
 
 class SnapshotsFixtureMixin:
     def setUp(self):
+        # Users from setUpTestData are shared by the tests
+        response_cache.clear()
         self.client = AsyncClient()
         self.credentials = generate_auth_header(self.user)
 
@@ -122,6 +128,86 @@ class TableSnapshotListTestCase(SnapshotsFixtureMixin, TestCase):
         for snapshot in snapshots:
             self.assertNotEqual(snapshot['name'], 'another user snapshot')
 
+    async def test_user_can_page_through_snapshots(self):
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            {'limit': 1},
+            headers=self.credentials,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        first_page = json.loads(response.content)
+
+        self.assertEqual(
+            [s['name'] for s in first_page['snapshots']],
+            ['first snapshot'],
+        )
+
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            {'limit': 1, 'cursor': first_page['next_cursor']},
+            headers=self.credentials,
+        )
+        second_page = json.loads(response.content)
+
+        self.assertEqual(
+            [s['name'] for s in second_page['snapshots']],
+            ['second snapshot'],
+        )
+        self.assertIsNone(second_page['next_cursor'])
+
+    async def test_user_can_stream_snapshots(self):
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            {'stream': 'true'},
+            headers=self.credentials,
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        content = b''.join([chunk async for chunk in response])
+        snapshots = json.loads(content)['snapshots']
+
+        self.assertEqual(
+            [s['name'] for s in snapshots],
+            ['first snapshot', 'second snapshot'],
+        )
+        self.assertEqual(snapshots[0]['template']['slug'], 'spindx')
+
+    async def test_invalid_cursor_is_rejected(self):
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            {'cursor': 'not a cursor'},
+            headers=self.credentials,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json(), {'error': 'invalid cursor'})
+
+    async def test_snapshot_list_etag_changes_on_new_snapshot(self):
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            headers=self.credentials,
+        )
+        etag = response.headers['ETag']
+
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            headers={**self.credentials, 'If-None-Match': etag},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        async with aexecute_on_commit_callbacks(self):
+            await TableSnapshot.from_template(
+                template=self.template,
+                portfolio=self.portfolio,
+                name='third snapshot',
+            )
+        response = await self.client.get(
+            reverse('api:table_snapshots'),
+            headers={**self.credentials, 'If-None-Match': etag},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(response.json()['snapshots']), 3)
+
     async def test_anonymous_user_cannot_get_snapshot_list(self):
         response = await self.client.get(reverse('api:table_snapshots'))
         self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
@@ -0,0 +1,77 @@
+from django.test import TestCase
+from faststream.nats import NatsBroker, TestNatsBroker
+
+from apps.users.authentication.user_cache import user_cache
+from apps.users.models import ItableUser
+from events.domain_events import (
+    DomainEvent,
+    IndexSynced,
+    ORIGIN_HEADER,
+    PortfolioChanged,
+    PROCESS_ID,
+    TableSnapshotCreated,
+    UserChanged,
+)
+from events.handlers import create_domain_events_router
+from utils.cache import CachedResponse, response_cache
+
+RESPONSE = CachedResponse(b'{}', 'application/json', '"v1"')
+
+
+class DomainEventsTestCase(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        response_cache.set(1, '/a/', RESPONSE, response_cache.version)
+        response_cache.set(2, '/a/', RESPONSE, response_cache.version)
+
+    async def test_event_of_another_process_is_applied(self):
+        await self._receive(
+            TableSnapshotCreated(snapshot_id=1, portfolio_id=1, owner_id=1),
+            origin='another-process',
+        )
+
+        self.assertIsNone(response_cache.get(1, '/a/'))
+        self.assertEqual(response_cache.get(2, '/a/'), RESPONSE)
+
+    async def test_user_event_drops_cached_user(self):
+        user_cache.clear()
+        user = ItableUser(pk=1, email='test_user')
+        user_cache.set(user, user_cache.version)
+
+        await self._receive(UserChanged(user_id=1), origin='another-process')
+
+        self.assertIsNone(user_cache.get(1))
+
+    async def test_own_event_is_not_applied_twice(self):
+        version = response_cache.version
+
+        await self._receive(
+            PortfolioChanged(portfolio_id=1, owner_id=1),
+            origin=PROCESS_ID,
+        )
+
+        self.assertEqual(response_cache.version, version)
+        self.assertEqual(response_cache.get(1, '/a/'), RESPONSE)
+
+    async def test_event_without_cached_data_keeps_cache(self):
+        await self._receive(
+            IndexSynced(template_slug='imoex'),
+            origin='another-process',
+        )
+
+        self.assertEqual(response_cache.get(1, '/a/'), RESPONSE)
+
+    async def _receive(
+        self,
+        event: DomainEvent,
+        origin: str,
+    ) -> None:
+        broker = NatsBroker()
+        broker.include_router(create_domain_events_router())
+
+        async with TestNatsBroker(broker) as test_broker:
+            await test_broker.publish(
+                event,
+                event.SUBJECT,
+                headers={ORIGIN_HEADER: origin},
+            )
@@ -0,0 +1,362 @@
+import asyncio
+from collections.abc import AsyncIterator
+import datetime as dt
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async, ThreadSensitiveContext
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.test import override_settings, TestCase, TransactionTestCase
+from django.utils import timezone
+from nats.errors import FlushTimeoutError
+
+from apps.outbox.models import OutboxEvent
+from events.domain_events import (
+    IndexSynced,
+    ORIGIN_HEADER,
+    PortfolioChanged,
+    PROCESS_ID,
+)
+from events.event_bus import EventBus, Status
+from events.outbox import add_events, OutboxRelay
+from events.streams import MESSAGE_ID_HEADER
+from utils.cache import CachedResponse, response_cache
+
+RESPONSE = CachedResponse(b'{}', 'application/json', '"v1"')
+# Not patched, unlike the attribute of EventBus in the relay tests
+PUBLISH_BATCH = EventBus.publish_batch
+
+
+async def ack_all(messages, stream=None):
+    return [True] * len(messages)
+
+
+class AddEventsTestCase(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        response_cache.set(1, '/a/', RESPONSE, response_cache.version)
+        response_cache.set(2, '/a/', RESPONSE, response_cache.version)
+
+    @override_settings(HANDLE_EVENTS=True)
+    def test_events_are_saved(self):
+        add_events(
+            PortfolioChanged(portfolio_id=1, owner_id=1),
+            IndexSynced(template_slug='imoex'),
+        )
+
+        self.assertEqual(
+            list(
+                OutboxEvent.objects.order_by('pk').values_list(
+                    'subject',
+                    'payload',
+                    'origin',
+                ),
+            ),
+            [
+                (
+                    'domain.portfolio.changed',
+                    {'portfolio_id': 1, 'owner_id': 1},
+                    PROCESS_ID,
+                ),
+                (
+                    'domain.index.synced',
+                    {'template_slug': 'imoex'},
+                    PROCESS_ID,
+                ),
+            ],
+        )
+
+    @override_settings(HANDLE_EVENTS=False)
+    def test_events_are_not_saved_without_event_bus(self):
+        add_events(PortfolioChanged(portfolio_id=1, owner_id=1))
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_events_are_applied_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            add_events(PortfolioChanged(portfolio_id=1, owner_id=1))
+
+            self.assertEqual(response_cache.get(1, '/a/'), RESPONSE)
+
+        for callback in callbacks:
+            callback()
+
+        self.assertIsNone(response_cache.get(1, '/a/'))
+        self.assertEqual(response_cache.get(2, '/a/'), RESPONSE)
+
+
+@mock.patch('events.outbox.EventBus.publish_batch', side_effect=ack_all)
+class OutboxRelayTestCase(TestCase):
+    async def test_oldest_events_are_relayed_and_deleted(self, publish_mock):
+        await self._create_events(3, origin='another-process')
+        pks = [
+            pk
+            async for pk in OutboxEvent.objects.values_list(
+                'pk',
+                flat=True,
+            ).order_by('pk')
+        ]
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        self.assertEqual(await relay.relay_batch(), 2)
+
+        publish_mock.assert_awaited_once()
+        (messages,) = publish_mock.await_args.args
+        self.assertIsNone(publish_mock.await_args.kwargs['stream'])
+        self.assertEqual(
+            messages,
+            [
+                (
+                    {'portfolio_id': portfolio_id, 'owner_id': 1},
+                    'domain.portfolio.changed',
+                    {
+                        ORIGIN_HEADER: 'another-process',
+                        MESSAGE_ID_HEADER: f'outbox-{pk}',
+                    },
+                )
+                for portfolio_id, pk in enumerate(pks[:2])
+            ],
+        )
+        self.assertEqual(
+            [
+                payload['portfolio_id']
+                async for payload in OutboxEvent.objects.values_list(
+                    'payload',
+                    flat=True,
+                )
+            ],
+            [2],
+        )
+
+    async def test_empty_outbox_is_not_published(self, publish_mock):
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        self.assertEqual(await relay.relay_batch(), 0)
+
+        publish_mock.assert_not_awaited()
+
+    async def test_events_are_kept_if_publishing_fails(self, publish_mock):
+        publish_mock.side_effect = ConnectionError
+        await self._create_events(2)
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        with self.assertRaises(ConnectionError):
+            await relay.relay_batch()
+
+        # Unclaimed, so they are published with the next batch
+        self.assertEqual(
+            await OutboxEvent.objects.filter(
+                claimed_until__isnull=True,
+            ).acount(),
+            2,
+        )
+
+    async def test_events_are_kept_if_flush_fails(self, publish_mock):
+        # Core publishing has buffered the batch, but it hasn't
+        # reached the broker
+        publish_mock.side_effect = PUBLISH_BATCH
+        connection_mock = mock.Mock(
+            flush=mock.AsyncMock(side_effect=FlushTimeoutError),
+        )
+        await self._create_events(2)
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        with (
+            mock.patch.multiple(
+                EventBus,
+                status=Status.RUNNING,
+                broker=mock.Mock(publish=mock.AsyncMock()),
+                connection=connection_mock,
+            ),
+            self.assertRaises(FlushTimeoutError),
+        ):
+            await relay.relay_batch()
+
+        connection_mock.flush.assert_awaited_once()
+        self.assertEqual(
+            await OutboxEvent.objects.filter(
+                claimed_until__isnull=True,
+            ).acount(),
+            2,
+        )
+
+    async def test_claimed_events_are_skipped(self, publish_mock):
+        await self._create_events(3)
+        first, second, _ = [pk async for pk in self._get_pks()]
+        now = timezone.now()
+        # Claimed by a relay that is publishing them now
+        await OutboxEvent.objects.filter(pk=first).aupdate(
+            claimed_until=now + dt.timedelta(minutes=1),
+        )
+        # Claimed by a relay that has died
+        await OutboxEvent.objects.filter(pk=second).aupdate(
+            claimed_until=now - dt.timedelta(minutes=1),
+        )
+        relay = OutboxRelay(batch_size=3, interval=0)
+
+        self.assertEqual(await relay.relay_batch(), 2)
+
+        self.assertEqual([pk async for pk in self._get_pks()], [first])
+
+    async def test_unacknowledged_events_are_kept(self, publish_mock):
+        publish_mock.side_effect = None
+        publish_mock.return_value = [False, True]
+        await self._create_events(2)
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        self.assertEqual(await relay.relay_batch(), 1)
+
+        self.assertEqual(
+            [
+                payload['portfolio_id']
+                async for payload in OutboxEvent.objects.values_list(
+                    'payload',
+                    flat=True,
+                )
+            ],
+            [0],
+        )
+        self.assertFalse(
+            await OutboxEvent.objects.filter(
+                claimed_until__isnull=False,
+            ).aexists(),
+        )
+        self.assertEqual((await relay.get_metrics())['relayed'], 1)
+
+    @override_settings(EVENTS_JETSTREAM=True)
+    async def test_events_are_published_to_stream(self, publish_mock):
+        await self._create_events(1)
+        relay = OutboxRelay(batch_size=2, interval=0)
+
+        await relay.relay_batch()
+
+        self.assertEqual(
+            publish_mock.await_args.kwargs['stream'],
+            settings.EVENTS_STREAM_NAME,
+        )
+
+    async def test_metrics(self, publish_mock):
+        await self._create_events(3)
+        relay = OutboxRelay(batch_size=2, interval=0)
+        await relay.relay_batch()
+
+        metrics = await relay.get_metrics()
+
+        self.assertEqual(metrics['relayed'], 2)
+        self.assertEqual(metrics['batches'], 1)
+        self.assertEqual(metrics['failures'], 0)
+        self.assertEqual(metrics['backlog'], 1)
+
+        # Counters are reset after every call
+        metrics = await relay.get_metrics()
+
+        self.assertEqual(metrics['relayed'], 0)
+        self.assertEqual(metrics['batches'], 0)
+        self.assertEqual(metrics['backlog'], 1)
+
+    @staticmethod
+    def _get_pks() -> AsyncIterator[int]:
+        return aiter(
+            OutboxEvent.objects.order_by('pk').values_list('pk', flat=True),
+        )
+
+    @staticmethod
+    async def _create_events(count: int, origin: str = PROCESS_ID) -> None:
+        await OutboxEvent.objects.abulk_create(
+            [
+                OutboxEvent(
+                    subject=PortfolioChanged.SUBJECT,
+                    payload=PortfolioChanged(
+                        portfolio_id=portfolio_id,
+                        owner_id=1,
+                    ).model_dump(mode='json'),
+                    origin=origin,
+                )
+                for portfolio_id in range(count)
+            ],
+        )
+
+
+@mock.patch('events.outbox.EventBus.publish_batch', side_effect=ack_all)
+class ConcurrentOutboxRelaysTestCase(TransactionTestCase):
+    def test_events_locked_by_another_relay_are_skipped(self, publish_mock):
+        first_pk, second_pk = (
+            OutboxEvent.objects.create(
+                subject=IndexSynced.SUBJECT,
+                payload={'template_slug': slug},
+                origin=PROCESS_ID,
+            ).pk
+            for slug in ('first', 'second')
+        )
+        locked = threading.Event()
+        release = threading.Event()
+
+        def lock_first_event():
+            try:
+                with transaction.atomic():
+                    OutboxEvent.objects.select_for_update().get(pk=first_pk)
+                    locked.set()
+                    release.wait()
+            finally:
+                connection.close()
+
+        another_relay = threading.Thread(target=lock_first_event)
+        another_relay.start()
+        try:
+            self.assertTrue(locked.wait(timeout=5))
+            relayed = asyncio.run(self._relay_batch())
+        finally:
+            release.set()
+            another_relay.join()
+
+        self.assertEqual(relayed, 1)
+        (messages,) = publish_mock.await_args.args
+        self.assertEqual(
+            [headers[MESSAGE_ID_HEADER] for *_, headers in messages],
+            [f'outbox-{second_pk}'],
+        )
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('pk', flat=True)),
+            [first_pk],
+        )
+
+    def test_events_are_not_locked_while_published(self, publish_mock):
+        OutboxEvent.objects.create(
+            subject=IndexSynced.SUBJECT,
+            payload={'template_slug': 'imoex'},
+            origin=PROCESS_ID,
+        )
+
+        def lock_events() -> list[int]:
+            try:
+                with transaction.atomic():
+                    # Fails if the relay holds the row locks
+                    return list(
+                        OutboxEvent.objects.select_for_update(
+                            nowait=True,
+                        ).values_list('pk', flat=True),
+                    )
+            finally:
+                connection.close()
+
+        async def publish(messages, stream=None):
+            self.assertEqual(len(await asyncio.to_thread(lock_events)), 1)
+            return [True] * len(messages)
+
+        publish_mock.side_effect = publish
+
+        self.assertEqual(asyncio.run(self._relay_batch()), 1)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @staticmethod
+    async def _relay_batch() -> int:
+        # Own context, so the relay uses its own thread and connection
+        async with ThreadSensitiveContext():
+            try:
+                return await OutboxRelay(
+                    batch_size=2,
+                    interval=0,
+                ).relay_batch()
+            finally:
+                await sync_to_async(connections.close_all)()
@@ -0,0 +1,62 @@
+import time
+
+from django.test import TestCase
+from faststream.nats import NatsBroker, TestNatsBroker
+
+from events.domain_events import ORIGIN_HEADER, PROCESS_ID
+from events.handlers import router
+from events.quotes import Quote, QUOTES_SUBJECT, QuotesRefreshed
+from services.exchange.stock_markets.quote_table import quote_table
+
+
+class QuotesHandlerTestCase(TestCase):
+    def setUp(self):
+        quote_table.clear()
+        self.batch = QuotesRefreshed(
+            fetched_at=time.time(),
+            quotes=[
+                Quote('SBER', 'Сбербанк', 319.5, 10, 34.84),
+                Quote('LKOH', 'Лукойл', 3100, 1),
+            ],
+        )
+
+    async def test_quotes_of_another_process_are_applied(self):
+        await self._receive(origin='another-process')
+
+        found, missing = quote_table.get(['SBER', 'LKOH'])
+
+        self.assertEqual(
+            found,
+            [
+                {
+                    'ticker': 'SBER',
+                    'short_name': 'Сбербанк',
+                    'price': 319.5,
+                    'lot_size': 10,
+                    'last_dividend_value': 34.84,
+                },
+                {
+                    'ticker': 'LKOH',
+                    'short_name': 'Лукойл',
+                    'price': 3100,
+                    'lot_size': 1,
+                },
+            ],
+        )
+        self.assertEqual(missing, [])
+
+    async def test_own_quotes_are_not_applied_twice(self):
+        await self._receive(origin=PROCESS_ID)
+
+        self.assertEqual(quote_table.get(['SBER']), ([], ['SBER']))
+
+    async def _receive(self, origin: str) -> None:
+        broker = NatsBroker()
+        broker.include_router(router)
+
+        async with TestNatsBroker(broker) as test_broker:
+            await test_broker.publish(
+                self.batch,
+                QUOTES_SUBJECT,
+                headers={ORIGIN_HEADER: origin},
+            )
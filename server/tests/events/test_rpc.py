@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import time
+from unittest import mock
+
+from django.test import TestCase
+from faststream.nats import NatsBroker, TestNatsBroker
+from pydantic import BaseModel
+
+from events.event_bus import EventBus, Status
+from events.procedures import (
+    procedure,
+    ProcedureBusyError,
+    ProcedureFailedError,
+    ProcedureRunner,
+    procedures_router,
+    ProcedureTimeoutError,
+)
+from events.rpc import ProcedureCaller
+
+
+class Number(BaseModel):
+    value: int
+
+
+@procedure('tests.double')
+def double(number: Number) -> Number:
+    return Number(value=number.value * 2)
+
+
+@procedure('tests.fail')
+def fail(number: Number) -> Number:
+    raise ValueError(number.value)
+
+
+@procedure('tests.sleep')
+def sleep(milliseconds: Number) -> Number:
+    time.sleep(milliseconds.value / 1000)
+    return milliseconds
+
+
+@procedure('tests.pid')
+def get_pid(number: Number) -> Number:
+    return Number(value=os.getpid())
+
+
+class ProcedureCallerTestCase(TestCase):
+    def setUp(self):
+        # The first call starts a worker process
+        self.caller = ProcedureCaller(timeout=30, max_pending=8)
+
+    async def test_procedure_is_run_locally_without_event_bus(self):
+        response = await self.caller.call(double, Number(value=2))
+
+        self.assertEqual(response, Number(value=4))
+
+    async def test_procedure_is_run_by_subscriber(self):
+        broker = NatsBroker()
+        broker.include_router(procedures_router)
+
+        async with TestNatsBroker(broker) as test_broker:
+            with (
+                mock.patch.object(EventBus, 'broker', test_broker),
+                mock.patch.object(EventBus, 'status', Status.RUNNING),
+                mock.patch('events.rpc.procedure_runner') as local_runner,
+            ):
+                response = await self.caller.call(double, Number(value=3))
+
+        self.assertEqual(response, Number(value=6))
+        local_runner.run.assert_not_called()
+
+    async def test_failure_of_subscriber_is_raised(self):
+        broker = NatsBroker()
+        broker.include_router(procedures_router)
+
+        async with TestNatsBroker(broker) as test_broker:
+            with (
+                mock.patch.object(EventBus, 'broker', test_broker),
+                mock.patch.object(EventBus, 'status', Status.RUNNING),
+                self.assertRaises(ProcedureFailedError),
+            ):
+                await self.caller.call(fail, Number(value=1))
+
+    async def test_local_failure_is_raised(self):
+        with self.assertRaises(ProcedureFailedError) as context:
+            await self.caller.call(fail, Number(value=1))
+
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+
+    async def test_procedure_times_out(self):
+        with self.assertRaises(ProcedureTimeoutError):
+            await self.caller.call(sleep, Number(value=500), time_limit=0.01)
+
+    async def test_procedure_is_run_in_another_process(self):
+        response = await self.caller.call(get_pid, Number(value=0))
+
+        self.assertNotEqual(response.value, os.getpid())
+
+    async def test_request_without_deadline_gets_default_time_limit(self):
+        broker = NatsBroker()
+        broker.include_router(procedures_router)
+
+        async with TestNatsBroker(broker) as test_broker:
+            reply = await test_broker.request(
+                Number(value=3),
+                double.subject,
+                timeout=30,
+            )
+
+        self.assertEqual(
+            json.loads(reply.body),
+            {'status': 'ok', 'result': {'value': 6}},
+        )
+
+    async def test_calls_over_limit_are_rejected(self):
+        caller = ProcedureCaller(timeout=1, max_pending=0)
+
+        with self.assertRaises(ProcedureBusyError):
+            await caller.call(double, Number(value=1))
+
+
+class ProcedureRunnerTestCase(TestCase):
+    def setUp(self):
+        self.runner = ProcedureRunner(max_workers=1, max_pending=1)
+
+    async def test_timed_out_call_keeps_its_slot(self):
+        # The first call starts the worker process
+        await self.runner.run(double, Number(value=1), time_limit=30)
+
+        with self.assertRaises(ProcedureTimeoutError):
+            await self.runner.run(sleep, Number(value=300), time_limit=0.01)
+
+        # The procedure is still running
+        with self.assertRaises(ProcedureBusyError):
+            await self.runner.run(double, Number(value=1), time_limit=1)
+
+        # The slot is released in the event loop once the worker is done
+        await asyncio.sleep(0.5)
+        response = await self.runner.run(double, Number(value=1), time_limit=1)
+
+        self.assertEqual(response, Number(value=2))
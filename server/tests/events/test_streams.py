@@ -0,0 +1,196 @@
+import asyncio
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import typing
+import unittest
+from unittest import mock
+import uuid
+
+from django.conf import settings
+from django.test import override_settings, TestCase
+import nats
+
+from events.consumer_metrics import get_consumer_metrics
+from events.consumer_stats import consumer_stats, DOMAIN_EVENTS_CONSUMER
+from events.domain_events import DomainEvent, ORIGIN_HEADER, PortfolioChanged
+from events.event_bus import EventBus
+from events.streams import MESSAGE_ID_HEADER
+from utils.cache import CachedResponse, response_cache
+
+RESPONSE = CachedResponse(b'{}', 'application/json', '"v1"')
+
+
+@unittest.skipUnless(shutil.which('nats-server'), 'nats-server is not found')
+class DomainEventsStreamTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+        storage_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(storage_dir.cleanup)
+        server = subprocess.Popen(
+            [
+                'nats-server',
+                '--jetstream',
+                '--addr=127.0.0.1',
+                f'--port={port}',
+                f'--store_dir={storage_dir.name}',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        cls.addClassCleanup(server.wait)
+        cls.addClassCleanup(server.terminate)
+
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                break
+            except ConnectionRefusedError:
+                if time.monotonic() > deadline:
+                    raise
+
+                time.sleep(0.05)
+
+        cls.nats_url = f'nats://127.0.0.1:{port}'
+
+    def setUp(self):
+        # Entries must outlive the waits below
+        ttl_patch = mock.patch.object(response_cache, 'ttl', 60)
+        ttl_patch.start()
+        self.addCleanup(ttl_patch.stop)
+        response_cache.clear()
+        response_cache.set(1, '/a/', RESPONSE, response_cache.version)
+        # Drops the counters of the other tests
+        consumer_stats.pop()
+
+        settings_override = override_settings(
+            NATS_URL=self.nats_url,
+            HANDLE_EVENTS=True,
+            EVENTS_JETSTREAM=True,
+            EVENTS_CONSUMER_NAME=f'test-{uuid.uuid4().hex}',
+            ASGI_WORKERS=1,
+            SERVE_RPC=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def test_missed_events_are_replayed(self):
+        # Creates the durable consumer
+        async with EventBus.handle_events():
+            pass
+
+        await self._publish(PortfolioChanged(portfolio_id=1, owner_id=1))
+        self.assertEqual(response_cache.get(1, '/a/'), RESPONSE)
+
+        async with EventBus.handle_events():
+            await self._wait_for(lambda: response_cache.get(1, '/a/') is None)
+
+    async def test_consumer_lag_is_reported(self):
+        async with EventBus.handle_events():
+            pass
+
+        event = PortfolioChanged(portfolio_id=1, owner_id=1)
+        await self._publish(event, message_id='1')
+        await self._publish(event, message_id='2')
+        # Relayed twice, the stream keeps one of them
+        await self._publish(event, message_id='2')
+
+        connection = await nats.connect(self.nats_url)
+        try:
+            info = await connection.jetstream().consumer_info(
+                settings.EVENTS_STREAM_NAME,
+                settings.EVENTS_CONSUMER_NAME,
+            )
+        finally:
+            await connection.close()
+
+        self.assertEqual(info.num_pending, 2)
+
+        async with EventBus.handle_events():
+            await self._wait_for(lambda: response_cache.get(1, '/a/') is None)
+            # The last event is acknowledged after it's applied
+            await asyncio.sleep(0.1)
+            (metrics,) = await get_consumer_metrics()
+
+        self.assertEqual(
+            metrics,
+            {
+                'consumer': DOMAIN_EVENTS_CONSUMER,
+                'processed': 2,
+                'failed': 0,
+                'processing_ms': mock.ANY,
+                'max_processing_ms': mock.ANY,
+                'lag': 0,
+                'ack_pending': 0,
+                'redelivered': 0,
+            },
+        )
+
+    async def test_batch_published_to_stream_is_acknowledged(self):
+        event = PortfolioChanged(portfolio_id=1, owner_id=1)
+        headers = {ORIGIN_HEADER: 'another-process'}
+
+        async with EventBus.handle_events():
+            acks = await EventBus.publish_batch(
+                [
+                    (event.model_dump(mode='json'), event.SUBJECT, headers),
+                    # No stream is bound to the subject
+                    ({}, 'not-streamed.subject', headers),
+                ],
+                stream=settings.EVENTS_STREAM_NAME,
+            )
+
+        self.assertEqual(acks, [True, False])
+
+    @override_settings(EVENTS_JETSTREAM=False)
+    async def test_core_batch_is_flushed(self):
+        event = PortfolioChanged(portfolio_id=1, owner_id=1)
+
+        async with EventBus.handle_events():
+            acks = await EventBus.publish_batch(
+                [(event.model_dump(mode='json'), event.SUBJECT, {})] * 2,
+            )
+            self.assertEqual(acks, [True, True])
+
+        self.assertIsNone(EventBus.connection)
+
+    async def _publish(
+        self,
+        event: DomainEvent,
+        message_id: str | None = None,
+    ) -> None:
+        headers = {
+            'content-type': 'application/json',
+            ORIGIN_HEADER: 'another-process',
+        }
+        if message_id is not None:
+            headers[MESSAGE_ID_HEADER] = message_id
+
+        connection = await nats.connect(self.nats_url)
+        try:
+            await connection.publish(
+                event.SUBJECT,
+                event.model_dump_json().encode(),
+                headers=headers,
+            )
+            await connection.flush()
+        finally:
+            await connection.close()
+
+    async def _wait_for(self, condition: typing.Callable[[], bool]) -> None:
+        for _ in range(500):
+            if condition():
+                return
+
+            await asyncio.sleep(0.01)
+
+        self.fail('Condition has not been met in 5 seconds')
@@ -47,3 +47,72 @@ class SecurityTestCase(TestCase):
             await Security.get_or_try_to_create_from_moex(ticker='TEST')
 
         self.assertFalse(await Security.objects.aexists())
+
+    @mock.patch('apps.exchange.models.security.MOEX')
+    async def test_get_or_try_to_create_many_from_moex(self, mock_moex):
+        moex = MOEX(client_factory=MockISSClientFactory())
+        mock_moex.return_value = moex
+        await Security.objects.acreate(ticker='TEST')
+
+        with mock.patch.object(
+            moex,
+            'get_existing_tickers',
+            wraps=moex.get_existing_tickers,
+        ) as get_existing_tickers_mock:
+            securities = await Security.get_or_try_to_create_many_from_moex(
+                ['TEST', 'GAZP', 'LKOH', 'FAKE'],
+            )
+
+        self.assertEqual(securities.keys(), {'TEST', 'GAZP', 'LKOH'})
+        self.assertTrue(all(security.pk for security in securities.values()))
+        get_existing_tickers_mock.assert_awaited_once_with(
+            ['GAZP', 'LKOH', 'FAKE'],
+        )
+        self.assertEqual(await Security.objects.acount(), 3)
+
+    @mock.patch('apps.exchange.models.security.MOEX')
+    async def test_only_given_tickers_are_created(self, mock_moex):
+        moex = MOEX(client_factory=MockISSClientFactory())
+        mock_moex.return_value = moex
+        await Security.objects.acreate(ticker='TEST')
+
+        with mock.patch.object(
+            moex,
+            'get_existing_tickers',
+            wraps=moex.get_existing_tickers,
+        ) as get_existing_tickers_mock:
+            securities = await Security.get_or_try_to_create_many_from_moex(
+                ['TEST', 'GAZP', 'LKOH'],
+                tickers_to_create=['TEST', 'GAZP'],
+            )
+
+        self.assertEqual(securities.keys(), {'TEST', 'GAZP'})
+        get_existing_tickers_mock.assert_awaited_once_with(['GAZP'])
+        self.assertFalse(
+            await Security.objects.filter(ticker='LKOH').aexists(),
+        )
+
+    @mock.patch('apps.exchange.models.security.MOEX')
+    async def test_existing_securities_dont_need_moex(self, mock_moex):
+        await Security.objects.acreate(ticker='GAZP')
+
+        securities = await Security.get_or_try_to_create_many_from_moex(
+            ['GAZP'],
+        )
+
+        self.assertEqual(list(securities), ['GAZP'])
+        mock_moex.assert_not_called()
+
+    @mock.patch('apps.exchange.models.security.MOEX')
+    async def test_concurrently_created_securities_are_returned(
+        self,
+        mock_moex,
+    ):
+        mock_moex.return_value = MOEX(client_factory=MockISSClientFactory())
+        # Created by someone else after we checked the database
+        security = await Security.objects.acreate(ticker='GAZP')
+
+        securities = await Security.create_many_from_moex_if_exist(['GAZP'])
+
+        self.assertEqual(securities, {'GAZP': security})
+        self.assertEqual(await Security.objects.acount(), 1)
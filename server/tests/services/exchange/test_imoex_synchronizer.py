@@ -1,6 +1,8 @@
-from django.test import TestCase
+from django.test import override_settings, TestCase
 
 from apps import investment_tables
+from apps.outbox.models import OutboxEvent
+from events.domain_events import IndexSynced
 from services.exchange.synchronization.imoex_synchronizer import (
     IMOEXSynchronizer,
 )
@@ -94,6 +96,18 @@ class IMOEXSynchronizerTestCase(TestCase):
         ).aget()
         self.assertEqual(template_item.weight, 22.5)
 
+    @override_settings(HANDLE_EVENTS=True)
+    async def test_synchronization_publishes_event(self):
+        synchronizer = IMOEXSynchronizer(provider=MockIMOEXProvider())
+        await synchronizer.synchronize()
+
+        event = await OutboxEvent.objects.aget()
+        self.assertEqual(event.subject, IndexSynced.SUBJECT)
+        self.assertEqual(
+            IndexSynced.model_validate(event.payload),
+            IndexSynced(template_slug='imoex'),
+        )
+
     async def test_synchronization_can_run_multiple_times(self):
         synchronizer = IMOEXSynchronizer(provider=MockIMOEXProvider())
         await synchronizer.synchronize()
@@ -209,6 +209,20 @@ class MOEXTestCase(TestCase):
         for security in securities:
             self.assertTrue(security['ticker'] in valid_tickers)
 
+    async def test_moex_checks_tickers_with_single_request(self):
+        client_factory = MockISSClientFactory()
+        moex = MOEX(client_factory=client_factory)
+
+        with mock.patch.object(
+            client_factory,
+            'get_client',
+            wraps=client_factory.get_client,
+        ) as get_client_mock:
+            tickers = await moex.get_existing_tickers(['LKOH', 'GAZP', 'FAKE'])
+
+        self.assertEqual(tickers, {'LKOH', 'GAZP'})
+        get_client_mock.assert_called_once()
+
 
 class MockTimedOutISSClient(ISSClient):
     async def get(self) -> aiomoex.TablesDict:
@@ -0,0 +1,115 @@
+import time
+from unittest import mock
+
+from django.test import override_settings, TestCase
+
+from apps.exchange.models import Security
+from events.domain_events import ORIGIN_HEADER, PROCESS_ID
+from events.quotes import QUOTES_SUBJECT
+from services.exchange.stock_markets import MOEX
+from services.exchange.stock_markets.quote_table import quote_table, QuoteTable
+from services.exchange.stock_markets.typedefs import SecurityDict
+from services.exchange.synchronization.quotes_synchronizer import (
+    QuotesSynchronizer,
+)
+from tests.services.exchange.test_moex_integration import MockISSClientFactory
+
+SBER = SecurityDict(ticker='SBER', short_name='Сбербанк', price=1, lot_size=1)
+
+
+class QuoteTableTestCase(TestCase):
+    def test_fresh_quotes_are_returned(self):
+        table = QuoteTable(max_age=60)
+        table.update([SBER], fetched_at=time.time())
+
+        self.assertEqual(table.get(['SBER', 'GAZP']), ([SBER], ['GAZP']))
+
+    def test_stale_quotes_are_missing(self):
+        table = QuoteTable(max_age=60)
+        table.update([SBER], fetched_at=time.time() - 61)
+
+        self.assertEqual(table.get(['SBER']), ([], ['SBER']))
+
+    def test_update_keeps_other_quotes(self):
+        table = QuoteTable(max_age=60)
+        table.update([SBER], fetched_at=time.time())
+        table.update([{**SBER, 'ticker': 'T'}], fetched_at=time.time())
+
+        found, missing = table.get(['SBER', 'T'])
+
+        self.assertEqual([quote['ticker'] for quote in found], ['SBER', 'T'])
+        self.assertEqual(missing, [])
+
+
+@mock.patch(
+    'services.exchange.synchronization.quotes_synchronizer.EventBus.publish_batch',
+)
+class QuotesSynchronizerTestCase(TestCase):
+    def setUp(self):
+        quote_table.clear()
+        self.synchronizer = QuotesSynchronizer(
+            stock_market=MOEX(client_factory=MockISSClientFactory()),
+        )
+
+    async def test_quotes_of_known_securities_are_saved(self, publish_mock):
+        await Security.objects.abulk_create(
+            [Security(ticker='SBER'), Security(ticker='GAZP')],
+        )
+
+        await self.synchronizer.synchronize()
+
+        found, missing = quote_table.get(['SBER', 'GAZP'])
+        self.assertEqual(
+            sorted(quote['ticker'] for quote in found),
+            ['GAZP', 'SBER'],
+        )
+        self.assertEqual(missing, [])
+
+    @override_settings(QUOTES_BATCH_SIZE=1)
+    async def test_quotes_are_published_in_batches(self, publish_mock):
+        await Security.objects.abulk_create(
+            [Security(ticker='SBER'), Security(ticker='GAZP')],
+        )
+
+        await self.synchronizer.synchronize()
+
+        publish_mock.assert_awaited_once()
+        (messages,) = publish_mock.await_args.args
+        messages = list(messages)
+        self.assertEqual(len(messages), 2)
+        for batch, subject, headers in messages:
+            self.assertEqual(len(batch.quotes), 1)
+            self.assertEqual(subject, QUOTES_SUBJECT)
+            self.assertEqual(headers, {ORIGIN_HEADER: PROCESS_ID})
+
+    async def test_quotes_without_price_are_skipped(self, publish_mock):
+        await Security.objects.acreate(ticker='SBER')
+        stock_market = mock.AsyncMock()
+        stock_market.get_securities.return_value = [
+            SBER,
+            SecurityDict(
+                ticker='NEW',
+                short_name='New',
+                price=None,
+                lot_size=1,
+            ),
+        ]
+        synchronizer = QuotesSynchronizer(stock_market=stock_market)
+
+        await synchronizer.synchronize()
+
+        found, missing = quote_table.get(['SBER', 'NEW'])
+        self.assertEqual(found, [SBER])
+        self.assertEqual(missing, ['NEW'])
+        (messages,) = publish_mock.await_args.args
+        ((batch, *_),) = list(messages)
+        self.assertEqual([quote.ticker for quote in batch.quotes], ['SBER'])
+
+    async def test_nothing_is_fetched_without_securities(self, publish_mock):
+        stock_market = mock.AsyncMock()
+        synchronizer = QuotesSynchronizer(stock_market=stock_market)
+
+        await synchronizer.synchronize()
+
+        stock_market.get_securities.assert_not_awaited()
+        publish_mock.assert_not_awaited()
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from api import exceptions
+from api.utils import IdentityMap
+from apps.exchange.models import Security
+from apps.portfolios.models import Portfolio, PortfolioItem
+from services.portfolios.service import PortfolioService
+
+User = get_user_model()
+
+
+class PortfolioServiceTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='test_user@test.com',
+            password='password',
+        )
+        cls.portfolio = Portfolio.objects.create(
+            name='Test Portfolio',
+            owner=cls.user,
+        )
+        PortfolioItem.objects.create(
+            portfolio=cls.portfolio,
+            security=Security.objects.create(ticker='SBER'),
+            quantity=2,
+        )
+
+    async def test_get_portfolio_loads_rows(self):
+        portfolio = await PortfolioService().get_portfolio(self.portfolio.pk)
+
+        self.assertEqual(portfolio.id, self.portfolio.pk)
+        self.assertEqual(portfolio.name, 'Test Portfolio')
+        self.assertEqual(portfolio.owner_id, self.user.pk)
+        self.assertEqual(portfolio.created_at, self.portfolio.created_at)
+        self.assertEqual(
+            [(s.ticker, s.quantity) for s in portfolio.securities],
+            [('SBER', 2)],
+        )
+
+    async def test_get_portfolio_reuses_identity_map(self):
+        identity_map = IdentityMap()
+        loaded = await Portfolio.objects.aget(pk=self.portfolio.pk)
+        loaded.name = 'Loaded by permission'
+        identity_map.add(loaded)
+
+        service = PortfolioService(identity_map=identity_map)
+        portfolio = await service.get_portfolio(self.portfolio.pk)
+
+        self.assertEqual(portfolio.name, 'Loaded by permission')
+        self.assertEqual(len(portfolio.securities), 1)
+
+    async def test_get_inactive_portfolio_fails(self):
+        self.portfolio.is_active = False
+        await self.portfolio.asave(update_fields=['is_active'])
+
+        with self.assertRaises(exceptions.NotFoundError):
+            await PortfolioService().get_portfolio(self.portfolio.pk)
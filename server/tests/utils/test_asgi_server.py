@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import override_settings, TestCase
+
+from core import asgi
+
+
+class ASGIServerTestCase(TestCase):
+    def run_server(self):
+        with mock.patch('uvicorn.run') as run:
+            asgi.main()
+
+        return run.call_args.kwargs
+
+    @override_settings(
+        ASGI_WORKERS=4,
+        ASGI_MAX_REQUESTS=1000,
+        ASGI_MAX_REQUESTS_JITTER=100,
+    )
+    def test_workers_are_recycled_by_supervisor(self):
+        kwargs = self.run_server()
+
+        self.assertEqual(kwargs['workers'], 4)
+        self.assertEqual(kwargs['limit_max_requests'], 1000)
+        self.assertEqual(kwargs['limit_max_requests_jitter'], 100)
+
+    @override_settings(ASGI_WORKERS=1, ASGI_MAX_REQUESTS=1000)
+    def test_single_worker_is_not_recycled(self):
+        kwargs = self.run_server()
+
+        self.assertEqual(kwargs['workers'], 1)
+        self.assertIsNone(kwargs['limit_max_requests'])
+
+    @override_settings(FORWARDED_ALLOW_IPS='10.0.0.2')
+    def test_forwarded_headers_are_trusted_from_proxy(self):
+        kwargs = self.run_server()
+
+        self.assertTrue(kwargs['proxy_headers'])
+        self.assertEqual(kwargs['forwarded_allow_ips'], '10.0.0.2')
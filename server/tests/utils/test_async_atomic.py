@@ -1,9 +1,12 @@
 import asyncio
+import time
 
-from django.test import TestCase
+from asgiref.sync import ThreadSensitiveContext
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
 
 from apps.exchange.models import Security
-from utils.db_helpers import aatomic, AsyncAtomic
+from utils.db_helpers import aatomic, arun_atomic, AsyncAtomic
 
 
 class AsyncAtomicTestCase(TestCase):
@@ -55,3 +58,72 @@ class AsyncAtomicTestCase(TestCase):
         ]
         await asyncio.gather(*tasks)
         raise Exception
+
+
+class RunAtomicTestCase(TestCase):
+    async def test_transaction_commits(self):
+        await arun_atomic(Security.objects.create, ticker='SBER')
+
+        last_security = await Security.objects.alast()
+        self.assertEqual(last_security.ticker, 'SBER')
+
+    async def test_transaction_rollbacks(self):
+        def create_securities_and_raise_exception():
+            Security.objects.create(ticker='SBER')
+            Security.objects.create(ticker='T')
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            await arun_atomic(create_securities_and_raise_exception)
+
+        self.assertFalse(await Security.objects.aexists())
+
+    async def test_nested_transaction_rollbacks_with_outer_one(self):
+        with self.assertRaises(ValueError):
+            async with AsyncAtomic():
+                await arun_atomic(Security.objects.create, ticker='SBER')
+                raise ValueError
+
+        self.assertFalse(await Security.objects.aexists())
+
+
+class RunAtomicConcurrencyTestCase(TransactionTestCase):
+    TRANSACTION_DURATION_IN_SECONDS = 0.2
+    TRANSACTIONS_COUNT = 5
+
+    def test_transactions_from_different_contexts_run_concurrently(self):
+        # Own event loop is used, because thread sensitive code called
+        # from an async test is always sent back to the test thread.
+        started_at = time.monotonic()
+        asyncio.run(self._run_slow_transactions())
+        elapsed = time.monotonic() - started_at
+
+        # Sequential execution would take the sum of all transactions.
+        self.assertLess(
+            elapsed,
+            self.TRANSACTION_DURATION_IN_SECONDS * self.TRANSACTIONS_COUNT / 2,
+        )
+
+    async def _run_slow_transactions(self):
+        await asyncio.gather(
+            *(
+                self._run_slow_transaction()
+                for _ in range(self.TRANSACTIONS_COUNT)
+            ),
+        )
+
+    async def _run_slow_transaction(self):
+        # Every request gets its own context in ASGI handler
+        async with ThreadSensitiveContext():
+            await arun_atomic(self._slow_transaction)
+
+    def _slow_transaction(self):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_sleep(%s)',
+                    [self.TRANSACTION_DURATION_IN_SECONDS],
+                )
+        finally:
+            # Every context has its own thread and connection.
+            connection.close()
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+import json
+
+from django.test import TestCase
+
+from utils.asgi.middlewares import BodySizeLimitMiddleware
+
+
+class DummyApp:
+    def __init__(self):
+        self.messages = None
+
+    async def __call__(self, scope, receive, send):
+        self.messages = [await receive(), await receive()]
+
+
+def make_receive(*messages):
+    messages = list(messages)
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+def make_scope(content_length=None):
+    headers = []
+    if content_length is not None:
+        headers.append((b'content-length', str(content_length).encode()))
+
+    return {'type': 'http', 'method': 'POST', 'headers': headers}
+
+
+class BodySizeLimitMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.app = DummyApp()
+        self.middleware = BodySizeLimitMiddleware(self.app, max_body_size=10)
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def test_body_is_passed_to_app_at_once(self):
+        receive = make_receive(
+            {'type': 'http.request', 'body': b'{"a":', 'more_body': True},
+            {'type': 'http.request', 'body': b' 1}', 'more_body': False},
+            {'type': 'http.disconnect'},
+        )
+
+        await self.middleware(make_scope(), receive, self.send)
+
+        self.assertEqual(
+            self.app.messages,
+            [
+                {
+                    'type': 'http.request',
+                    'body': b'{"a": 1}',
+                    'more_body': False,
+                },
+                {'type': 'http.disconnect'},
+            ],
+        )
+        self.assertEqual(self.sent, [])
+
+    async def test_too_large_content_length_is_rejected_before_reading(self):
+        receive = make_receive()
+
+        await self.middleware(
+            make_scope(content_length=11),
+            receive,
+            self.send,
+        )
+
+        self.assertIsNone(self.app.messages)
+        self._assert_too_large_response_is_sent()
+
+    async def test_too_large_streamed_body_is_rejected(self):
+        receive = make_receive(
+            {'type': 'http.request', 'body': b'x' * 6, 'more_body': True},
+            {'type': 'http.request', 'body': b'x' * 6, 'more_body': True},
+        )
+
+        await self.middleware(make_scope(), receive, self.send)
+
+        self.assertIsNone(self.app.messages)
+        self._assert_too_large_response_is_sent()
+
+    async def test_app_isnt_called_if_client_disconnects(self):
+        receive = make_receive(
+            {'type': 'http.request', 'body': b'x', 'more_body': True},
+            {'type': 'http.disconnect'},
+        )
+
+        await self.middleware(make_scope(), receive, self.send)
+
+        self.assertIsNone(self.app.messages)
+        self.assertEqual(self.sent, [])
+
+    async def test_limit_can_be_disabled(self):
+        middleware = BodySizeLimitMiddleware(self.app, max_body_size=None)
+        receive = make_receive(
+            {'type': 'http.request', 'body': b'x' * 20, 'more_body': False},
+            {'type': 'http.disconnect'},
+        )
+
+        await middleware(make_scope(content_length=20), receive, self.send)
+
+        self.assertEqual(self.app.messages[0]['body'], b'x' * 20)
+
+    def _assert_too_large_response_is_sent(self):
+        start, body = self.sent
+        self.assertEqual(start['status'], HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(
+            json.loads(body['body']),
+            {'error': 'request body is too large'},
+        )
@@ -0,0 +1,113 @@
+import datetime as dt
+import decimal
+from http import HTTPStatus
+import json
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import TestCase
+from django.utils import timezone
+from parameterized import parameterized
+
+from schemas.portfolio import PortfolioSimpleSchema
+from utils import fast_json
+from utils.fast_json import FastJsonResponse, StreamingJsonResponse
+
+
+class FastJsonTestCase(TestCase):
+    def test_dumps_matches_django_encoder(self):
+        data = {
+            'datetime': timezone.now(),
+            'naive_datetime': dt.datetime(2025, 1, 2, 3, 4, 5, 678901),
+            'date': dt.date(2025, 1, 2),
+            'time': dt.time(3, 4, 5, 678901),
+            'timedelta': dt.timedelta(days=1, seconds=5),
+            'decimal': decimal.Decimal('1.10'),
+            'uuid': uuid.uuid4(),
+            'list': [1, 2.5, 'text', None, True],
+        }
+
+        self.assertEqual(
+            json.loads(fast_json.dumps(data)),
+            json.loads(json.dumps(data, cls=DjangoJSONEncoder)),
+        )
+
+    def test_dumps_embeds_fragments(self):
+        self.assertEqual(
+            fast_json.dumps({'items': fast_json.Fragment(b'[1,2]')}),
+            b'{"items":[1,2]}',
+        )
+
+    def test_loads_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            fast_json.loads(b'{"broken":')
+
+
+class FastJsonResponseTestCase(TestCase):
+    def test_response_encodes_data(self):
+        response = FastJsonResponse(
+            {'error': 'not found'},
+            status=HTTPStatus.NOT_FOUND,
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, b'{"error":"not found"}')
+
+    def test_response_sends_bytes_as_is(self):
+        response = FastJsonResponse(b'{"already":"encoded"}')
+
+        self.assertEqual(response.content, b'{"already":"encoded"}')
+
+    def test_response_encodes_pydantic_model_like_django(self):
+        portfolio = PortfolioSimpleSchema(
+            id=1,
+            name='Test Portfolio',
+            owner_id=2,
+            created_at=timezone.now(),
+        )
+
+        response = FastJsonResponse(portfolio)
+
+        self.assertJSONEqual(
+            response.content.decode(),
+            json.dumps(portfolio.model_dump(), cls=DjangoJSONEncoder),
+        )
+
+
+class StreamingJsonResponseTestCase(TestCase):
+    async def _collect(self, response):
+        return b''.join([chunk async for chunk in response])
+
+    async def _items(self, count):
+        for i in range(count):
+            yield {'id': i}
+
+    async def test_items_are_streamed_in_batches(self):
+        response = StreamingJsonResponse(
+            'items',
+            self._items(5),
+            batch_size=2,
+        )
+        chunks = [chunk async for chunk in response]
+
+        # Opening, three batches and closing
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            json.loads(b''.join(chunks)),
+            {'items': [{'id': i} for i in range(5)]},
+        )
+
+    @parameterized.expand([(0,), (1,), (2,)])
+    async def test_array_is_valid_for_any_number_of_items(self, count):
+        response = StreamingJsonResponse(
+            'items',
+            self._items(count),
+            batch_size=2,
+        )
+
+        self.assertEqual(
+            json.loads(await self._collect(response)),
+            {'items': [{'id': i} for i in range(count)]},
+        )
@@ -0,0 +1,180 @@
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import TestCase
+
+from utils.asgi.leader_election import (
+    AdvisoryLockLeaderElection,
+    FileLockLeaderElection,
+)
+
+
+class DummyContext:
+    def __init__(self):
+        self.entered = 0
+        self.exited = 0
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.entered += 1
+        try:
+            yield
+        finally:
+            self.exited += 1
+
+
+class FileLockLeaderElectionTestCase(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lock_path = Path(self.tmp_dir.name) / 'leader.lock'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_only_one_process_runs_contexts(self):
+        first_context = DummyContext()
+        second_context = DummyContext()
+        first = FileLockLeaderElection(self.lock_path, [first_context])
+        second = FileLockLeaderElection(self.lock_path, [second_context])
+
+        async with first.run(), second.run():
+            self.assertTrue(first.is_leader)
+            self.assertFalse(second.is_leader)
+            self.assertEqual(first_context.entered, 1)
+            self.assertEqual(second_context.entered, 0)
+
+        self.assertEqual(first_context.exited, 1)
+        self.assertEqual(second_context.exited, 0)
+
+    async def test_follower_takes_over_when_leader_exits(self):
+        FileLockLeaderElection.RETRY_INTERVAL_IN_SECONDS = 0.01
+        self.addCleanup(
+            setattr,
+            FileLockLeaderElection,
+            'RETRY_INTERVAL_IN_SECONDS',
+            1.0,
+        )
+
+        follower_context = DummyContext()
+        leader = FileLockLeaderElection(self.lock_path, [DummyContext()])
+        follower = FileLockLeaderElection(self.lock_path, [follower_context])
+
+        leader_run = leader.run()
+        await leader_run.__aenter__()
+
+        async with follower.run():
+            self.assertFalse(follower.is_leader)
+            await leader_run.__aexit__(None, None, None)
+
+            await asyncio.sleep(0.1)
+            self.assertTrue(follower.is_leader)
+            self.assertEqual(follower_context.entered, 1)
+
+        self.assertFalse(follower.is_leader)
+        self.assertEqual(follower_context.exited, 1)
+
+    async def test_follower_retries_after_failed_takeover(self):
+        FileLockLeaderElection.RETRY_INTERVAL_IN_SECONDS = 0.01
+        self.addCleanup(
+            setattr,
+            FileLockLeaderElection,
+            'RETRY_INTERVAL_IN_SECONDS',
+            1.0,
+        )
+
+        attempts = 0
+
+        @asynccontextmanager
+        async def flaky_context():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise RuntimeError('Not ready yet')
+            yield
+
+        leader = FileLockLeaderElection(self.lock_path, [DummyContext()])
+        follower = FileLockLeaderElection(self.lock_path, [flaky_context])
+
+        leader_run = leader.run()
+        await leader_run.__aenter__()
+
+        async with follower.run():
+            await leader_run.__aexit__(None, None, None)
+
+            await asyncio.sleep(0.1)
+            self.assertEqual(attempts, 2)
+            self.assertTrue(follower.is_leader)
+
+
+class AdvisoryLockLeaderElectionTestCase(TestCase):
+    LOCK_ID = 42
+
+    def setUp(self):
+        for name in (
+            'RETRY_INTERVAL_IN_SECONDS',
+            'HEALTH_CHECK_INTERVAL_IN_SECONDS',
+        ):
+            self.addCleanup(
+                setattr,
+                AdvisoryLockLeaderElection,
+                name,
+                getattr(AdvisoryLockLeaderElection, name),
+            )
+            setattr(AdvisoryLockLeaderElection, name, 0.01)
+
+    async def test_only_one_process_of_cluster_runs_contexts(self):
+        first_context = DummyContext()
+        second_context = DummyContext()
+        first = AdvisoryLockLeaderElection(self.LOCK_ID, [first_context])
+        second = AdvisoryLockLeaderElection(self.LOCK_ID, [second_context])
+
+        first_run = first.run()
+        await first_run.__aenter__()
+        await self.wait_for_leader(first)
+
+        async with second.run():
+            await asyncio.sleep(0.1)
+            self.assertFalse(second.is_leader)
+            self.assertEqual(second_context.entered, 0)
+
+            await first_run.__aexit__(None, None, None)
+            self.assertFalse(first.is_leader)
+            self.assertEqual(first_context.exited, 1)
+
+            await self.wait_for_leader(second)
+            self.assertEqual(second_context.entered, 1)
+
+        self.assertEqual(second_context.exited, 1)
+
+    async def test_leader_steps_down_when_session_is_lost(self):
+        context = DummyContext()
+        election = AdvisoryLockLeaderElection(self.LOCK_ID, [context])
+
+        async with election.run():
+            await self.wait_for_leader(election)
+            await self.terminate_lock_holder()
+
+            async with asyncio.timeout(5):
+                while not context.exited or not election.is_leader:  # noqa: ASYNC110
+                    await asyncio.sleep(0.01)
+
+            self.assertEqual(context.entered, 2)
+            self.assertEqual(context.exited, 1)
+
+    @sync_to_async
+    def terminate_lock_holder(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_terminate_backend(pid) FROM pg_locks '
+                "WHERE locktype = 'advisory' AND objid = %s",
+                [self.LOCK_ID],
+            )
+
+    async def wait_for_leader(self, election: AdvisoryLockLeaderElection):
+        async with asyncio.timeout(5):
+            while not election.is_leader:  # noqa: ASYNC110
+                await asyncio.sleep(0.01)
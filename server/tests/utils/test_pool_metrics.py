@@ -0,0 +1,26 @@
+from django.db import connection
+from django.test import TestCase
+
+from utils.db_helpers.pool_metrics import get_pool_metrics
+
+
+class PoolMetricsTestCase(TestCase):
+    def test_metrics_describe_current_pool(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        metrics = get_pool_metrics()
+
+        self.assertIsNotNone(metrics)
+        self.assertGreaterEqual(metrics['in_use'], 1)
+        self.assertEqual(
+            metrics['in_use'] + metrics['available'],
+            metrics['size'],
+        )
+
+    def test_counters_are_reset_between_calls(self):
+        get_pool_metrics()
+        metrics = get_pool_metrics()
+
+        self.assertEqual(metrics['requests'], 0)
+        self.assertEqual(metrics['overflow'], 0)
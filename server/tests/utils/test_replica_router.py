@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.test import TestCase, TransactionTestCase
+
+from apps.portfolios.models import Portfolio
+from utils.db_helpers import aiterate_pinned, use_replica
+from utils.db_helpers.replica import ReplicaRouter
+
+
+@mock.patch(
+    'utils.db_helpers.replica.is_replica_configured',
+    return_value=True,
+)
+class ReplicaRouterTestCase(TransactionTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_default_database_by_default(self, _):
+        self.assertIsNone(self.router.db_for_read(Portfolio))
+
+    def test_reads_go_to_replica_inside_use_replica(self, _):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Portfolio), 'replica')
+
+        self.assertIsNone(self.router.db_for_read(Portfolio))
+
+    def test_reads_inside_transaction_go_to_default_database(self, _):
+        with use_replica(), transaction.atomic():
+            self.assertIsNone(self.router.db_for_read(Portfolio))
+
+    def test_reads_go_to_default_database_without_replica(self, mock_):
+        mock_.return_value = False
+
+        with use_replica():
+            self.assertIsNone(self.router.db_for_read(Portfolio))
+
+    def test_writes_go_to_default_database(self, _):
+        with use_replica():
+            self.assertEqual(self.router.db_for_write(Portfolio), 'default')
+
+    def test_replica_is_not_migrated(self, _):
+        self.assertFalse(self.router.allow_migrate('replica', 'portfolios'))
+        self.assertIsNone(self.router.allow_migrate('default', 'portfolios'))
+
+    def test_aiterate_pinned_keeps_database_chosen_on_call(self, _):
+        with mock.patch.object(
+            models.QuerySet,
+            'using',
+            autospec=True,
+        ) as using:
+            with use_replica():
+                aiterate_pinned(Portfolio.objects.all())
+
+            using.assert_called_once_with(mock.ANY, 'replica')
+
+
+class AiteratePinnedTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            email='test_user@test.com',
+            password='password',
+        )
+        Portfolio.objects.bulk_create(
+            [Portfolio(name=f'portfolio {i}', owner=owner) for i in range(5)],
+        )
+
+    async def test_rows_are_fetched_in_chunks(self):
+        rows = aiterate_pinned(
+            Portfolio.objects.order_by('id').values_list(
+                'name',
+                'owner__email',
+            ),
+            chunk_size=2,
+        )
+
+        self.assertEqual(
+            [row async for row in rows],
+            [(f'portfolio {i}', 'test_user@test.com') for i in range(5)],
+        )
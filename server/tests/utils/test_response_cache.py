@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from utils.cache import CachedResponse, ResponseCache
+
+RESPONSE = CachedResponse(b'{}', 'application/json', '"v1"')
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(maxsize=2, ttl=10)
+
+    def test_responses_are_cached_per_user(self):
+        self.cache.set(1, '/portfolios/', RESPONSE, self.cache.version)
+
+        self.assertEqual(self.cache.get(1, '/portfolios/'), RESPONSE)
+        self.assertIsNone(self.cache.get(2, '/portfolios/'))
+        self.assertIsNone(self.cache.get(1, '/portfolios/?limit=1'))
+
+    def test_least_recently_used_response_is_evicted(self):
+        self.cache.set(1, '/a/', RESPONSE, self.cache.version)
+        self.cache.set(1, '/b/', RESPONSE, self.cache.version)
+        self.cache.get(1, '/a/')
+
+        self.cache.set(2, '/c/', RESPONSE, self.cache.version)
+
+        self.assertEqual(self.cache.get(1, '/a/'), RESPONSE)
+        self.assertIsNone(self.cache.get(1, '/b/'))
+        self.assertEqual(self.cache.get(2, '/c/'), RESPONSE)
+
+    def test_expired_response_is_not_returned(self):
+        with mock.patch('time.monotonic', return_value=100):
+            self.cache.set(1, '/a/', RESPONSE, self.cache.version)
+
+        with mock.patch('time.monotonic', return_value=110):
+            self.assertIsNone(self.cache.get(1, '/a/'))
+
+        # The expired entry doesn't take the place of the new ones
+        self.cache.set(1, '/b/', RESPONSE, self.cache.version)
+        self.cache.set(1, '/c/', RESPONSE, self.cache.version)
+        self.assertEqual(self.cache.get(1, '/b/'), RESPONSE)
+
+    def test_invalidation_drops_only_user_responses(self):
+        self.cache.set(1, '/a/', RESPONSE, self.cache.version)
+        self.cache.set(2, '/a/', RESPONSE, self.cache.version)
+
+        self.cache.invalidate_user(1)
+
+        self.assertIsNone(self.cache.get(1, '/a/'))
+        self.assertEqual(self.cache.get(2, '/a/'), RESPONSE)
+
+    def test_response_built_before_invalidation_is_not_stored(self):
+        version = self.cache.version
+        self.cache.invalidate_user(1)
+
+        self.cache.set(1, '/a/', RESPONSE, version)
+
+        self.assertIsNone(self.cache.get(1, '/a/'))
+
+    def test_cache_can_be_disabled(self):
+        cache = ResponseCache(maxsize=10, ttl=0)
+
+        cache.set(1, '/a/', RESPONSE, cache.version)
+
+        self.assertFalse(cache.enabled)
+        self.assertIsNone(cache.get(1, '/a/'))
@@ -0,0 +1,207 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterable
+import contextlib
+from contextlib import asynccontextmanager, AsyncExitStack
+import fcntl
+import logging
+import os
+import typing
+
+from django.db import connections, DEFAULT_DB_ALIAS
+import psycopg
+
+logger = logging.getLogger(__name__)
+
+type LeaderContext = Callable[[], typing.AsyncContextManager[None]]
+
+
+class FileLockLeaderElection:
+    """
+    Runs the given contexts in a single process on the host.
+
+    Every worker tries to take an exclusive lock on the same file,
+    the one that holds it becomes the leader and enters the contexts.
+    Other workers keep retrying in the background, so when the leader
+    is recycled or restarted, one of them takes over.
+    The lock is released by the OS even if the leader crashes.
+    """
+
+    RETRY_INTERVAL_IN_SECONDS: typing.ClassVar[float] = 1.0
+
+    def __init__(
+        self,
+        lock_path: str | os.PathLike[str],
+        contexts: Iterable[LeaderContext],
+    ):
+        self._lock_path = lock_path
+        self._contexts = tuple(contexts)
+        self._lock_file: typing.IO[str] | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator[None]:
+        # The first attempt is made during the startup,
+        # so errors in the leader contexts aren't swallowed.
+        if self._try_to_acquire_lock():
+            try:
+                async with self._enter_contexts():
+                    yield
+            finally:
+                self._release_lock()
+            return
+
+        task = asyncio.create_task(self._wait_for_leadership())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _wait_for_leadership(self) -> None:
+        while True:
+            # flock can't notify us about the release, so we have to poll
+            while not self._try_to_acquire_lock():  # noqa: ASYNC110
+                await asyncio.sleep(self.RETRY_INTERVAL_IN_SECONDS)
+
+            try:
+                async with self._enter_contexts():
+                    await asyncio.Event().wait()
+            except Exception:
+                logger.exception('Leader contexts failed after the takeover')
+            finally:
+                self._release_lock()
+
+            # The lock is given up, so another worker can try its luck
+            # before this one tries again
+            await asyncio.sleep(self.RETRY_INTERVAL_IN_SECONDS)
+
+    @asynccontextmanager
+    async def _enter_contexts(self) -> AsyncIterator[None]:
+        logger.info(
+            'Process became the leader',
+            extra={'pid': os.getpid()},
+        )
+        async with AsyncExitStack() as stack:
+            for context in self._contexts:
+                await stack.enter_async_context(context())
+
+            yield
+
+    def _try_to_acquire_lock(self) -> bool:
+        lock_file = open(self._lock_path, 'a')  # noqa: SIM115
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file is None:
+            return
+
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+        self._lock_file = None
+
+
+class AdvisoryLockLeaderElection:
+    """
+    Runs the given contexts in a single process of the whole cluster.
+
+    The leader holds a session level Postgres advisory lock
+    on its own connection. The database releases the lock when
+    the session ends, so a dead leader is replaced by one
+    of the processes that keep retrying in the background. The leader
+    checks its connection and steps down as soon as it's broken,
+    a new leader can't take the lock earlier than the database
+    notices the end of the session.
+    """
+
+    RETRY_INTERVAL_IN_SECONDS: typing.ClassVar[float] = 5.0
+    HEALTH_CHECK_INTERVAL_IN_SECONDS: typing.ClassVar[float] = 5.0
+
+    def __init__(self, lock_id: int, contexts: Iterable[LeaderContext]):
+        self._lock_id = lock_id
+        self._contexts = tuple(contexts)
+        self._is_leader = False
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator[None]:
+        task = asyncio.create_task(self._lead())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _lead(self) -> None:
+        while True:
+            try:
+                async with await _connect() as connection:
+                    await self._wait_for_lock(connection)
+                    self._is_leader = True
+                    logger.info(
+                        'Process became the cluster leader',
+                        extra={'pid': os.getpid()},
+                    )
+                    async with AsyncExitStack() as stack:
+                        for context in self._contexts:
+                            await stack.enter_async_context(context())
+
+                        await self._check_connection(connection)
+            except Exception:
+                logger.exception('Cluster leader election failed')
+            finally:
+                self._is_leader = False
+
+            await asyncio.sleep(self.RETRY_INTERVAL_IN_SECONDS)
+
+    async def _wait_for_lock(
+        self,
+        connection: psycopg.AsyncConnection,
+    ) -> None:
+        while True:
+            cursor = await connection.execute(
+                'SELECT pg_try_advisory_lock(%s)',
+                [self._lock_id],
+            )
+            row = await cursor.fetchone()
+            if row is not None and row[0]:
+                return
+
+            await asyncio.sleep(self.RETRY_INTERVAL_IN_SECONDS)
+
+    async def _check_connection(
+        self,
+        connection: psycopg.AsyncConnection,
+    ) -> None:
+        """Returns only by raising, when the lock may have been lost."""
+        while True:
+            await asyncio.sleep(self.HEALTH_CHECK_INTERVAL_IN_SECONDS)
+            await connection.execute('SELECT 1')
+
+
+async def _connect() -> psycopg.AsyncConnection:
+    # Not a connection of the ORM: the lock lives as long as
+    # the session, so it must not be returned to a pool
+    settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+    return await psycopg.AsyncConnection.connect(
+        dbname=settings_dict['NAME'],
+        user=settings_dict['USER'],
+        password=settings_dict['PASSWORD'],
+        host=settings_dict['HOST'],
+        port=settings_dict['PORT'],
+        autocommit=True,
+    )
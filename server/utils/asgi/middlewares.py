@@ -1,14 +1,19 @@
 from collections.abc import Callable
+from http import HTTPStatus
 import traceback
 import typing
 
 from asgiref.typing import (
     ASGI3Application,
     ASGIReceiveCallable,
+    ASGIReceiveEvent,
     ASGISendCallable,
+    HTTPScope,
     Scope,
 )
 
+from utils import fast_json
+
 
 class LifespanMiddleware:
     def __init__(
@@ -71,3 +76,107 @@ class LifespanMiddleware:
                 )
             raise
         await send({'type': 'lifespan.shutdown.complete'})
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reads HTTP request bodies before the app is called.
+
+    Django buffers the whole body into a temporary file, which goes
+    to disk once it's large enough, and checks its size only when
+    request.body is accessed. Here bodies larger than max_body_size
+    are rejected with 413 as soon as the limit is crossed, so they are
+    neither kept in memory nor written to disk from the event loop.
+    Django then copies the body into an in-memory file, as long as
+    max_body_size doesn't exceed FILE_UPLOAD_MAX_MEMORY_SIZE.
+    """
+
+    def __init__(
+        self,
+        app: ASGI3Application,
+        *,
+        max_body_size: int | None,
+    ) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: ASGIReceiveCallable,
+        send: ASGISendCallable,
+    ) -> None:
+        if scope['type'] != 'http' or self.max_body_size is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self._get_content_length(scope) > self.max_body_size:
+            await self._send_too_large(send)
+            return
+
+        chunks: list[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+            assert message['type'] == 'http.request'
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body_size:
+                await self._send_too_large(send)
+                return
+
+            chunks.append(chunk)
+            more_body = message.get('more_body', False)
+
+        body_message: ASGIReceiveEvent | None = {
+            'type': 'http.request',
+            'body': b''.join(chunks),
+            'more_body': False,
+        }
+
+        async def replay_receive() -> ASGIReceiveEvent:
+            nonlocal body_message
+            if body_message is None:
+                # Django waits for http.disconnect while the view runs
+                return await receive()
+
+            message, body_message = body_message, None
+            return message
+
+        await self.app(scope, replay_receive, send)
+
+    @staticmethod
+    def _get_content_length(scope: HTTPScope) -> int:
+        for name, value in scope['headers']:
+            if name == b'content-length':
+                try:
+                    return int(value)
+                except ValueError:
+                    # Let the server deal with the malformed header
+                    return 0
+
+        return 0
+
+    @staticmethod
+    async def _send_too_large(send: ASGISendCallable) -> None:
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                'headers': [(b'content-type', b'application/json')],
+                'trailers': False,
+            },
+        )
+        await send(
+            {
+                'type': 'http.response.body',
+                'body': fast_json.dumps(
+                    {'error': 'request body is too large'},
+                ),
+                'more_body': False,
+            },
+        )
@@ -1,3 +1,9 @@
 from .alru_method_shared_cache import alru_method_shared_cache
+from .response_cache import CachedResponse, response_cache, ResponseCache
 
-__all__ = ('alru_method_shared_cache',)
+__all__ = (
+    'CachedResponse',
+    'ResponseCache',
+    'alru_method_shared_cache',
+    'response_cache',
+)
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import threading
+import time
+import typing
+
+from django.conf import settings
+
+
+class CachedResponse(typing.NamedTuple):
+    content: bytes
+    content_type: str
+    etag: str | None
+
+
+type _Key = tuple[int, str]
+
+
+class ResponseCache:
+    """
+    Serialized responses of a single process, per user.
+
+    Least recently used entries are evicted when the cache is full,
+    entries older than ttl are never returned. Whoever changes the data
+    the responses are built from has to invalidate their user.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[_Key, tuple[float, CachedResponse]] = (
+            OrderedDict()
+        )
+        self._user_keys: dict[int, set[str]] = {}
+        # Changed by every invalidation, see set()
+        self._version = 0
+        # Domain events are applied by sync code as well
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, user_id: int, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                self._delete(user_id, key)
+                return None
+
+            self._entries.move_to_end((user_id, key))
+            return response
+
+    def set(
+        self,
+        user_id: int,
+        key: str,
+        response: CachedResponse,
+        version: int,
+    ) -> None:
+        """
+        Version is the one the cache had before the response was built.
+        If anything was invalidated since then, the response
+        could be stale, so it isn't stored.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if version != self._version:
+                return
+
+            self._entries[user_id, key] = (
+                time.monotonic() + self.ttl,
+                response,
+            )
+            self._entries.move_to_end((user_id, key))
+            self._user_keys.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.maxsize:
+                (oldest_user_id, oldest_key), _ = self._entries.popitem(
+                    last=False,
+                )
+                self._forget_key(oldest_user_id, oldest_key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._version += 1
+            for key in self._user_keys.pop(user_id, ()):
+                del self._entries[user_id, key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def _delete(self, user_id: int, key: str) -> None:
+        del self._entries[user_id, key]
+        self._forget_key(user_id, key)
+
+    def _forget_key(self, user_id: int, key: str) -> None:
+        user_keys = self._user_keys[user_id]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._user_keys[user_id]
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_IN_SECONDS,
+)
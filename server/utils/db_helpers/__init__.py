@@ -1,6 +1,19 @@
-from .async_atomic import aatomic, AsyncAtomic
+from .async_atomic import aatomic, arun_atomic, AsyncAtomic
+from .replica import (
+    aiterate_pinned,
+    is_replica_configured,
+    remember_user_write,
+    use_replica,
+    user_wrote_recently,
+)
 
 __all__ = (
     'AsyncAtomic',
     'aatomic',
+    'aiterate_pinned',
+    'arun_atomic',
+    'is_replica_configured',
+    'remember_user_write',
+    'use_replica',
+    'user_wrote_recently',
 )
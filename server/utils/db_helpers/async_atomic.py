@@ -2,6 +2,7 @@ from collections.abc import Callable, Coroutine
 import typing
 
 from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.db.transaction import Atomic
 
 
@@ -27,3 +28,36 @@ def aatomic[**P, T](func: _AF[P, T]) -> _AF[P, T]:
             return await func(*args, **kwargs)
 
     return wrapper
+
+
+def _run_atomic[**P, T](
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    with transaction.atomic():
+        return func(*args, **kwargs)
+
+
+async def arun_atomic[**P, T](
+    func: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """
+    Runs sync func inside a transaction with a single sync_to_async call.
+
+    Inside an outer transaction func runs in a savepoint,
+    so services can be called from other transactional units.
+
+    AsyncAtomic hops to the sync thread on enter, on exit
+    and for every query in between, so the thread stays reserved
+    for the whole lifetime of the transaction, including awaits
+    on unrelated I/O. Here the thread is used only while
+    the transactional unit is actually running.
+    """
+    return await sync_to_async(_run_atomic, thread_sensitive=True)(
+        func,
+        *args,
+        **kwargs,
+    )
@@ -0,0 +1,82 @@
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from contextlib import asynccontextmanager
+import logging
+import os
+import typing
+
+from django.db import connections, DEFAULT_DB_ALIAS
+
+logger = logging.getLogger('db.pool')
+
+
+class PoolMetrics(typing.TypedDict):
+    alias: str
+    pid: int
+    size: int
+    max_size: int
+    in_use: int
+    available: int
+    # Clients waiting for a connection right now
+    waiting: int
+    # Since the previous call
+    requests: int
+    # Requests that found no free connection and had to wait
+    overflow: int
+    wait_ms: int
+    errors: int
+
+
+def get_pool_metrics(alias: str = DEFAULT_DB_ALIAS) -> PoolMetrics | None:
+    """
+    Returns the connection pool metrics of the current process.
+
+    Counters are reset on every call, so they describe the period
+    since the previous call. Returns None if pooling is disabled.
+    """
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+
+    stats = pool.pop_stats()
+    size = stats.get('pool_size', 0)
+    available = stats.get('pool_available', 0)
+
+    return {
+        'alias': alias,
+        'pid': os.getpid(),
+        'size': size,
+        'max_size': stats.get('pool_max', 0),
+        'in_use': size - available,
+        'available': available,
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': stats.get('requests_num', 0),
+        'overflow': stats.get('requests_queued', 0),
+        'wait_ms': stats.get('requests_wait_ms', 0),
+        'errors': stats.get('requests_errors', 0),
+    }
+
+
+@asynccontextmanager
+async def report_pool_metrics(
+    interval_in_seconds: float,
+    alias: str = DEFAULT_DB_ALIAS,
+) -> AsyncIterator[None]:
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(interval_in_seconds)
+            metrics = get_pool_metrics(alias)
+            if metrics is not None:
+                logger.info(
+                    'Database connection pool metrics',
+                    extra=dict(metrics),
+                )
+
+    task = asyncio.create_task(report())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
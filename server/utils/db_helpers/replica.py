@@ -0,0 +1,149 @@
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import itertools
+import typing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS, models
+from django.http import HttpRequest, HttpResponse
+
+REPLICA_DB_ALIAS = 'replica'
+STICKINESS_COOKIE_NAME = 'itable_wrote'
+_STICKINESS_COOKIE_SALT = 'utils.db_helpers.replica'
+
+_read_from_replica: ContextVar[bool] = ContextVar(
+    'read_from_replica',
+    default=False,
+)
+
+
+def is_replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def use_replica() -> Iterator[None]:
+    """
+    Routes reads made inside the block to the replica, if there is one.
+
+    The flag lives in a context variable, so it's visible
+    to the ORM calls made through sync_to_async.
+    """
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def aiterate_pinned[T](
+    queryset: models.QuerySet[typing.Any, T],
+    chunk_size: int = 2000,
+) -> AsyncIterator[T]:
+    """
+    Iterates over the queryset in chunks instead of loading it at once.
+
+    The database is chosen right away, so rows keep coming from it
+    even if the iteration outlives use_replica(), as it does
+    in streaming responses.
+    """
+    # QuerySet.aiterator() can't be used: for values_list() with joins
+    # it runs the query right in the event loop and fails
+    rows = queryset.using(queryset.db).iterator(chunk_size=chunk_size)
+    return _aiterate_chunks(rows, chunk_size)
+
+
+async def _aiterate_chunks[T](
+    rows: Iterator[T],
+    chunk_size: int,
+) -> AsyncIterator[T]:
+    fetch_chunk = sync_to_async(_take)
+    while chunk := await fetch_chunk(rows, chunk_size):
+        for row in chunk:
+            yield row
+
+
+def _take[T](rows: Iterator[T], count: int) -> list[T]:
+    return list(itertools.islice(rows, count))
+
+
+def remember_user_write(response: HttpResponse, user_id: int) -> None:
+    """
+    Sticks the client to the default database for a while.
+
+    The mark is kept by the client in a signed cookie, so deciding
+    where to read from doesn't cost a query to the default database.
+    """
+    response.set_signed_cookie(
+        STICKINESS_COOKIE_NAME,
+        str(user_id),
+        salt=_STICKINESS_COOKIE_SALT,
+        max_age=settings.DATABASE_REPLICA_STICKINESS_IN_SECONDS,
+        secure=not settings.DEBUG,
+        httponly=True,
+        samesite='Lax',
+    )
+
+
+def user_wrote_recently(request: HttpRequest, user_id: int) -> bool:
+    # The signature is timestamped, so an old cookie kept by the client
+    # is rejected, and the mark of another user is ignored
+    return request.get_signed_cookie(
+        STICKINESS_COOKIE_NAME,
+        default=None,
+        salt=_STICKINESS_COOKIE_SALT,
+        max_age=settings.DATABASE_REPLICA_STICKINESS_IN_SECONDS,
+    ) == str(user_id)
+
+
+class ReplicaRouter:
+    """
+    Sends reads made inside use_replica() to the replica.
+
+    Everything else, including reads inside a transaction,
+    goes to the default database.
+    """
+
+    def db_for_read(
+        self,
+        model: type[models.Model],
+        **hints: typing.Any,
+    ) -> str | None:
+        if (
+            not _read_from_replica.get()
+            or not is_replica_configured()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(
+        self,
+        model: type[models.Model],
+        **hints: typing.Any,
+    ) -> str | None:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(
+        self,
+        obj1: models.Model,
+        obj2: models.Model,
+        **hints: typing.Any,
+    ) -> bool | None:
+        # Replica holds the same data as the default database
+        return True
+
+    def allow_migrate(
+        self,
+        db: str,
+        app_label: str,
+        model_name: str | None = None,
+        **hints: typing.Any,
+    ) -> bool | None:
+        if db == REPLICA_DB_ALIAS:
+            return False
+
+        return None
@@ -0,0 +1,11 @@
+from .encoding import dumps, Fragment, JSONDecodeError, loads
+from .responses import FastJsonResponse, StreamingJsonResponse
+
+__all__ = (
+    'FastJsonResponse',
+    'Fragment',
+    'JSONDecodeError',
+    'StreamingJsonResponse',
+    'dumps',
+    'loads',
+)
@@ -0,0 +1,29 @@
+import typing
+
+from django.core.serializers.json import DjangoJSONEncoder
+import orjson
+
+# Already encoded JSON, embedded into the output as it is
+Fragment = orjson.Fragment
+# Subclass of json.JSONDecodeError
+JSONDecodeError = orjson.JSONDecodeError
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def dumps(obj: typing.Any) -> bytes:
+    """
+    Encodes the object to JSON bytes with orjson.
+
+    Datetimes and types orjson doesn't know are passed
+    to DjangoJSONEncoder, so the output matches JsonResponse.
+    """
+    return orjson.dumps(
+        obj,
+        default=_django_encoder.default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> typing.Any:
+    return orjson.loads(data)
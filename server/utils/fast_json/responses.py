@@ -0,0 +1,76 @@
+from collections.abc import AsyncIterable, AsyncIterator
+import typing
+
+from django.http import HttpResponse, StreamingHttpResponse
+from pydantic import BaseModel
+
+from utils.fast_json.encoding import dumps
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    Drop-in replacement for JsonResponse encoded with orjson.
+
+    Pydantic models are encoded by pydantic itself, without dumping
+    them to dicts first. Bytes are sent as already encoded JSON.
+    """
+
+    def __init__(
+        self,
+        data: BaseModel | bytes | typing.Any,
+        **kwargs: typing.Any,
+    ):
+        kwargs.setdefault('content_type', 'application/json')
+
+        if isinstance(data, BaseModel):
+            content = data.model_dump_json().encode()
+        elif isinstance(data, bytes):
+            content = data
+        else:
+            content = dumps(data)
+
+        super().__init__(content=content, **kwargs)
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    Streams {"<key>": [...]} with the array items taken from an iterable.
+
+    Items are encoded in batches as they come, so memory use doesn't
+    depend on the number of items, and the response starts before
+    the last item is read.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        items: AsyncIterable[typing.Any],
+        *,
+        batch_size: int = 500,
+        **kwargs: typing.Any,
+    ):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(self._stream(key, items, batch_size), **kwargs)
+
+    @staticmethod
+    async def _stream(
+        key: str,
+        items: AsyncIterable[typing.Any],
+        batch_size: int,
+    ) -> AsyncIterator[bytes]:
+        yield b'{' + dumps(key) + b':['
+
+        separator = b''
+        batch: list[typing.Any] = []
+        async for item in items:
+            batch.append(item)
+            if len(batch) == batch_size:
+                # Strip the brackets to join batches into one array
+                yield separator + dumps(batch)[1:-1]
+                separator = b','
+                batch = []
+
+        if batch:
+            yield separator + dumps(batch)[1:-1]
+
+        yield b']}'